@@ -0,0 +1,154 @@
+# NOTES:
+# Authentication for async views.
+#
+# request.user and request.session are lazy and load through the (sync) ORM,
+# which Django refuses to run inside an async view. These helpers read the
+# same session and user documents through core.db_backend.aio instead, and
+# fill in request.user / request.session so the rest of the view can use
+# them normally.
+# Writes to the session still work: SessionMiddleware saves it after the view.
+# Like the sync path, cached sessions and users (user_cache.py) are read
+# from the cache first.
+
+import functools
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.auth.views import redirect_to_login
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDbSessionStore
+from django.contrib.sessions.backends.db import SessionStore as DbSessionStore
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from core.db_backend.aio import async_database
+
+from .user_cache import get_cached_user
+
+User = get_user_model()
+
+# Everything the auth checks and the JSON payloads need from a user
+USER_FIELDS = ("id", "password", "username", "email", "is_active", "is_staff", "is_superuser")
+
+
+def _naive_utc_now():
+    return timezone.make_naive(timezone.now(), timezone.utc)
+
+
+async def aload_session(request):
+    """
+    Load request.session without blocking the event loop.
+    """
+    return await aload_session_store(request.session)
+
+
+async def aload_session_store(session):
+    """
+    Load a SessionStore without blocking the event loop.
+    Database sessions are read with one awaited find_one (after the cache
+    for cached_db), other engines load in a thread.
+    """
+    if hasattr(session, "_session_cache"):
+        return session
+
+    if not isinstance(session, DbSessionStore):
+        await sync_to_async(session._get_session, thread_sensitive=False)()
+        return session
+
+    cached = isinstance(session, CachedDbSessionStore)
+    if cached and session.session_key:
+        data = await sync_to_async(session._cache.get, thread_sensitive=False)(session.cache_key)
+        if data is not None:
+            session._session_cache = data
+            return session
+
+    data = {}
+    if session.session_key:
+        async with async_database() as db:
+            doc = await db[Session._meta.db_table].find_one(
+                {"session_key": session.session_key, "expire_date": {"$gt": _naive_utc_now()}},
+                projection={"_id": 0, "session_data": 1, "expire_date": 1},
+            )
+        if doc:
+            data = session.decode(doc["session_data"])
+            if cached:
+                # Same as the cached_db SessionStore.load()
+                expire_date = timezone.make_aware(doc["expire_date"], timezone.utc)
+                await sync_to_async(session._cache.set, thread_sensitive=False)(
+                    session.cache_key, data, session.get_expiry_age(expiry=expire_date)
+                )
+        else:
+            # Same as SessionStore.load() for a missing / expired session
+            session._session_key = None
+
+    session._session_cache = data
+    return session
+
+
+async def aget_user(request):
+    """
+    Async version of django.contrib.auth.get_user().
+    """
+    return await aget_session_user(await aload_session(request))
+
+
+async def aget_session_user(session):
+    """
+    The user logged in on an (already loaded) session, or AnonymousUser.
+    """
+    try:
+        user_id = User._meta.pk.to_python(session[SESSION_KEY])
+        backend_path = session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+
+    # Users are only cached by the sync path (fully loaded but the password
+    # hash), this one has USER_FIELDS only and is not stored
+    user = await sync_to_async(get_cached_user, thread_sensitive=False)(user_id)
+    if user is None:
+        async with async_database() as db:
+            doc = await db[User._meta.db_table].find_one(
+                {"id": user_id},
+                projection={"_id": 0, **dict.fromkeys(USER_FIELDS, 1)},
+            )
+        if not doc:
+            return AnonymousUser()
+
+        fields = [f for f in User._meta.concrete_fields if f.column in doc]
+        user = User.from_db("default", [f.attname for f in fields], [doc[f.column] for f in fields])
+
+    if not user.is_active:
+        return AnonymousUser()
+
+    # A password change logs out the other sessions
+    session_hash = session.get(HASH_SESSION_KEY)
+    if not (session_hash and constant_time_compare(session_hash, user.get_session_auth_hash())):
+        return AnonymousUser()
+
+    return user
+
+
+def async_login_required(view):
+    """
+    login_required for async views: loads request.user with aget_user()
+    and redirects anonymous users to the login page.
+    """
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        request.user = await aget_user(request)
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+
+    return wrapper
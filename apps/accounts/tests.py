@@ -1,3 +1,81 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model, user_logged_out
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDbSessionStore
+from django.db.models.signals import post_save
+from django.test import SimpleTestCase
+
+from apps.tasks.models import Task
+
+from .async_auth import aload_session_store
+from .user_cache import (
+    CachedModelBackend,
+    cache_user,
+    get_cache,
+    get_cached_user,
+    invalidate_user,
+    user_key,
+)
+
+User = get_user_model()
+
+
+class UserCacheTests(SimpleTestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.user = User(pk=7, username="sara", password="hash", is_active=True)
+
+    def test_backend_reads_the_database_once(self):
+        with mock.patch.object(ModelBackend, "get_user", return_value=self.user) as get_user:
+            first = CachedModelBackend().get_user(7)
+            second = CachedModelBackend().get_user(7)
+
+        get_user.assert_called_once_with(7)
+        self.assertEqual((first.pk, first.password), (7, "hash"))
+        self.assertEqual(second.pk, 7)
+        self.assertEqual(second.get_session_auth_hash(), self.user.get_session_auth_hash())
+
+    def test_password_hash_is_not_cached(self):
+        cache_user(self.user)
+        stored, _ = get_cache().get(user_key(7))
+        self.assertNotIn("password", stored.__dict__)
+
+        # Reading it loads it from the database
+        cached = get_cached_user(7)
+
+        def refresh_from_db(fields):
+            cached.password = "hash"
+
+        with mock.patch.object(User, "refresh_from_db", side_effect=refresh_from_db) as refresh:
+            self.assertEqual(cached.password, "hash")
+        refresh.assert_called_once_with(fields=["password"])
+
+    def test_invalidated_user_is_not_cached_again_right_away(self):
+        cache_user(self.user)
+        invalidate_user(7)
+
+        # e.g. a request that read the row before the password change
+        cache_user(self.user)
+        self.assertIsNone(get_cached_user(7))
+
+    def test_save_and_logout_invalidate(self):
+        cache_user(self.user)
+        # Task.objects: the username may have changed, see tasks/versions.py
+        with mock.patch.object(Task, "objects"):
+            post_save.send(sender=User, instance=self.user, created=False)
+        self.assertIsNone(get_cached_user(7))
+
+        get_cache().clear()
+        cache_user(self.user)
+        user_logged_out.send(sender=User, request=None, user=self.user)
+        self.assertIsNone(get_cached_user(7))
+
+    def test_async_session_load_uses_the_cache(self):
+        session = CachedDbSessionStore(session_key="k" * 32)
+        get_cache().set(session.cache_key, {"_auth_user_id": "7"})
+
+        async_to_sync(aload_session_store)(session)
+
+        self.assertEqual(session["_auth_user_id"], "7")
@@ -0,0 +1,98 @@
+# NOTES:
+# Short-TTL cache of the logged-in user, so AuthenticationMiddleware does
+# not read the User row on every request.
+# - CachedModelBackend.get_user() is what django.contrib.auth.get_user()
+#   calls with the user id from the session: cache first, ModelBackend on
+#   a miss
+# - the password hash is not cached (the cache may be shared with other
+#   services): the cached user has it deferred, and is stored with its
+#   session auth hash (an HMAC of the password hash keyed with SECRET_KEY),
+#   which is all the session check (logout of other sessions after a
+#   password change) needs. Anything else that reads user.password, like
+#   check_password() or the legacy session hash fallback, re-reads it from
+#   the database.
+#
+# Invalidation (connected in AccountsConfig.ready()):
+# - post_save / post_delete of a user: profile edits, password changes
+#   (set_password() + save()), admin edits, the last_login update on login
+# - user_logged_out
+# QuerySet.update() on users sends no signal, USER_CACHE_TIMEOUT bounds it.
+#
+# An invalidation leaves a short-lived tombstone instead of deleting the
+# key, and users are stored with cache.add(): a request that read the row
+# just before a password change can't put the old one back.
+
+import copy
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, user_logged_out
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+USER_CACHE_ALIAS = getattr(settings, "USER_CACHE_ALIAS", "default")
+USER_CACHE_TIMEOUT = getattr(settings, "USER_CACHE_TIMEOUT", 60)
+
+# How long an invalidated user is read from the database only
+TOMBSTONE_TIMEOUT = 5
+_TOMBSTONE = "invalidated"
+
+
+def get_cache():
+    return caches[USER_CACHE_ALIAS]
+
+
+def user_key(user_id):
+    return f"accounts:user:{user_id}"
+
+
+def get_cached_user(user_id):
+    """
+    The cached user (password deferred), or None.
+    """
+    entry = get_cache().get(user_key(user_id))
+    if entry is None or entry == _TOMBSTONE:
+        return None
+    user, session_auth_hash = entry
+    user.get_session_auth_hash = lambda: session_auth_hash
+    return user
+
+
+def cache_user(user):
+    """
+    Store a fully loaded user without its password hash, unless it was
+    invalidated a moment ago.
+    """
+    cached = copy.copy(user)
+    del cached.password
+    get_cache().add(user_key(user.pk), (cached, user.get_session_auth_hash()), USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    get_cache().set(user_key(user_id), _TOMBSTONE, TOMBSTONE_TIMEOUT)
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache_user(user)
+        return user
+
+
+def _user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def _user_logged_out(sender, request, user, **kwargs):
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_user_changed, sender=User, dispatch_uid="accounts_user_cache_save")
+    post_delete.connect(_user_changed, sender=User, dispatch_uid="accounts_user_cache_delete")
+    user_logged_out.connect(_user_logged_out, dispatch_uid="accounts_user_cache_logout")
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.projects.membership import rebuild_member_ids
+from apps.projects.models import Project
+from apps.projects.rollups import rebuild_project_rollups
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_project_rollups [--project <id>]
+
+    Recompute the project progress rollups from the tasks collection and
+    apply the automatic status transitions, and the member ids from the
+    memberships. Use it to repair drift (e.g. tasks edited from the admin
+    panel, memberships changed with QuerySet.update()).
+    """
+
+    help = "Rebuild the progress rollup of every project (or one)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--project",
+            dest="project_id",
+            type=int,
+            help="Only rebuild the rollup of this project id.",
+        )
+
+    def handle(self, *args, **options):
+        project_id = options.get("project_id")
+
+        project_ids = None
+        if project_id is not None:
+            if not Project.objects.filter(pk=project_id).exists():
+                raise CommandError(f"Project {project_id} does not exist.")
+            project_ids = [project_id]
+
+        rebuilt = rebuild_project_rollups(project_ids)
+        rebuild_member_ids(project_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the rollup of {rebuilt} project(s)."))
@@ -0,0 +1,145 @@
+# NOTES:
+# "Which projects can this user see?" without a join per request.
+#
+# Every project keeps the ids of its owner and active members on its own
+# document (Project.member_ids, multikey index from migration 0003):
+# - "can this user open that board" is answered by the project the board
+#   loads anyway, no extra query
+# - "which projects can this user see" is one indexed query
+#   ({member_ids: user_id}), cached per user when the task cache is on
+#   (same cache and stampede guard as apps/tasks/cache.py)
+# "Tasks of all my projects" is then a single project_id $in query on
+# tasks_task_project_list_idx.
+#
+# member_ids is only written with $addToSet / $pull (Project.save() leaves
+# it alone), from the signals connected in ProjectsConfig.ready():
+# - ProjectMembership saved / deleted: add or remove that user
+# - Project saved: add the owner, remove the previous owner unless still an
+#   active member
+# - Project deleted: the memberships cascade
+# The same signals drop the cached sets. QuerySet.update() sends no signal:
+# `manage.py rebuild_project_rollups` rebuilds member_ids too.
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_save
+
+from apps.tasks.cache import delete_entries, get_or_compute
+
+from .models import Project, ProjectMembership
+
+PROJECT_CACHE_TIMEOUT = getattr(settings, "PROJECT_CACHE_TIMEOUT", 300)
+
+
+def projects_key(user_id):
+    return f"projects:visible:{user_id}"
+
+
+def load_project_ids(user_id):
+    """
+    Ids of the projects the user owns or is an active member of.
+    One query on the member_ids index.
+    """
+    docs = Project.objects.mongo_find({"member_ids": user_id}, projection={"_id": 0, "id": 1})
+    return frozenset(doc["id"] for doc in docs)
+
+
+def visible_project_ids(user_id):
+    return get_or_compute(
+        projects_key(user_id), lambda: load_project_ids(user_id), timeout=PROJECT_CACHE_TIMEOUT
+    )
+
+
+def is_project_member(project, user_id):
+    """
+    True if the user owns or is an active member of a loaded project.
+    """
+    return user_id in (project.member_ids or ())
+
+
+def invalidate_projects(*user_ids):
+    delete_entries([projects_key(user_id) for user_id in user_ids if user_id])
+
+
+# ------------ member_ids ------------
+
+def add_member(project_id, user_id):
+    Project.objects.mongo_update_one({"id": project_id}, {"$addToSet": {"member_ids": user_id}})
+
+
+def remove_member(project_id, user_id):
+    """
+    Take the user out of member_ids, unless they own the project.
+    """
+    Project.objects.mongo_update_one(
+        {"id": project_id, "owner_id": {"$ne": user_id}}, {"$pull": {"member_ids": user_id}}
+    )
+
+
+def rebuild_member_ids(project_ids=None):
+    """
+    Recompute member_ids (all projects, or project_ids) from the owners and
+    the active memberships. Returns the number of projects written.
+    """
+    projects = Project.objects.all()
+    memberships = ProjectMembership.objects.filter(is_active=True)
+    if project_ids is not None:
+        projects = projects.filter(id__in=list(project_ids))
+        memberships = memberships.filter(project_id__in=list(project_ids))
+
+    members = {}
+    for project_id, user_id in memberships.values_list("project_id", "user_id"):
+        members.setdefault(project_id, set()).add(user_id)
+
+    written = 0
+    for project_id, owner_id in projects.values_list("id", "owner_id"):
+        member_ids = sorted(members.get(project_id, set()) | {owner_id})
+        Project.objects.mongo_update_one({"id": project_id}, {"$set": {"member_ids": member_ids}})
+        invalidate_projects(*member_ids)
+        written += 1
+    return written
+
+
+# ------------ Signals ------------
+
+def _membership_saved(sender, instance, **kwargs):
+    if instance.is_active:
+        add_member(instance.project_id, instance.user_id)
+    else:
+        remove_member(instance.project_id, instance.user_id)
+    invalidate_projects(instance.user_id)
+
+
+def _membership_deleted(sender, instance, **kwargs):
+    remove_member(instance.project_id, instance.user_id)
+    invalidate_projects(instance.user_id)
+
+
+def _remember_owner(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_owner_id = (
+            Project.objects.filter(pk=instance.pk).values_list("owner_id", flat=True).first()
+        )
+
+
+def _project_saved(sender, instance, **kwargs):
+    add_member(instance.pk, instance.owner_id)
+    previous_owner_id = getattr(instance, "_previous_owner_id", None)
+    if previous_owner_id and previous_owner_id != instance.owner_id:
+        still_member = ProjectMembership.objects.filter(
+            project_id=instance.pk, user_id=previous_owner_id, is_active=True
+        ).exists()
+        if not still_member:
+            remove_member(instance.pk, previous_owner_id)
+    invalidate_projects(instance.owner_id, previous_owner_id)
+
+
+def _project_deleted(sender, instance, **kwargs):
+    invalidate_projects(instance.owner_id)
+
+
+def connect_signals():
+    post_save.connect(_membership_saved, sender=ProjectMembership, dispatch_uid="projects_membership_save")
+    post_delete.connect(_membership_deleted, sender=ProjectMembership, dispatch_uid="projects_membership_delete")
+    pre_save.connect(_remember_owner, sender=Project, dispatch_uid="projects_project_owner")
+    post_save.connect(_project_saved, sender=Project, dispatch_uid="projects_project_save")
+    post_delete.connect(_project_deleted, sender=Project, dispatch_uid="projects_project_delete")
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:23
+#
+# Progress rollup on the project document (apps/projects/rollups.py).
+# AddField writes empty counters on every project, RunPython then counts
+# the existing tasks (one aggregation) into them. Statuses are left alone,
+# `manage.py rebuild_project_rollups` applies the automatic transitions.
+
+from django.db import migrations, models
+import djongo.models.fields
+
+from apps.projects.rollups import rollup_pipeline, rollups_from_groups
+
+
+def fill_rollups(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+
+    groups = db[Task._meta.db_table].aggregate(rollup_pipeline())
+    for project_id, rollup in rollups_from_groups(groups).items():
+        db[Project._meta.db_table].update_one({"id": project_id}, {"$set": rollup})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0001_initial'),
+        ('tasks', '0013_task_project_list_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='done_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='in_progress_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='open_due',
+            field=djongo.models.fields.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='rollup_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='todo_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:49
+#
+# Project.member_ids: the owner and the active members, so access checks
+# read them with the project instead of joining the memberships
+# (apps/projects/membership.py). RunPython fills them for the existing
+# projects and creates the multikey index "projects of this user" uses.
+
+from django.db import migrations
+import djongo.models.fields
+from pymongo import UpdateOne
+
+INDEX_NAME = "projects_project_member_ids_idx"
+BATCH_SIZE = 1000
+
+
+def fill_member_ids(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    ProjectMembership = apps.get_model("projects", "ProjectMembership")
+    db = schema_editor.connection.connection
+    projects = db[Project._meta.db_table]
+
+    members = {
+        group["_id"]: group["user_ids"]
+        for group in db[ProjectMembership._meta.db_table].aggregate(
+            [
+                {"$match": {"is_active": True}},
+                {"$group": {"_id": "$project_id", "user_ids": {"$addToSet": "$user_id"}}},
+            ]
+        )
+    }
+
+    batch = []
+    for doc in projects.find({}, {"id": 1, "owner_id": 1}, batch_size=BATCH_SIZE):
+        member_ids = sorted({doc["owner_id"], *members.get(doc["id"], [])})
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": {"member_ids": member_ids}}))
+        if len(batch) >= BATCH_SIZE:
+            projects.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        projects.bulk_write(batch, ordered=False)
+
+    projects.create_index([("member_ids", 1)], name=INDEX_NAME)
+
+
+def drop_member_ids_index(apps, schema_editor):
+    Project = apps.get_model("projects", "Project")
+    schema_editor.connection.connection[Project._meta.db_table].drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_rollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='member_ids',
+            field=djongo.models.fields.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(fill_member_ids, drop_member_ids_index),
+    ]
@@ -7,9 +7,15 @@ User = get_user_model()
 # Create your models here.
 from django.db import models
 from django.contrib.auth import get_user_model
+from djongo.models import DjongoManager, JSONField
 
 User = get_user_model()
 
+# Progress rollup kept on the project document by apps/projects/rollups.py
+ROLLUP_FIELDS = ("todo_count", "in_progress_count", "done_count", "open_due", "rollup_version")
+# Fields only written with atomic updates, never by Project.save()
+MAINTAINED_FIELDS = (*ROLLUP_FIELDS, "member_ids")
+
 
 class Project(models.Model):
     # --- status choices ---
@@ -64,12 +70,58 @@ class Project(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # --- progress rollup (see rollups.py), only written with $inc ---
+    todo_count = models.IntegerField(default=0, editable=False)
+    in_progress_count = models.IntegerField(default=0, editable=False)
+    done_count = models.IntegerField(default=0, editable=False)
+    # Open tasks per due date ("YYYY-MM-DD" -> count), overdue = dates before today
+    open_due = JSONField(default=dict, blank=True, editable=False)
+    rollup_version = models.BigIntegerField(default=0, editable=False)
+
+    # Owner + active members, kept by apps/projects/membership.py with
+    # $addToSet / $pull: access checks read it with the project
+    member_ids = JSONField(default=list, blank=True, editable=False)
+
+    # mongo_* methods give us atomic $inc on the raw collection
+    objects = DjongoManager()
+
     class Meta:
         ordering = ["-created_at"]
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the status was when loaded, see save()
+        instance._loaded_status = instance.__dict__.get("status")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # The rollup (and member_ids) is kept up to date with $inc / $addToSet,
+        # saving the (possibly older) values loaded with this instance would
+        # undo them.
+        # Same for status, which the rollup moves between in_progress and
+        # completed: it is only written when it was changed on this instance.
+        # Deferred fields (.only() / .defer()) were not loaded, so they are
+        # left alone like Model.save() does.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            deferred = self.get_deferred_fields()
+            status_changed = "status" not in deferred and self.status != getattr(
+                self, "_loaded_status", self.status
+            )
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in MAINTAINED_FIELDS
+                and field.attname not in deferred
+                and (field.name != "status" or status_changed)
+            ]
+        super().save(*args, **kwargs)
+        self._loaded_status = self.__dict__.get("status")
+
 
 class ProjectMembership(models.Model):
     ROLE_PM = "PM"
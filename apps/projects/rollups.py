@@ -0,0 +1,290 @@
+# NOTES:
+# Per-project progress rollup, materialized on the project document itself:
+# - todo_count / in_progress_count / done_count
+# - open_due: open tasks per due date ({"2026-10-18": 2}), so "overdue" is
+#   the sum of the dates before today and never needs a daily rebuild.
+#   A date whose count drops to 0 is removed again, so the map only holds
+#   the dates that still have open tasks.
+# Status counts, overdue and completion % of a project card are then read
+# with the project, and an overview of N projects is one query.
+#
+# The task write paths call record_project_changes() with the same
+# (before, after) snapshots as the user stats (tasks/stats.py). Each touched
+# project gets one $inc, a task moving between projects touches both.
+#
+# Project.status follows the rollup:
+# - in_progress -> completed when every task is done
+# - completed -> in_progress when an open task shows up again
+# not_active is set by hand and never changed here. Both transitions are
+# conditional updates (the counters are checked in the filter), so they
+# stay right with concurrent writers.
+#
+# Rollups of projects that existed before are filled by migration 0002,
+# `manage.py rebuild_project_rollups` repairs drift (e.g. admin edits).
+
+import datetime
+
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+from apps.tasks.models import Task
+
+from .models import ROLLUP_FIELDS, Project
+
+OPEN_STATUSES = (Task.STATUS_TODO, Task.STATUS_IN_PROGRESS)
+
+# What apply_status_transition() needs back from an update
+TRANSITION_PROJECTION = {"_id": 0, "status": 1, "todo_count": 1, "in_progress_count": 1, "done_count": 1}
+
+# task status -> counter on the project
+STATUS_COUNTERS = {
+    Task.STATUS_TODO: "todo_count",
+    Task.STATUS_IN_PROGRESS: "in_progress_count",
+    Task.STATUS_DONE: "done_count",
+}
+
+
+def _naive_utc_now():
+    return timezone.make_naive(timezone.now(), datetime.timezone.utc)
+
+
+# ------------ Deltas ------------
+
+def _contribution(snapshot):
+    """
+    (project_id, {counter: +1}) for one task snapshot.
+    """
+    if not snapshot or not snapshot.get("project_id"):
+        return None, {}
+
+    counts = {}
+    status = snapshot.get("status")
+    if status in STATUS_COUNTERS:
+        counts[STATUS_COUNTERS[status]] = 1
+
+    due_date = snapshot.get("due_date")
+    if due_date and status in OPEN_STATUSES:
+        counts[f"open_due.{due_date.isoformat()}"] = 1
+
+    return snapshot["project_id"], counts
+
+
+def rollup_deltas(changes):
+    """
+    {project_id: {counter: delta}} for a batch of (before, after) task
+    snapshots, ready for $inc. Projects and counters that don't change are
+    left out.
+    """
+    deltas = {}
+    for before, after in changes:
+        for sign, snapshot in ((-1, before), (1, after)):
+            project_id, counts = _contribution(snapshot)
+            if project_id is None:
+                continue
+            delta = deltas.setdefault(project_id, {})
+            for counter, value in counts.items():
+                delta[counter] = delta.get(counter, 0) + sign * value
+
+    return {
+        project_id: {counter: value for counter, value in delta.items() if value}
+        for project_id, delta in deltas.items()
+        if any(delta.values())
+    }
+
+
+def touches_projects(changes):
+    """
+    True if any snapshot of the batch belongs to a project.
+    """
+    return any(
+        snapshot and snapshot.get("project_id")
+        for change in changes
+        for snapshot in change
+    )
+
+
+# ------------ Reading ------------
+
+def overdue_count(open_due, today=None):
+    today = (today or timezone.localdate()).isoformat()
+    return sum(count for day, count in (open_due or {}).items() if day < today and count > 0)
+
+
+def rollup_payload(project, today=None):
+    """
+    The card numbers of a Project (or raw project doc).
+    """
+    if not isinstance(project, dict):
+        project = {name: getattr(project, name) for name in ROLLUP_FIELDS}
+
+    todo = project.get("todo_count") or 0
+    in_progress = project.get("in_progress_count") or 0
+    done = project.get("done_count") or 0
+    total = todo + in_progress + done
+
+    return {
+        "todo": todo,
+        "in_progress": in_progress,
+        "done": done,
+        "total": total,
+        "overdue": overdue_count(project.get("open_due"), today),
+        "completion": round(done * 100 / total) if total else 0,
+    }
+
+
+# ------------ Writing ------------
+
+def apply_status_transition(project_id, doc):
+    """
+    Move the project between in_progress and completed if its counters
+    call for it. Returns the new status, or None if it didn't change.
+    """
+    open_tasks = doc.get("todo_count", 0) + doc.get("in_progress_count", 0)
+    all_done = open_tasks == 0 and doc.get("done_count", 0) > 0
+    update_one = Project.objects.mongo_update_one
+    now = _naive_utc_now()
+
+    if doc.get("status") == Project.STATUS_IN_PROGRESS and all_done:
+        result = update_one(
+            {
+                "id": project_id,
+                "status": Project.STATUS_IN_PROGRESS,
+                "todo_count": 0,
+                "in_progress_count": 0,
+                "done_count": {"$gt": 0},
+            },
+            {"$set": {"status": Project.STATUS_COMPLETED, "updated_at": now}},
+        )
+        return Project.STATUS_COMPLETED if result.modified_count else None
+
+    if doc.get("status") == Project.STATUS_COMPLETED and open_tasks > 0:
+        result = update_one(
+            {
+                "id": project_id,
+                "status": Project.STATUS_COMPLETED,
+                "$or": [{"todo_count": {"$gt": 0}}, {"in_progress_count": {"$gt": 0}}],
+            },
+            {"$set": {"status": Project.STATUS_IN_PROGRESS, "updated_at": now}},
+        )
+        return Project.STATUS_IN_PROGRESS if result.modified_count else None
+
+    return None
+
+
+def emptied_due_dates(doc, delta):
+    """
+    The open_due.<date> counters the delta decremented that are now 0.
+    """
+    open_due = doc.get("open_due") or {}
+    return [
+        counter
+        for counter, value in delta.items()
+        if counter.startswith("open_due.") and value < 0
+        and open_due.get(counter.split(".", 1)[1], 0) <= 0
+    ]
+
+
+def prune_open_due(project_id, counters):
+    """
+    $unset open_due counters that are 0. Conditional on them still being 0,
+    so a task landing on one of those dates meanwhile is kept.
+    """
+    if not counters:
+        return
+    Project.objects.mongo_update_one(
+        {"id": project_id, **{counter: {"$lte": 0} for counter in counters}},
+        {"$unset": {counter: "" for counter in counters}},
+    )
+
+
+def record_project_changes(changes):
+    """
+    Apply a batch of (before, after) task snapshots to the rollups of the
+    projects involved. Call it AFTER the task writes.
+    """
+    for project_id, delta in rollup_deltas(changes).items():
+        # Read back the dates that went down, to drop the ones now at 0
+        decremented = {
+            counter: 1
+            for counter, value in delta.items()
+            if counter.startswith("open_due.") and value < 0
+        }
+        doc = Project.objects.mongo_find_one_and_update(
+            {"id": project_id},
+            {"$inc": {**delta, "rollup_version": 1}},
+            projection={**TRANSITION_PROJECTION, **decremented},
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            apply_status_transition(project_id, doc)
+            prune_open_due(project_id, emptied_due_dates(doc, delta))
+
+
+# ------------ Rebuild ------------
+
+def rollup_pipeline(project_ids=None):
+    """
+    Aggregation counting the tasks of projects (all of them, or
+    project_ids) per (project_id, status, due_date), see rollups_from_groups().
+    """
+    match = {"project_id": {"$in": list(project_ids)} if project_ids is not None else {"$ne": None}}
+    return [
+        {"$match": match},
+        {
+            "$group": {
+                "_id": {"project_id": "$project_id", "status": "$status", "due_date": "$due_date"},
+                "count": {"$sum": 1},
+            }
+        },
+    ]
+
+
+def rollups_from_groups(groups):
+    """
+    {project_id: {todo_count, in_progress_count, done_count, open_due}} from
+    the rollup_pipeline() results.
+    """
+    rollups = {}
+    for group in groups:
+        key = group["_id"]
+        rollup = rollups.setdefault(
+            key["project_id"],
+            {"todo_count": 0, "in_progress_count": 0, "done_count": 0, "open_due": {}},
+        )
+        counter = STATUS_COUNTERS.get(key.get("status"))
+        if counter:
+            rollup[counter] += group["count"]
+        if key.get("due_date") and key.get("status") in OPEN_STATUSES:
+            day = key["due_date"].date().isoformat()
+            rollup["open_due"][day] = rollup["open_due"].get(day, 0) + group["count"]
+    return rollups
+
+
+def rebuild_project_rollups(project_ids=None):
+    """
+    Recompute the rollups (all projects, or project_ids) from the tasks and
+    store them (open_due is replaced, which drops any leftover 0 dates).
+    Returns the number of projects written.
+    """
+    if project_ids is not None and not project_ids:
+        return 0
+
+    groups = Task.objects.mongo_aggregate(rollup_pipeline(project_ids))
+    rollups = rollups_from_groups(groups)
+
+    if project_ids is None:
+        project_ids = Project.objects.values_list("id", flat=True)
+
+    written = 0
+    empty = {"todo_count": 0, "in_progress_count": 0, "done_count": 0, "open_due": {}}
+    for project_id in project_ids:
+        doc = Project.objects.mongo_find_one_and_update(
+            {"id": project_id},
+            {"$set": rollups.get(project_id, empty), "$inc": {"rollup_version": 1}},
+            projection=TRANSITION_PROJECTION,
+            return_document=ReturnDocument.AFTER,
+        )
+        if doc is not None:
+            apply_status_transition(project_id, doc)
+            written += 1
+    return written
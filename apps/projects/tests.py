@@ -1,3 +1,259 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.test import SimpleTestCase, TestCase, tag
+from django.urls import reverse
+
+from apps.tasks.cache import get_cache
+from apps.tasks.models import Task
+
+from . import membership
+from .membership import is_project_member, visible_project_ids
+from .models import Project, ProjectMembership
+from .rollups import (
+    apply_status_transition,
+    record_project_changes,
+    rollup_deltas,
+    rollup_payload,
+    rollups_from_groups,
+)
+
+User = get_user_model()
+
+
+class MembershipCacheTests(SimpleTestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_project_ids_are_loaded_once(self):
+        with mock.patch.object(membership, "load_project_ids", return_value=frozenset({3, 4})) as load:
+            self.assertEqual(visible_project_ids(1), {3, 4})
+            self.assertEqual(visible_project_ids(1), {3, 4})
+
+        load.assert_called_once_with(1)
+
+    def test_project_ids_come_from_member_ids(self):
+        with mock.patch.object(Project, "objects") as objects:
+            objects.mongo_find.return_value = [{"id": 3}, {"id": 4}]
+            self.assertEqual(membership.load_project_ids(1), {3, 4})
+
+        self.assertEqual(objects.mongo_find.call_args[0][0], {"member_ids": 1})
+
+    @mock.patch.object(Project, "objects")
+    def test_membership_changes_update_member_ids_and_invalidate(self, objects):
+        with mock.patch.object(membership, "load_project_ids", return_value=frozenset({3})):
+            visible_project_ids(1)
+
+        row = ProjectMembership(user_id=1, project_id=5)
+        with mock.patch.object(membership, "load_project_ids", return_value=frozenset({3, 5})):
+            post_save.send(sender=ProjectMembership, instance=row, created=True)
+            self.assertEqual(visible_project_ids(1), {3, 5})
+        objects.mongo_update_one.assert_called_with({"id": 5}, {"$addToSet": {"member_ids": 1}})
+
+        post_delete.send(sender=ProjectMembership, instance=row)
+        # The owner keeps access whatever happens to their membership
+        objects.mongo_update_one.assert_called_with(
+            {"id": 5, "owner_id": {"$ne": 1}}, {"$pull": {"member_ids": 1}}
+        )
+        with mock.patch.object(membership, "load_project_ids", return_value=frozenset({3})):
+            self.assertEqual(visible_project_ids(1), {3})
+
+    def test_board_access_reads_the_loaded_project(self):
+        project = Project(pk=5, owner_id=1, member_ids=[1, 2])
+
+        self.assertTrue(is_project_member(project, 2))
+        self.assertFalse(is_project_member(project, 3))
+
+
+class RollupTests(SimpleTestCase):
+    due = datetime.date(2026, 10, 15)
+
+    def snapshot(self, status, project_id=1, due_date=None):
+        return {"status": status, "due_date": due_date, "project_id": project_id}
+
+    def test_status_change_and_move_between_projects(self):
+        todo = self.snapshot(Task.STATUS_TODO, due_date=self.due)
+        done = self.snapshot(Task.STATUS_DONE, due_date=self.due)
+        moved = self.snapshot(Task.STATUS_TODO, project_id=2, due_date=self.due)
+
+        self.assertEqual(
+            rollup_deltas([(todo, done)]),
+            {1: {"todo_count": -1, "done_count": 1, "open_due.2026-10-15": -1}},
+        )
+        self.assertEqual(
+            rollup_deltas([(todo, moved)]),
+            {1: {"todo_count": -1, "open_due.2026-10-15": -1}, 2: {"todo_count": 1, "open_due.2026-10-15": 1}},
+        )
+        # Personal tasks and no-op updates touch nothing
+        self.assertEqual(rollup_deltas([(None, self.snapshot(Task.STATUS_TODO, project_id=None))]), {})
+        self.assertEqual(rollup_deltas([(todo, dict(todo))]), {})
+
+    def test_payload_counts_overdue_before_today(self):
+        project = {
+            "todo_count": 2,
+            "in_progress_count": 1,
+            "done_count": 1,
+            "open_due": {"2026-10-14": 1, "2026-10-15": 0, "2026-10-18": 2},
+        }
+
+        payload = rollup_payload(project, today=datetime.date(2026, 10, 18))
+
+        self.assertEqual(payload["total"], 4)
+        self.assertEqual(payload["overdue"], 1)
+        self.assertEqual(payload["completion"], 25)
+
+    def test_rebuild_groups(self):
+        groups = [
+            {"_id": {"project_id": 1, "status": "todo", "due_date": datetime.datetime(2026, 10, 15)}, "count": 2},
+            {"_id": {"project_id": 1, "status": "done", "due_date": datetime.datetime(2026, 10, 15)}, "count": 1},
+            {"_id": {"project_id": 1, "status": "in_progress", "due_date": None}, "count": 3},
+        ]
+
+        self.assertEqual(
+            rollups_from_groups(groups),
+            {1: {"todo_count": 2, "in_progress_count": 3, "done_count": 1, "open_due": {"2026-10-15": 2}}},
+        )
+
+    def test_status_transitions(self):
+        with mock.patch.object(Project, "objects") as objects:
+            update_one = objects.mongo_update_one
+            update_one.return_value.modified_count = 1
+            done = {"status": "in_progress", "todo_count": 0, "in_progress_count": 0, "done_count": 3}
+            self.assertEqual(apply_status_transition(1, done), Project.STATUS_COMPLETED)
+
+            reopened = {"status": "completed", "todo_count": 1, "in_progress_count": 0, "done_count": 3}
+            self.assertEqual(apply_status_transition(1, reopened), Project.STATUS_IN_PROGRESS)
+
+            paused = {"status": "not_active", "todo_count": 0, "in_progress_count": 0, "done_count": 3}
+            self.assertIsNone(apply_status_transition(1, paused))
+
+        self.assertEqual(update_one.call_count, 2)
+
+    def test_save_only_writes_status_when_changed(self):
+        project = Project.from_db("default", ["id", "name", "status"], [1, "Launch", Project.STATUS_COMPLETED])
+
+        with mock.patch.object(models.Model, "save") as save:
+            project.name = "Launch v2"
+            project.save()
+            self.assertNotIn("status", save.call_args[1]["update_fields"])
+            self.assertNotIn("done_count", save.call_args[1]["update_fields"])
+
+            project.status = Project.STATUS_NOT_ACTIVE
+            project.save()
+            self.assertIn("status", save.call_args[1]["update_fields"])
+
+    def test_save_leaves_deferred_fields_alone(self):
+        # e.g. Project.objects.only("id", "name"): status was never loaded
+        project = Project.from_db("default", ["id", "name"], [1, "Launch"])
+
+        with mock.patch.object(models.Model, "save") as save:
+            project.name = "Launch v2"
+            project.save()
+            self.assertEqual(save.call_args[1]["update_fields"], ["name"])
+
+            project.status = Project.STATUS_NOT_ACTIVE
+            project.save()
+            self.assertEqual(save.call_args[1]["update_fields"], ["name", "status"])
+
+    def test_emptied_due_dates_are_unset(self):
+        todo = self.snapshot(Task.STATUS_TODO, due_date=self.due)
+        done = self.snapshot(Task.STATUS_DONE, due_date=self.due)
+
+        with mock.patch.object(Project, "objects") as objects:
+            objects.mongo_find_one_and_update.return_value = {
+                "status": "not_active",
+                "open_due": {"2026-10-15": 0},
+            }
+            record_project_changes([(todo, done)])
+
+        projection = objects.mongo_find_one_and_update.call_args[1]["projection"]
+        self.assertEqual(projection["open_due.2026-10-15"], 1)
+        objects.mongo_update_one.assert_called_once_with(
+            {"id": 1, "open_due.2026-10-15": {"$lte": 0}},
+            {"$unset": {"open_due.2026-10-15": ""}},
+        )
+
+
+# ------------ Board API (needs MongoDB) ------------
+@tag("db")
+class ProjectBoardApiTests(TestCase):
+    def setUp(self):
+        get_cache().clear()
+        self.owner = User.objects.create_user("owner", password="pass12345")
+        self.member = User.objects.create_user("member", password="pass12345")
+        self.outsider = User.objects.create_user("outsider", password="pass12345")
+
+        self.project = Project.objects.create(name="Launch", owner=self.owner)
+        ProjectMembership.objects.create(user=self.member, project=self.project)
+        for title in ("Spec", "Build"):
+            Task.objects.create(
+                title=title,
+                task_type=Task.TYPE_PROJECT,
+                project=self.project,
+                created_by=self.owner,
+                assignee=self.owner,
+            )
+
+    def test_member_sees_the_board(self):
+        self.client.force_login(self.member)
+        response = self.client.get(reverse("projects:api_board", args=[self.project.pk]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["project"]["name"], "Launch")
+        self.assertEqual(len(response.json()["tasks"]), 2)
+
+        response = self.client.get(reverse("projects:api_my_tasks"))
+        self.assertEqual(len(response.json()["tasks"]), 2)
+
+    def test_completing_the_last_task_completes_the_project(self):
+        self.client.force_login(self.owner)
+        for task in Task.objects.filter(project=self.project):
+            self.client.post(reverse("tasks:api_mark_complete", args=[task.public_id]))
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.status, Project.STATUS_COMPLETED)
+        self.assertEqual(self.project.done_count, 2)
+
+        response = self.client.get(reverse("projects:api_overview"))
+        self.assertEqual(response.json()["projects"][0]["progress"]["completion"], 100)
+
+    def test_tasks_move_between_projects_through_the_api(self):
+        self.client.force_login(self.member)
+        response = self.client.post(
+            reverse("tasks:api_create"),
+            data={"title": "Docs", "project": self.project.pk, "due_date": "2026-10-01"},
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["task"]["project"]["name"], "Launch")
+
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.todo_count, 3)
+        self.assertEqual(self.project.open_due, {"2026-10-01": 1})
+
+        public_id = response.json()["task"]["id"]
+        self.client.post(
+            reverse("tasks:api_update", args=[public_id]),
+            data={"title": "Docs", "project": ""},
+        )
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.todo_count, 2)
+        self.assertEqual(self.project.open_due, {})
+
+        self.client.force_login(self.outsider)
+        response = self.client.post(
+            reverse("tasks:api_create"), data={"title": "Spam", "project": self.project.pk}
+        )
+        self.assertEqual(response.json()["errors"], {"project": "Unknown project."})
+
+    def test_outsider_and_removed_member_get_404(self):
+        self.client.force_login(self.outsider)
+        url = reverse("projects:api_board", args=[self.project.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        ProjectMembership.objects.get(user=self.member).delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,15 @@
+from django.urls import path
+from . import views
+
+app_name = "projects"
+
+urlpatterns = [
+    # Tasks of every project the user owns or is a member of
+    path("api/tasks/", views.MyProjectTasksApiView.as_view(), name="api_my_tasks"),
+
+    # Project cards with their progress
+    path("api/projects/", views.ProjectOverviewApiView.as_view(), name="api_overview"),
+
+    # One project's board
+    path("api/projects/<int:project_id>/tasks/", views.ProjectBoardApiView.as_view(), name="api_board"),
+]
@@ -1,3 +1,119 @@
-from django.shortcuts import render
+# NOTES:
+# Project API (JSON): progress cards and task boards, for any owner or
+# active member of a project.
+# - access comes from the member ids stored on the project (membership.py),
+#   never from a membership join per request
+# - a project's board and "tasks of all my projects" are one project_id
+#   query each, sorted and keyset-paginated like the task list, served by
+#   tasks_task_project_list_idx
+# Projects the user can't see answer 404, same as a missing one.
+#
+# Project cards carry their progress rollup (rollups.py), read with the
+# project itself: the overview of all the user's projects is one query.
 
-# Create your views here.
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import JsonResponse
+from django.views import View
+
+from apps.tasks.models import Task
+from apps.tasks.pagination import InvalidCursor, paginate_tasks, parse_limit
+from apps.tasks.views import TASK_PAYLOAD_FIELDS, serialize_tasks
+
+from .membership import is_project_member, visible_project_ids
+from .models import ROLLUP_FIELDS, Project
+from .rollups import rollup_payload
+
+PROJECT_CARD_FIELDS = ("id", "name", "status", "priority", "due_date", *ROLLUP_FIELDS)
+
+
+def project_payload(project):
+    return {
+        "id": project.pk,
+        "name": project.name,
+        "status": project.status,
+        "priority": project.priority,
+        "due_date": project.due_date.isoformat() if project.due_date else None,
+        "progress": rollup_payload(project),
+    }
+
+
+def task_page_response(request, qs, **extra):
+    """
+    One page of `qs` (optionally ?status=) as the task list API sends it.
+    """
+    cursor = request.GET.get("cursor") or None
+    limit = parse_limit(request.GET.get("limit"))
+
+    status = request.GET.get("status")
+    if status in dict(Task.STATUS_CHOICES):
+        qs = qs.filter(status=status)
+
+    try:
+        tasks, next_cursor = paginate_tasks(
+            qs.only(*TASK_PAYLOAD_FIELDS), cursor=cursor, limit=limit
+        )
+    except InvalidCursor:
+        return JsonResponse({"ok": False, "error": "Invalid cursor."}, status=400)
+
+    return JsonResponse(
+        {
+            "ok": True,
+            **extra,
+            "tasks": serialize_tasks(tasks, known_users=[request.user]),
+            "next": next_cursor,
+        }
+    )
+
+
+class ProjectOverviewApiView(LoginRequiredMixin, View):
+    """
+    GET /projects/api/projects/
+    Every project the user can see, with its progress (status counts,
+    overdue tasks, completion %), newest first.
+    """
+
+    def get(self, request):
+        project_ids = visible_project_ids(request.user.pk)
+        if not project_ids:
+            return JsonResponse({"ok": True, "projects": []})
+
+        projects = Project.objects.filter(id__in=sorted(project_ids)).only(*PROJECT_CARD_FIELDS)
+        return JsonResponse({"ok": True, "projects": [project_payload(p) for p in projects]})
+
+
+class ProjectBoardApiView(LoginRequiredMixin, View):
+    """
+    GET /projects/api/projects/<project_id>/tasks/?status=&limit=&cursor=
+    The project and one page of its tasks, whoever created them.
+    """
+
+    def get(self, request, project_id):
+        project = (
+            Project.objects.only(*PROJECT_CARD_FIELDS, "member_ids")
+            .filter(pk=project_id)
+            .first()
+        )
+        if project is None or not is_project_member(project, request.user.pk):
+            return JsonResponse({"ok": False, "error": "Project not found."}, status=404)
+
+        return task_page_response(
+            request,
+            Task.objects.filter(project_id=project_id),
+            project=project_payload(project),
+        )
+
+
+class MyProjectTasksApiView(LoginRequiredMixin, View):
+    """
+    GET /projects/api/tasks/?status=&limit=&cursor=
+    One page of the tasks of every project the user can see, in one query.
+    """
+
+    def get(self, request):
+        project_ids = visible_project_ids(request.user.pk)
+        if not project_ids:
+            return JsonResponse({"ok": True, "tasks": [], "next": None})
+
+        return task_page_response(
+            request, Task.objects.filter(project_id__in=sorted(project_ids))
+        )
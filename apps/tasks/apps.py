@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tasks'
+
+    def ready(self):
+        from .versions import connect_signals
+
+        connect_signals()
@@ -0,0 +1,564 @@
+# NOTES:
+# Async versions of the task and tip JSON endpoints, for the ASGI deployment
+# (core/asgi.py, e.g. `uvicorn core.asgi:application`).
+#
+# Same JSON as the sync views in views.py, under /tasks/api/async/. Every
+# Mongo call is awaited (core.db_backend.aio), so while a request waits on
+# Atlas the event loop keeps serving other requests instead of parking a
+# whole Django worker thread. Auth and session are loaded the same way
+# (apps/accounts/async_auth.py).
+#
+# Validation, raw documents, search filters and payloads are the same
+# helpers the sync views use; only the I/O is different. The rare stats
+# rebuild (first request of the day / week) still runs the ORM, in a thread,
+# and so does the stats write after a task change: its retry loop is
+# stats.record_task_changes() itself, run on the same I/O pool.
+#
+# Under plain WSGI keep using the sync endpoints, there every async view would
+# run in its own short-lived event loop.
+
+import functools
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import (
+    Http404,
+    HttpResponseNotAllowed,
+    HttpResponseNotModified,
+    JsonResponse,
+)
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, quote_etag
+from pymongo import ReturnDocument
+
+from apps.accounts.async_auth import async_login_required
+from apps.projects.models import Project
+from core.db_backend.aio import async_database, run_io
+
+from .bulk import (
+    id_counter_update,
+    insert_document,
+    instance_from_document,
+    reserved_ids,
+    update_document,
+)
+from .cache import invalidate_saved_tips, invalidate_tasks
+from .events import (
+    EVENTS_COLLECTION,
+    FIRE_AND_FORGET,
+    event_document,
+    task_event,
+)
+from .models import Task, TaskStats, Tip
+from .pagination import (
+    InvalidCursor,
+    TASK_LIST_SORT,
+    TIP_LIST_SORT,
+    TIPS_PAGE_SIZE,
+    encode_cursor,
+    encode_tip_cursor,
+    mongo_filter_after_cursor,
+    mongo_filter_after_tip_cursor,
+    parse_limit,
+)
+from .search import build_search_terms, query_terms
+from .stats import (
+    record_task_changes,
+    refresh_stale_stats,
+    serialize_stats,
+    stats_doc_is_current,
+    task_set_version,
+    task_snapshot,
+)
+from .validation import clean_task_create, clean_task_update
+from .views import (
+    TASK_WRITE_PROJECTION,
+    User,
+    clean_tip,
+    complete_task_update,
+    completed_task,
+    parse_request_data,
+    project_ids_for,
+    random_tip_response,
+    search_page,
+    search_queries,
+    task_etag,
+    task_payload,
+    tip_payload,
+)
+
+logger = logging.getLogger(__name__)
+
+TASKS = Task._meta.db_table
+TASK_STATS = TaskStats._meta.db_table
+USERS = User._meta.db_table
+PROJECTS = Project._meta.db_table
+TIPS = Tip._meta.db_table
+
+# The search index arrays are never sent to the frontend
+TASK_DOC_PROJECTION = TASK_WRITE_PROJECTION
+
+
+# ------------ Helpers ------------
+
+def allow_methods(*methods):
+    """
+    require_http_methods() for async views (Django 3.2's decorator
+    wraps the view in a sync function).
+    """
+
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _tasks(docs):
+    return [instance_from_document(Task, doc) for doc in docs]
+
+
+async def aserialize_tasks(db, tasks, user):
+    """
+    Async serialize_tasks(): related users / projects in one query each,
+    none at all for personal tasks of the current user.
+    """
+    users = {user.pk: user}
+    missing_user_ids = {
+        user_id
+        for task in tasks
+        for user_id in (task.created_by_id, task.assignee_id)
+        if user_id and user_id not in users
+    }
+    if missing_user_ids:
+        docs = await db[USERS].find(
+            {"id": {"$in": list(missing_user_ids)}},
+            projection={"_id": 0, "id": 1, "username": 1},
+        )
+        for doc in docs:
+            users[doc["id"]] = instance_from_document(User, doc)
+
+    projects = {}
+    project_ids = {task.project_id for task in tasks if task.project_id}
+    if project_ids:
+        docs = await db[PROJECTS].find(
+            {"id": {"$in": list(project_ids)}},
+            projection={"_id": 0, "id": 1, "name": 1},
+        )
+        for doc in docs:
+            projects[doc["id"]] = instance_from_document(Project, doc)
+
+    return [
+        task_payload(
+            task,
+            users.get(task.created_by_id),
+            users.get(task.assignee_id),
+            projects.get(task.project_id),
+        )
+        for task in tasks
+    ]
+
+
+async def aget_stats_doc(db, user_id):
+    doc = await db[TASK_STATS].find_one({"user_id": user_id})
+    if stats_doc_is_current(doc):
+        return doc
+    refreshed = await sync_to_async(refresh_stale_stats, thread_sensitive=False)(user_id, doc)
+    if refreshed is not None:
+        return refreshed
+    return await db[TASK_STATS].find_one({"user_id": user_id})
+
+
+# The cache backends are blocking (locmem / memcached)
+ainvalidate_tasks = sync_to_async(invalidate_tasks, thread_sensitive=False)
+ainvalidate_saved_tips = sync_to_async(invalidate_saved_tips, thread_sensitive=False)
+
+
+async def arecord_task_changes(user_id, changes):
+    """
+    stats.record_task_changes() (rollups, $inc and its retries) as one
+    trip to the I/O pool.
+    """
+    return await run_io(record_task_changes, user_id, changes)
+
+
+async def apublish_task_events(db, user_id, events, stats_doc):
+    """
+    Async publish_task_events(), also best effort.
+    """
+    try:
+        await db[EVENTS_COLLECTION].with_options(write_concern=FIRE_AND_FORGET).insert_one(
+            event_document(user_id, events, stats_doc)
+        )
+    except Exception:
+        logger.warning("Could not publish task events for user %s.", user_id, exc_info=True)
+
+
+def _is_fresh(request, etag):
+    """
+    True if the client already has the payload with this ETag.
+    """
+    return quote_etag(etag) in parse_etags(request.headers.get("If-None-Match", ""))
+
+
+def _with_etag(response, etag):
+    # Same headers as the sync views (condition() + revalidate)
+    response["ETag"] = quote_etag(etag)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# ------------ Tasks ------------
+
+@async_login_required
+@allow_methods("GET")
+async def task_list(request):
+    """
+    GET /tasks/api/async/tasks/?status=&q=&limit=&cursor=
+    Async TaskListApiView.
+    """
+    user = request.user
+    cursor = request.GET.get("cursor") or None
+    limit = parse_limit(request.GET.get("limit"))
+
+    status = request.GET.get("status")
+    if status not in dict(Task.STATUS_CHOICES):
+        status = None
+
+    async with async_database() as db:
+        stats_doc = await aget_stats_doc(db, user.pk)
+        etag = task_etag(user, task_set_version(stats_doc), sorted(request.GET.lists()))
+        if _is_fresh(request, etag):
+            return _with_etag(HttpResponseNotModified(), etag)
+
+        terms = query_terms(request.GET.get("q"))
+        next_cursor = None
+
+        if terms:
+            try:
+                queries = search_queries(user.pk, terms, status=status, cursor=cursor)
+            except InvalidCursor:
+                return JsonResponse({"ok": False, "error": "Invalid cursor."}, status=400)
+
+            ranked = []
+            for tier, query in queries:
+                docs = await db[TASKS].find(
+                    query,
+                    projection=TASK_DOC_PROJECTION,
+                    sort=TASK_LIST_SORT,
+                    limit=limit + 1 - len(ranked),
+                )
+                ranked += [(tier, task) for task in _tasks(docs)]
+                if len(ranked) > limit:
+                    break
+            tasks, next_cursor = search_page(ranked, limit)
+        else:
+            query = {"created_by_id": user.pk}
+            if status:
+                query["status"] = status
+            if cursor:
+                try:
+                    query = {"$and": [query, mongo_filter_after_cursor(cursor)]}
+                except InvalidCursor:
+                    return JsonResponse({"ok": False, "error": "Invalid cursor."}, status=400)
+
+            docs = await db[TASKS].find(
+                query,
+                projection=TASK_DOC_PROJECTION,
+                sort=TASK_LIST_SORT,
+                limit=limit + 1,
+            )
+            tasks = _tasks(docs[:limit])
+            if len(docs) > limit and tasks:
+                next_cursor = encode_cursor(tasks[-1])
+
+        tasks_data = await aserialize_tasks(db, tasks, user)
+
+    payload = {"tasks": tasks_data, "count": len(tasks_data), "next": next_cursor}
+    if not cursor:
+        payload["stats"] = serialize_stats(stats_doc)
+
+    return _with_etag(JsonResponse(payload), etag)
+
+
+@async_login_required
+@allow_methods("GET")
+async def task_detail(request, pk):
+    """
+    GET /tasks/api/async/tasks/<public_id>/
+    Async TaskDetailApiView.
+    """
+    user = request.user
+
+    async with async_database() as db:
+        stats_doc = await aget_stats_doc(db, user.pk)
+        etag = task_etag(user, task_set_version(stats_doc), "detail", pk)
+        if _is_fresh(request, etag):
+            return _with_etag(HttpResponseNotModified(), etag)
+
+        doc = await db[TASKS].find_one(
+            {"created_by_id": user.pk, "public_id": pk},
+            projection=TASK_DOC_PROJECTION,
+        )
+        if doc is None:
+            raise Http404("Task not found")
+
+        task_data = (await aserialize_tasks(db, _tasks([doc]), user))[0]
+
+    return _with_etag(JsonResponse({"ok": True, "task": task_data}), etag)
+
+
+@async_login_required
+@allow_methods("POST")
+async def task_create(request):
+    """
+    POST /tasks/api/async/tasks/create/
+    Async TaskCreateApiView.
+    """
+    user = request.user
+
+    data = parse_request_data(request)
+    project_ids = await sync_to_async(project_ids_for, thread_sensitive=False)(user, data)
+    fields, errors = clean_task_create(data, project_ids)
+    if errors:
+        return JsonResponse({"success": False, "errors": errors}, status=400)
+
+    task = Task(**fields, created_by=user, assignee=user)
+    task.public_id = str(task.public_id)
+    task.refresh_search_terms()
+
+    async with async_database() as db:
+        counter = await db["__schema__"].find_one_and_update(
+            *id_counter_update(Task, 1), return_document=ReturnDocument.AFTER
+        )
+        task.pk = reserved_ids(counter, 1)[0]
+
+        await db[TASKS].insert_one(insert_document(task))
+        after = task_snapshot(task)
+        stats_doc = await arecord_task_changes(user.pk, [(None, after)])
+        await ainvalidate_tasks(user.pk)
+
+        task_data = (await aserialize_tasks(db, [task], user))[0]
+        await apublish_task_events(db, user.pk, [task_event(None, after, task_data)], stats_doc)
+
+    return JsonResponse({"success": True, "task": task_data}, status=201)
+
+
+async def _update_task(db, user, public_id, values, extra_filter=None):
+    """
+    Async update_task_atomically(): one find_one_and_update.
+    Returns (before, after) Task instances, or (None, None).
+    """
+    changes = update_document(Task, values)
+    doc = await db[TASKS].find_one_and_update(
+        {"created_by_id": user.pk, "public_id": public_id, **(extra_filter or {})},
+        {"$set": changes},
+        projection=TASK_DOC_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if doc is None:
+        return None, None
+    return (
+        instance_from_document(Task, doc),
+        instance_from_document(Task, {**doc, **changes}),
+    )
+
+
+@async_login_required
+@allow_methods("POST")
+async def task_mark_complete(request, public_id):
+    """
+    POST /tasks/api/async/tasks/<public_id>/complete/
+    Async TaskMarkCompleteApiView.
+    """
+    user = request.user
+    now = timezone.now()
+
+    async with async_database() as db:
+        # One round trip, also when the task is already done
+        pipeline, changes = complete_task_update(now)
+        doc = await db[TASKS].find_one_and_update(
+            {"created_by_id": user.pk, "public_id": public_id},
+            pipeline,
+            projection=TASK_DOC_PROJECTION,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if doc is None:
+            return JsonResponse({"ok": False, "error": "Task not found."}, status=404)
+
+        before, task = completed_task(doc, changes)
+        if task is before:
+            # Already done, nothing was written
+            task_data = (await aserialize_tasks(db, [task], user))[0]
+            return JsonResponse({"ok": True, "task": task_data})
+
+        before, after = task_snapshot(before), task_snapshot(task)
+        stats_doc = await arecord_task_changes(user.pk, [(before, after)])
+        await ainvalidate_tasks(user.pk, [public_id])
+
+        task_data = (await aserialize_tasks(db, [task], user))[0]
+        await apublish_task_events(db, user.pk, [task_event(before, after, task_data)], stats_doc)
+
+    return JsonResponse({"ok": True, "task": task_data})
+
+
+@async_login_required
+@allow_methods("POST")
+async def task_update(request, public_id):
+    """
+    POST /tasks/api/async/tasks/<public_id>/update/
+    Async TaskUpdateApiView.
+    """
+    user = request.user
+
+    data = parse_request_data(request)
+    project_ids = await sync_to_async(project_ids_for, thread_sensitive=False)(user, data)
+    fields, errors = clean_task_update(data, project_ids)
+    if errors:
+        return JsonResponse({"success": False, "errors": errors}, status=400)
+
+    search_terms, title_terms = build_search_terms(fields["title"], fields["description"])
+
+    async with async_database() as db:
+        before, task = await _update_task(
+            db,
+            user,
+            public_id,
+            {
+                **fields,
+                "search_terms": search_terms,
+                "title_terms": title_terms,
+                "updated_at": timezone.now(),
+            },
+        )
+        if task is None:
+            return JsonResponse(
+                {"success": False, "errors": {"__all__": "Task not found."}},
+                status=404,
+            )
+
+        before, after = task_snapshot(before), task_snapshot(task)
+        stats_doc = await arecord_task_changes(user.pk, [(before, after)])
+        await ainvalidate_tasks(user.pk, [public_id])
+
+        task_data = (await aserialize_tasks(db, [task], user))[0]
+        await apublish_task_events(db, user.pk, [task_event(before, after, task_data)], stats_doc)
+
+    return JsonResponse({"success": True, "task": task_data})
+
+
+@async_login_required
+@allow_methods("DELETE", "POST")
+async def task_delete(request, public_id):
+    """
+    DELETE (or POST) /tasks/api/async/tasks/<public_id>/delete/
+    Async TaskDeleteApiView.
+    """
+    user = request.user
+
+    async with async_database() as db:
+        doc = await db[TASKS].find_one_and_delete(
+            {"created_by_id": user.pk, "public_id": public_id},
+            projection={"_id": 0, "status": 1, "due_date": 1, "created_at": 1, "project_id": 1},
+        )
+        if doc is None:
+            return JsonResponse({"ok": False, "error": "Task not found."}, status=404)
+
+        before = task_snapshot(instance_from_document(Task, doc))
+        stats_doc = await arecord_task_changes(user.pk, [(before, None)])
+        await ainvalidate_tasks(user.pk, [public_id])
+        await apublish_task_events(
+            db, user.pk, [task_event(before, None, public_id=public_id)], stats_doc
+        )
+
+    return JsonResponse({"ok": True, "id": public_id})
+
+
+# ------------ Tips ------------
+
+@async_login_required
+@allow_methods("GET")
+async def get_tip(request):
+    """
+    GET /tasks/api/async/tip/?category=<name>&exclude=<key>,<key>
+    Async get_tip (no I/O at all, same response).
+    """
+    return random_tip_response(request)
+
+
+@async_login_required
+@allow_methods("GET")
+async def saved_tips(request):
+    """
+    GET /tasks/api/async/tip/saved/?cursor=&limit=
+    Async saved_tips.
+    """
+    limit = parse_limit(request.GET.get("limit"), default=TIPS_PAGE_SIZE)
+    query = {"user_id": request.user.pk}
+
+    cursor = request.GET.get("cursor") or None
+    if cursor:
+        try:
+            query = {"$and": [query, mongo_filter_after_tip_cursor(cursor)]}
+        except InvalidCursor:
+            return JsonResponse({"ok": False, "error": "Invalid cursor."}, status=400)
+
+    async with async_database() as db:
+        docs = await db[TIPS].find(query, sort=TIP_LIST_SORT, limit=limit + 1)
+
+    tips = [instance_from_document(Tip, doc) for doc in docs[:limit]]
+    next_cursor = encode_tip_cursor(tips[-1]) if len(docs) > limit and tips else None
+
+    return JsonResponse(
+        {"ok": True, "tips": [tip_payload(tip) for tip in tips], "next": next_cursor}
+    )
+
+
+@async_login_required
+@allow_methods("POST")
+async def save_tip(request):
+    """
+    POST /tasks/api/async/tip/save/
+    Async save_tip.
+    """
+    text, category = clean_tip(request)
+
+    if not text:
+        return JsonResponse({"ok": False, "error": "Tip text is required."}, status=400)
+
+    tip = Tip(user=request.user, text=text, category=category)
+
+    async with async_database() as db:
+        counter = await db["__schema__"].find_one_and_update(
+            *id_counter_update(Tip, 1), return_document=ReturnDocument.AFTER
+        )
+        tip.pk = reserved_ids(counter, 1)[0]
+        await db[TIPS].insert_one(insert_document(tip))
+
+    await ainvalidate_saved_tips(request.user.pk)
+
+    return JsonResponse({"ok": True, "tip": tip_payload(tip)}, status=201)
+
+
+@async_login_required
+@allow_methods("POST")
+async def delete_tip(request, tip_id):
+    """
+    POST /tasks/api/async/tip/<tip_id>/delete/
+    Async delete_tip.
+    """
+    async with async_database() as db:
+        result = await db[TIPS].delete_one({"id": tip_id, "user_id": request.user.pk})
+
+    await ainvalidate_saved_tips(request.user.pk)
+
+    if result.deleted_count == 0:
+        return JsonResponse({"ok": False, "error": "Tip not found."}, status=404)
+
+    return JsonResponse({"ok": True})
@@ -0,0 +1,602 @@
+# NOTES:
+# Reproducible benchmark of the task and tip APIs, used by the
+# seed_benchmark and run_benchmark management commands.
+#
+# - seed_benchmark_data(): fake users, projects, memberships, tasks and tips,
+#   all derived from one random seed. Documents are built with the bulk.py
+#   helpers (same shape as an ORM save) and written with insert_many in
+#   batches, so even 1M tasks seed in minutes. Benchmark usernames start with
+#   BENCH_PREFIX, clear_benchmark_data() removes all of it again.
+# - build_workload(): a fixed list of requests over the dashboard, task list
+#   (filter / search), detail, create, update, complete and tip endpoints.
+#   The same seed always gives the same requests.
+# - run_workload(): replays it one request at a time through a transport
+#   (Django's test client in-process, or HTTP against a running server) and
+#   records the latency and the MongoDB commands of every request.
+# - results are JSON files under BENCHMARK_RESULTS_DIR, one per run, tagged
+#   with the git commit. compare_results() diffs two runs.
+
+import datetime
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import time
+import uuid
+from collections import defaultdict
+from importlib import import_module
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user_model,
+)
+from django.contrib.auth.hashers import make_password
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+
+from apps.projects.membership import rebuild_member_ids
+from apps.projects.models import Project, ProjectMembership
+from apps.projects.rollups import rebuild_project_rollups
+from core.db_backend.command_metrics import command_tracker
+
+from .bulk import insert_document, reserve_ids, update_document
+from .models import Task, TaskStats, Tip
+from .stats import rebuild_task_stats
+from .tips import tip_catalog
+
+User = get_user_model()
+
+BENCH_PREFIX = "bench_"
+BENCH_PASSWORD = "bench-password"
+
+BENCHMARK_RESULTS_DIR = settings.BASE_DIR / "benchmarks" / "results"
+
+WORDS = [
+    "report", "budget", "review", "design", "meeting", "invoice", "deploy",
+    "client", "sprint", "backup", "email", "slides", "research", "draft",
+    "plan", "release", "survey", "contract", "training", "audit",
+]
+
+# scenario: weight in the request mix
+SCENARIOS = {
+    "dashboard": 8,
+    "list": 20,
+    "list_status": 10,
+    "search": 10,
+    "detail": 15,
+    "create": 6,
+    "update": 8,
+    "complete": 5,
+    "tip": 14,
+    "tip_save": 4,
+}
+
+# Tasks of each workload user that detail / update / complete pick from
+TASK_SAMPLE_SIZE = 500
+
+
+# ------------ Latency helpers ------------
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def latency_summary(latencies):
+    """
+    mean / p50 / p95 / p99 in milliseconds for a list of seconds.
+    """
+    latencies = sorted(latencies)
+    return {
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+# ------------ Seeding ------------
+def _batches(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _seeded_uuid(rng):
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _documents(database, model, instances):
+    """
+    Reserve ids for the instances and return their insert documents.
+    """
+    ids = reserve_ids(model, len(instances), database=database)
+    docs = []
+    for instance, pk in zip(instances, ids):
+        instance.pk = pk
+        docs.append(insert_document(instance))
+    return docs
+
+
+def _insert(database, model, instances, batch_size):
+    for batch in _batches(instances, batch_size):
+        database[model._meta.db_table].insert_many(
+            _documents(database, model, batch), ordered=False
+        )
+
+
+def seed_benchmark_data(users, projects, tasks, tips, seed=1, batch_size=5000, log=print):
+    """
+    Write a benchmark data set. Tasks are spread over the last 180 days with
+    a mix of statuses, priorities and due dates (20% without one), 20% of
+    them belong to a project of their creator.
+    Returns the number of documents written per kind.
+    """
+    database = Task.objects.mongo_database
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = timezone.localdate()
+    password = make_password(BENCH_PASSWORD)
+
+    # ---- users ----
+    user_objs = [
+        User(
+            username=f"{BENCH_PREFIX}{n:06d}",
+            email=f"{BENCH_PREFIX}{n:06d}@example.com",
+            password=password,
+            date_joined=now,
+        )
+        for n in range(users)
+    ]
+    _insert(database, User, user_objs, batch_size)
+    user_ids = [user.pk for user in user_objs]
+    log(f"users: {len(user_ids)}")
+
+    # ---- projects + memberships ----
+    project_objs = [
+        Project(
+            name=f"{rng.choice(WORDS).title()} project {n}",
+            owner_id=rng.choice(user_ids),
+            status=rng.choice([c for c, _ in Project.STATUS_CHOICES]),
+            priority=rng.choice([c for c, _ in Project.PRIORITY_CHOICES]),
+            due_date=today + datetime.timedelta(days=rng.randint(-30, 120)),
+        )
+        for n in range(projects)
+    ]
+    _insert(database, Project, project_objs, batch_size)
+
+    memberships = []
+    projects_of_user = defaultdict(list)
+    for project in project_objs:
+        others = [uid for uid in rng.sample(user_ids, min(len(user_ids), 6)) if uid != project.owner_id]
+        members = [(project.owner_id, ProjectMembership.ROLE_PM)] + [
+            (uid, ProjectMembership.ROLE_MEMBER) for uid in others[: rng.randint(1, 5)]
+        ]
+        for user_id, role in members:
+            memberships.append(ProjectMembership(user_id=user_id, project_id=project.pk, role=role))
+            projects_of_user[user_id].append(project.pk)
+    _insert(database, ProjectMembership, memberships, batch_size)
+    # insert_many sends no signals, fill the access lists from the memberships
+    rebuild_member_ids([project.pk for project in project_objs])
+    log(f"projects: {len(project_objs)}, memberships: {len(memberships)}")
+
+    # ---- tasks ----
+    statuses = [c for c, _ in Task.STATUS_CHOICES]
+    priorities = [c for c, _ in Task.PRIORITY_CHOICES]
+
+    def task_rows():
+        for n in range(tasks):
+            user_id = rng.choice(user_ids)
+            created_at = now - datetime.timedelta(seconds=rng.randint(0, 180 * 86400))
+            status = rng.choices(statuses, weights=[4, 3, 3])[0]
+            words = rng.sample(WORDS, 3)
+
+            task = Task(
+                public_id=_seeded_uuid(rng),
+                title=f"{words[0].title()} {words[1]} #{n}",
+                description=f"Benchmark task about the {words[2]}.",
+                created_by_id=user_id,
+                status=status,
+                priority=rng.choice(priorities),
+                due_date=(
+                    None
+                    if rng.random() < 0.2
+                    else today + datetime.timedelta(days=rng.randint(-30, 60))
+                ),
+                completed_at=created_at if status == Task.STATUS_DONE else None,
+            )
+            user_projects = projects_of_user.get(user_id)
+            if user_projects and rng.random() < 0.2:
+                task.task_type = Task.TYPE_PROJECT
+                task.project_id = rng.choice(user_projects)
+            task.refresh_search_terms()
+            yield task, created_at
+
+    written = 0
+    for batch in _batches(task_rows(), batch_size):
+        docs = _documents(database, Task, [task for task, _ in batch])
+        # insert_document() stamps "now" on the auto_now fields, backdate them
+        for doc, (_, created_at) in zip(docs, batch):
+            doc.update(update_document(Task, {"created_at": created_at, "updated_at": created_at}))
+        database[Task._meta.db_table].insert_many(docs, ordered=False)
+        written += len(docs)
+        log(f"tasks: {written}/{tasks}")
+
+    # ---- saved tips ----
+    tip_objs = []
+    for _ in range(tips):
+        tip = tip_catalog.sample(rng=rng)
+        if tip:
+            tip_objs.append(Tip(user_id=rng.choice(user_ids), text=tip["text"], category=tip["category"]))
+    _insert(database, Tip, tip_objs, batch_size)
+    log(f"tips: {len(tip_objs)}")
+
+    for user_id in user_ids:
+        rebuild_task_stats(user_id)
+    # The tasks went in with insert_many, fill the project cards from them
+    rebuild_project_rollups([project.pk for project in project_objs])
+
+    return {
+        "users": len(user_objs),
+        "projects": len(project_objs),
+        "memberships": len(memberships),
+        "tasks": written,
+        "tips": len(tip_objs),
+    }
+
+
+def clear_benchmark_data():
+    """
+    Remove every benchmark user and what belongs to them.
+    Returns the number of users removed.
+    """
+    database = Task.objects.mongo_database
+    user_ids = list(
+        User.objects.filter(username__startswith=BENCH_PREFIX).values_list("pk", flat=True)
+    )
+    if not user_ids:
+        return 0
+
+    in_users = {"$in": user_ids}
+    project_ids = list(Project.objects.filter(owner_id__in=user_ids).values_list("pk", flat=True))
+    for model, query in [
+        (Task, {"created_by_id": in_users}),
+        (Tip, {"user_id": in_users}),
+        (TaskStats, {"user_id": in_users}),
+        (ProjectMembership, {"$or": [{"user_id": in_users}, {"project_id": {"$in": project_ids}}]}),
+        (Project, {"owner_id": in_users}),
+        (User, {"id": in_users}),
+    ]:
+        database[model._meta.db_table].delete_many(query)
+    return len(user_ids)
+
+
+def benchmark_scale():
+    """
+    Size of the data set the benchmark runs against (stored with the results).
+    """
+    return {
+        "users": User.objects.count(),
+        "projects": Project.objects.count(),
+        "tasks": Task.objects.count(),
+        "tips": Tip.objects.count(),
+    }
+
+
+# ------------ Workload ------------
+def build_workload(count, users, seed=1):
+    """
+    `count` request steps spread over `users` workload users. A step only
+    holds random choices, the concrete task ids are picked at run time
+    (pick is a float in [0, 1) into the user's task sample).
+    """
+    rng = random.Random(seed)
+    names = list(SCENARIOS)
+    weights = [SCENARIOS[name] for name in names]
+    statuses = [c for c, _ in Task.STATUS_CHOICES]
+
+    return [
+        {
+            "scenario": rng.choices(names, weights=weights)[0],
+            "user": rng.randrange(users),
+            "pick": rng.random(),
+            "word": rng.choice(WORDS),
+            "status": rng.choice(statuses),
+            "priority": rng.choice([c for c, _ in Task.PRIORITY_CHOICES]),
+            "due_in": rng.choice([None, rng.randint(-5, 30)]),
+        }
+        for _ in range(count)
+    ]
+
+
+def request_for(step, number, task_ids):
+    """
+    (method, path, json body) of one workload step, None when the step
+    needs a task and the user has none.
+    """
+    scenario = step["scenario"]
+    list_url = reverse("tasks:api_list")
+    due_date = (
+        (timezone.localdate() + datetime.timedelta(days=step["due_in"])).isoformat()
+        if step["due_in"] is not None
+        else ""
+    )
+
+    if scenario == "dashboard":
+        return "GET", reverse("tasks:dashboard"), None
+    if scenario == "list":
+        return "GET", f"{list_url}?limit=50", None
+    if scenario == "list_status":
+        return "GET", f"{list_url}?{urlencode({'status': step['status'], 'limit': 50})}", None
+    if scenario == "search":
+        return "GET", f"{list_url}?{urlencode({'q': step['word'], 'limit': 50})}", None
+    if scenario == "create":
+        body = {
+            "title": f"{step['word'].title()} benchmark task {number}",
+            "priority": step["priority"],
+            "due_date": due_date,
+        }
+        return "POST", reverse("tasks:api_create"), body
+    if scenario == "tip":
+        return "GET", reverse("tasks:get_tip_api"), None
+    if scenario == "tip_save":
+        body = {"text": f"Benchmark tip about the {step['word']}.", "category": "general"}
+        return "POST", reverse("tasks:save_tip_api"), body
+
+    if not task_ids:
+        return None
+    public_id = task_ids[int(step["pick"] * len(task_ids))]
+
+    if scenario == "detail":
+        return "GET", reverse("tasks:api_detail", args=[public_id]), None
+    if scenario == "update":
+        body = {
+            "title": f"{step['word'].title()} updated in benchmark",
+            "priority": step["priority"],
+            "due_date": due_date,
+        }
+        return "POST", reverse("tasks:api_update", args=[public_id]), body
+    if scenario == "complete":
+        return "POST", reverse("tasks:api_mark_complete", args=[public_id]), {}
+
+    raise ValueError(f"Unknown scenario '{scenario}'")
+
+
+def workload_users(count):
+    users = list(
+        User.objects.filter(username__startswith=BENCH_PREFIX, is_active=True).order_by("username")[:count]
+    )
+    task_ids = {
+        user.pk: list(
+            Task.objects.filter(created_by=user)
+            .order_by("id")
+            .values_list("public_id", flat=True)[:TASK_SAMPLE_SIZE]
+        )
+        for user in users
+    }
+    return users, task_ids
+
+
+# ------------ Transports ------------
+def _request_host():
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip(".")
+        if host and host != "*":
+            return host
+    return "localhost"
+
+
+class ClientTransport:
+    """
+    In-process: requests go through the whole Django stack (middleware,
+    views, templates) without a server or sockets. MongoDB commands are
+    counted per request.
+    """
+
+    name = "in-process"
+    counts_commands = True
+
+    def __init__(self, users):
+        self.clients = {}
+        for user in users:
+            client = Client(HTTP_HOST=_request_host())
+            client.force_login(user)
+            self.clients[user.pk] = client
+
+    def send(self, user, method, path, body):
+        client = self.clients[user.pk]
+        if method == "GET":
+            return client.get(path).status_code
+        return client.post(path, data=json.dumps(body), content_type="application/json").status_code
+
+
+def create_login_session(user):
+    """
+    Session key (cookie value) of a new session logged in as `user`, no
+    login request needed.
+    """
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = str(user.pk)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session.session_key
+
+
+class HttpTransport:
+    """
+    Against a running deployment (base_url), over one keep-alive connection.
+    The server's MongoDB commands can't be seen from here.
+    """
+
+    counts_commands = False
+
+    def __init__(self, base_url, users):
+        parts = urlsplit(base_url)
+        self.name = base_url
+        self.netloc = parts.netloc
+        self.connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+        self.connection = None
+        # The CSRF check only compares the cookie with the header
+        self.csrf_token = get_random_string(32)
+        self.cookies = {
+            user.pk: f"{settings.SESSION_COOKIE_NAME}={create_login_session(user)}; "
+            f"{settings.CSRF_COOKIE_NAME}={self.csrf_token}"
+            for user in users
+        }
+
+    def send(self, user, method, path, body):
+        if self.connection is None:
+            self.connection = self.connection_class(self.netloc, timeout=30)
+
+        headers = {"Cookie": self.cookies[user.pk], "X-Requested-With": "XMLHttpRequest"}
+        payload = None
+        if method != "GET":
+            payload = json.dumps(body)
+            headers.update({"Content-Type": "application/json", "X-CSRFToken": self.csrf_token})
+
+        try:
+            self.connection.request(method, path, body=payload, headers=headers)
+            response = self.connection.getresponse()
+            response.read()
+            return response.status
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            return 0
+
+
+# ------------ Running ------------
+def run_workload(plan, transport, users, task_ids):
+    """
+    Replay the plan one request at a time.
+    Returns {scenario: [(seconds, db commands or None, http status)]} and
+    the total duration.
+    """
+    samples = defaultdict(list)
+    started = time.perf_counter()
+
+    for number, step in enumerate(plan):
+        user = users[step["user"] % len(users)]
+        request = request_for(step, number, task_ids.get(user.pk))
+        if request is None:
+            continue
+
+        with command_tracker.track() as recorder:
+            start = time.perf_counter()
+            status = transport.send(user, *request)
+            elapsed = time.perf_counter() - start
+
+        commands = recorder.commands if transport.counts_commands else None
+        samples[step["scenario"]].append((elapsed, commands, status))
+
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples, duration):
+    """
+    Per scenario and overall: requests, errors, throughput, latency
+    percentiles and DB commands per request.
+    """
+
+    def summary(rows):
+        ok = [row for row in rows if 200 <= row[2] < 400]
+        commands = [row[1] for row in rows if row[1] is not None]
+        return {
+            "requests": len(rows),
+            "errors": len(rows) - len(ok),
+            **latency_summary([row[0] for row in ok]),
+            "db_commands_mean": round(statistics.mean(commands), 2) if commands else None,
+            "db_commands_max": max(commands) if commands else None,
+        }
+
+    everything = [row for rows in samples.values() for row in rows]
+    total = summary(everything)
+    total["requests_per_s"] = round(len(everything) / duration, 1) if duration else 0.0
+
+    return {
+        "total": total,
+        "scenarios": {name: summary(rows) for name, rows in sorted(samples.items())},
+    }
+
+
+# ------------ Stored results ------------
+def _git(*args):
+    try:
+        completed = subprocess.run(
+            ["git", *args],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() if completed.returncode == 0 else None
+
+
+def git_revision():
+    """
+    (short commit, dirty) of the working tree, ("unknown", False) outside git.
+    """
+    commit = _git("rev-parse", "--short", "HEAD")
+    if not commit:
+        return "unknown", False
+    return commit, bool(_git("status", "--porcelain", "--untracked-files=no"))
+
+
+def save_results(result, directory=BENCHMARK_RESULTS_DIR):
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = result["started_at"].replace(":", "").replace("-", "")[:15]
+    path = directory / f"{stamp}-{result['commit']}.json"
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    return path
+
+
+def previous_results(directory=BENCHMARK_RESULTS_DIR, exclude=None):
+    """
+    The latest stored result (file names sort by time), or None.
+    """
+    if not directory.exists():
+        return None
+    paths = sorted(p for p in directory.glob("*.json") if p != exclude)
+    if not paths:
+        return None
+    return json.loads(paths[-1].read_text(encoding="utf-8"))
+
+
+COMPARED_METRICS = ("p50_ms", "p95_ms", "p99_ms", "db_commands_mean")
+
+
+def compare_results(previous, current):
+    """
+    [(scenario, metric, before, after, change %)] for the scenarios
+    present in both runs. Change is None when there is no baseline.
+    """
+    rows = []
+    for name, now in current["scenarios"].items():
+        before = previous["scenarios"].get(name)
+        if not before:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), now.get(metric)
+            if old is None or new is None:
+                continue
+            change = round((new - old) / old * 100, 1) if old else None
+            rows.append((name, metric, old, new, change))
+    return rows
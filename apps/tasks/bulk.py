@@ -0,0 +1,104 @@
+# NOTES:
+# Helpers to write model instances with raw pymongo bulk operations.
+#
+# The ORM sends one command per insert / update / delete. For batches we build
+# the Mongo documents ourselves and send them in a single bulk_write, so these
+# helpers reproduce what djongo would have written:
+# - every value goes through field.get_db_prep_save(), so dates, datetimes,
+#   foreign keys and JSON fields get the same shape as an ORM save
+# - auto ids are reserved from djongo's "__schema__" collection, the same
+#   counter its INSERT uses, so ORM and bulk inserts never collide
+# instance_from_document() goes the other way, for raw documents returned by
+# find_one_and_update and friends.
+
+from django.db import connections
+from pymongo import ReturnDocument
+
+
+def id_counter_update(model, count):
+    """
+    (filter, update) that reserves `count` auto ids on djongo's schema
+    counter, for find_one_and_update(..., return_document=AFTER).
+    """
+    return (
+        {"name": model._meta.db_table, "auto": {"$exists": True}},
+        {"$inc": {"auto.seq": count}},
+    )
+
+
+def reserved_ids(counter_doc, count):
+    """
+    The ids reserved by id_counter_update(), from the updated counter doc.
+    """
+    last = counter_doc["auto"]["seq"]
+    return list(range(last - count + 1, last + 1))
+
+
+def reserve_ids(model, count, database=None):
+    """
+    Reserve `count` consecutive auto ids for a model with one
+    find_one_and_update on the djongo schema counter.
+    Pass the pymongo database for models without a DjongoManager.
+    """
+    if count <= 0:
+        return []
+
+    if database is None:
+        database = model._default_manager.mongo_database
+    schema = database["__schema__"]
+    counter = schema.find_one_and_update(
+        *id_counter_update(model, count), return_document=ReturnDocument.AFTER
+    )
+    return reserved_ids(counter, count)
+
+
+def insert_document(instance):
+    """
+    Mongo document for a new instance (its pk must already be set).
+    Runs pre_save(add=True) like an ORM insert, so defaults and
+    auto_now / auto_now_add are filled in on the instance too.
+    """
+    connection = connections[instance._state.db or "default"]
+    doc = {}
+    for field in instance._meta.concrete_fields:
+        value = field.pre_save(instance, add=True)
+        doc[field.column] = field.get_db_prep_save(value, connection=connection)
+    instance._state.adding = False
+    return doc
+
+
+def update_document(model, values, using="default"):
+    """
+    $set payload for a partial update given as {field name: python value}.
+    """
+    connection = connections[using]
+    opts = model._meta
+    return {
+        opts.get_field(name).column: opts.get_field(name).get_db_prep_save(
+            value, connection=connection
+        )
+        for name, value in values.items()
+    }
+
+
+def instance_from_document(model, doc, using="default"):
+    """
+    Model instance for a raw document (e.g. what find_one_and_update
+    returns), with the same value conversions as an ORM read. Fields that
+    are not in the document are left deferred.
+    """
+    connection = connections[using]
+    fields = [f for f in model._meta.concrete_fields if f.column in doc]
+
+    values = []
+    for field in fields:
+        value = doc[field.column]
+        col = field.cached_col
+        converters = connection.ops.get_db_converters(col) + col.get_db_converters(
+            connection
+        )
+        for converter in converters:
+            value = converter(value, col, connection)
+        values.append(value)
+
+    return model.from_db(using, [f.attname for f in fields], values)
@@ -0,0 +1,151 @@
+# NOTES:
+# Cache for the hot read paths of the tasks app:
+# - the JSON of one task (detail endpoint), per user + public_id
+# - the first page of the task list, per user + status filter
+# - the user's stats doc (dashboard cards and ETags)
+# - the first page of the user's saved tips (tips page)
+# It goes through Django's cache framework (settings.CACHES, alias
+# TASKS_CACHE_ALIAS) and is used when every invalidation reaches the cache
+# the requests read (settings.TASK_CACHE_ENABLED):
+# - a cache shared by the workers (memcached)
+# - local memory when a single process serves every request
+#   (WEB_CONCURRENCY=1, the default)
+# With several workers on local memory an invalidation would only reach one
+# of them, the others would keep serving old first pages and 304s for ETags
+# built from an old stats version. get_or_compute() then just computes,
+# every page and every ETag version is read from MongoDB.
+# Writes made by another process (manage.py import_tasks) only reach a
+# local memory cache when the entries expire (TASK_CACHE_TIMEOUT).
+#
+# Invalidation is explicit and precise: every task write path calls
+# invalidate_tasks(user_id, public_ids), which drops the detail entries of
+# those tasks plus the user's list first pages and stats. Nothing relies on
+# expiry, TASK_CACHE_TIMEOUT is only a safety net (e.g. admin edits).
+#
+# Stampede guard: on a miss only the worker that wins cache.add() on the
+# entry's lock recomputes it, the others poll for the value for a moment
+# (and compute it themselves, without storing it, if it never shows up).
+# Invalidation deletes the lock too, so a recompute that started before a
+# write can't store its now stale result afterwards.
+
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Task
+
+TASKS_CACHE_ALIAS = getattr(settings, "TASKS_CACHE_ALIAS", "default")
+TASK_CACHE_TIMEOUT = getattr(settings, "TASK_CACHE_TIMEOUT", 300)
+
+# How long one recompute may hold an entry's lock
+LOCK_TIMEOUT = 10
+# How long the other workers wait for it, and how often they look
+WAIT_TIMEOUT = 1.0
+WAIT_STEP = 0.02
+
+# The status filters of the list endpoint ("all" = no filter)
+LIST_FILTERS = ["all"] + [value for value, _ in Task.STATUS_CHOICES]
+
+_MISSING = object()
+
+
+def get_cache():
+    return caches[TASKS_CACHE_ALIAS]
+
+
+def cache_enabled():
+    return getattr(settings, "TASK_CACHE_ENABLED", False)
+
+
+# ------------ Keys ------------
+
+def detail_key(user_id, public_id):
+    return f"tasks:detail:{user_id}:{public_id}"
+
+
+def list_key(user_id, status=None):
+    return f"tasks:list:{user_id}:{status or 'all'}"
+
+
+def stats_key(user_id):
+    return f"tasks:stats:{user_id}"
+
+
+def saved_tips_key(user_id):
+    return f"tips:saved:first:{user_id}"
+
+
+def lock_key(key):
+    return f"{key}:lock"
+
+
+# ------------ Read ------------
+
+def get_or_compute(key, compute, timeout=None, is_valid=None, clock=time.monotonic, sleep=time.sleep):
+    """
+    Cached value of `key`, or compute() it once for everybody.
+    is_valid(value) can reject a cached value (e.g. a stats doc for
+    yesterday), it is then recomputed like a miss.
+    Exceptions from compute() (e.g. Http404) are not cached.
+    When the cache is off (cache_enabled()) it always computes.
+    """
+    if not cache_enabled():
+        return compute()
+
+    cache = get_cache()
+
+    def usable(value):
+        return value is not _MISSING and (is_valid is None or is_valid(value))
+
+    value = cache.get(key, _MISSING)
+    if usable(value):
+        return value
+
+    token = uuid.uuid4().hex
+    lock = lock_key(key)
+    if cache.add(lock, token, LOCK_TIMEOUT):
+        try:
+            value = compute()
+            # Still our lock: nobody invalidated the entry while we computed
+            if cache.get(lock) == token:
+                cache.set(key, value, TASK_CACHE_TIMEOUT if timeout is None else timeout)
+        finally:
+            if cache.get(lock) == token:
+                cache.delete(lock)
+        return value
+
+    # Someone else is computing it
+    deadline = clock() + WAIT_TIMEOUT
+    while clock() < deadline:
+        sleep(WAIT_STEP)
+        value = cache.get(key, _MISSING)
+        if usable(value):
+            return value
+
+    return compute()
+
+
+# ------------ Invalidation ------------
+
+def delete_entries(keys):
+    """
+    Drop cached entries and their locks (see get_or_compute()).
+    """
+    get_cache().delete_many([*keys, *(lock_key(key) for key in keys)])
+
+
+def invalidate_tasks(user_id, public_ids=()):
+    """
+    Call after any write to the user's tasks: drops the detail entries of
+    public_ids, the user's list first pages and stats.
+    """
+    keys = [list_key(user_id, status) for status in LIST_FILTERS]
+    keys.append(stats_key(user_id))
+    keys.extend(detail_key(user_id, public_id) for public_id in public_ids if public_id)
+    delete_entries(keys)
+
+
+def invalidate_saved_tips(user_id):
+    delete_entries([saved_tips_key(user_id)])
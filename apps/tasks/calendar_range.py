@@ -0,0 +1,105 @@
+# NOTES:
+# Calendar API: the user's tasks due in a date range, grouped per day, for
+# month / week views.
+#
+# One aggregation answers it, served by tasks_task_due_sort_idx
+# (created_by_id, due_sort, created_at desc, id desc):
+# - due_sort is due_date with "no due date" far in the future (0012), so a
+#   due_sort range is exactly a due_date range and never picks up undated
+#   tasks
+# - the range is an index range scan in the list order; without ?status=
+#   only indexed fields are read (covered, no document is fetched)
+# - per day it returns the number of tasks and the ids of the first
+#   `per_day` of them, the view then loads only those tasks. A busy day
+#   costs `per_day` tasks plus an overflow count ("more"), however many it
+#   has.
+# Ranges are capped at CALENDAR_MAX_DAYS (a 6-week month grid).
+
+import datetime
+
+from .models import NO_DUE_DATE
+from .stats import to_mongo_date
+
+CALENDAR_MAX_DAYS = 42
+CALENDAR_DEFAULT_DAYS = 7
+DEFAULT_PER_DAY = 5
+MAX_PER_DAY = 50
+
+DATE_ERROR = "Invalid date format. Use YYYY-MM-DD."
+
+
+class InvalidRange(ValueError):
+    """
+    Raised for a date range the calendar doesn't serve.
+    """
+
+
+def parse_range(raw_start, raw_end=None):
+    """
+    (start, end) dates, both included. end defaults to a week from start.
+    """
+    try:
+        start = datetime.date.fromisoformat(raw_start or "")
+        end = (
+            datetime.date.fromisoformat(raw_end)
+            if raw_end
+            else start + datetime.timedelta(days=CALENDAR_DEFAULT_DAYS - 1)
+        )
+    except (TypeError, ValueError, OverflowError):
+        raise InvalidRange(DATE_ERROR)
+
+    if end < start:
+        raise InvalidRange("end must not be before start.")
+    if (end - start).days >= CALENDAR_MAX_DAYS:
+        raise InvalidRange(f"At most {CALENDAR_MAX_DAYS} days per request.")
+    if end >= NO_DUE_DATE:
+        raise InvalidRange(DATE_ERROR)
+    return start, end
+
+
+def parse_per_day(raw):
+    try:
+        per_day = int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_PER_DAY
+    return max(0, min(per_day, MAX_PER_DAY))
+
+
+def calendar_pipeline(user_id, start, end, status=None, per_day=DEFAULT_PER_DAY):
+    """
+    Aggregation returning, per due day of the range:
+    {_id: day, count: tasks that day, ids: ids of the first per_day ones}.
+    """
+    match = {
+        "created_by_id": user_id,
+        "due_sort": {"$gte": to_mongo_date(start), "$lte": to_mongo_date(end)},
+    }
+    if status:
+        match["status"] = status
+
+    return [
+        {"$match": match},
+        {"$sort": {"due_sort": 1, "created_at": -1, "id": -1}},
+        {"$project": {"_id": 0, "due_sort": 1, "id": 1}},
+        {"$group": {"_id": "$due_sort", "count": {"$sum": 1}, "ids": {"$push": "$id"}}},
+        {"$project": {"count": 1, "ids": {"$slice": ["$ids", per_day]}}},
+        {"$sort": {"_id": 1}},
+    ]
+
+
+def calendar_days(groups):
+    """
+    [{date, count, ids, more}] from the calendar_pipeline() results.
+    """
+    days = []
+    for group in groups:
+        ids = group["ids"] if group.get("ids") else []
+        days.append(
+            {
+                "date": group["_id"].date().isoformat(),
+                "count": group["count"],
+                "ids": ids,
+                "more": group["count"] - len(ids),
+            }
+        )
+    return days
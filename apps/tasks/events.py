@@ -0,0 +1,83 @@
+# NOTES:
+# Live task events for the dashboard (server push).
+#
+# Every task write also appends one small document to a capped collection:
+#   {user_ids: [...], events: [{type, id, task}], stats: {...}}
+# - type is created / updated / completed / deleted, task is the same JSON
+#   the API returns (null for deletes), stats are the new dashboard counters
+# - a bulk request is one document with many events
+# - the insert is fire-and-forget (w=0): a lost event only means the tab
+#   misses a patch, the next full load fixes it
+#
+# The ASGI side (live.py) tails the collection once per process and pushes
+# each document to the open connections of the users in user_ids.
+# user_ids is an array so shared audiences (e.g. project members) only need
+# more ids here, nothing changes on the push side.
+
+import logging
+
+from pymongo import WriteConcern
+
+from .models import Task
+from .stats import serialize_stats
+
+logger = logging.getLogger(__name__)
+
+# Capped collection, created by migration 0011
+EVENTS_COLLECTION = "tasks_task_events"
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_COMPLETED = "completed"
+EVENT_DELETED = "deleted"
+# Sent when we can't describe what changed, the client reloads its list
+EVENT_RESYNC = "resync"
+
+FIRE_AND_FORGET = WriteConcern(w=0)
+
+
+def task_event(before, after, task_data=None, public_id=None):
+    """
+    One event from the before / after stats snapshots of a task
+    (before=None: created, after=None: deleted).
+    """
+    if before is None:
+        kind = EVENT_CREATED
+    elif after is None:
+        kind = EVENT_DELETED
+    elif after.get("status") == Task.STATUS_DONE and before.get("status") != Task.STATUS_DONE:
+        kind = EVENT_COMPLETED
+    else:
+        kind = EVENT_UPDATED
+
+    return {
+        "type": kind,
+        "id": public_id or (task_data or {}).get("id"),
+        "task": task_data,
+    }
+
+
+def event_document(user_id, events, stats_doc):
+    return {
+        "user_ids": [user_id],
+        "events": list(events),
+        "stats": serialize_stats(stats_doc) if stats_doc else None,
+    }
+
+
+def events_collection():
+    database = Task.objects.mongo_database
+    return database[EVENTS_COLLECTION].with_options(write_concern=FIRE_AND_FORGET)
+
+
+def publish_task_events(user_id, events, stats_doc=None):
+    """
+    Queue events for the user's open dashboards. Never raises: live updates
+    are best effort and must not fail the write that triggered them.
+    """
+    if not events:
+        return
+    try:
+        events_collection().insert_one(event_document(user_id, events, stats_doc))
+    except Exception:
+        logger.warning("Could not publish task events for user %s.", user_id, exc_info=True)
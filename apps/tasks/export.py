@@ -0,0 +1,131 @@
+# NOTES:
+# Streaming export of a user's tasks, as NDJSON (one task JSON per line,
+# same JSON as the list API) or CSV.
+#
+# Nothing is built in memory: the view reads a raw pymongo cursor (batched
+# server-side, in list order so tasks_task_due_sort_idx serves it without
+# a SORT stage) and turns it into chunks of text here, one batch of tasks
+# at a time. Memory depends on the batch size, not on the number of tasks,
+# and the first (smaller) batch goes out right away, so a big export starts
+# downloading immediately.
+#
+# Filters are the list API ones: ?status= and ?q= (every term must match,
+# like the search box, but all matches are exported in list order instead
+# of the best ranked ones).
+
+import csv
+import io
+import json
+
+from .bulk import instance_from_document
+from .models import Task
+
+EXPORT_FORMATS = ("ndjson", "csv")
+# Tasks per chunk: how much the export holds in memory at once
+EXPORT_BATCH_SIZE = 1000
+# The first chunk is smaller so the response starts without waiting
+EXPORT_FIRST_BATCH_SIZE = 100
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+CSV_COLUMNS = (
+    "id",
+    "title",
+    "description",
+    "task_type",
+    "status",
+    "priority",
+    "due_date",
+    "completed_at",
+    "created_at",
+    "updated_at",
+    "project",
+    "assignee",
+)
+
+# Spreadsheets run cells starting with these as formulas
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def export_filter(user_id, status=None, terms=()):
+    """
+    Raw Mongo filter for the tasks to export (djongo column names).
+    """
+    query = {"created_by_id": user_id}
+    if status:
+        query["status"] = status
+    if terms:
+        query["search_terms"] = {"$all": list(terms)}
+    return query
+
+
+def export_projection(field_names):
+    """
+    Projection fetching only the columns of `field_names` (plus the id).
+    """
+    projection = {"_id": 0, "id": 1}
+    for name in field_names:
+        projection[Task._meta.get_field(name).column] = 1
+    return projection
+
+
+def task_batches(docs, batch_size=EXPORT_BATCH_SIZE, first_batch_size=EXPORT_FIRST_BATCH_SIZE):
+    """
+    Lists of Task instances from an iterable of raw documents, the first
+    one of first_batch_size tasks, the others of batch_size.
+    """
+    size = first_batch_size
+    batch = []
+    for doc in docs:
+        batch.append(instance_from_document(Task, doc))
+        if len(batch) >= size:
+            yield batch
+            batch, size = [], batch_size
+    if batch:
+        yield batch
+
+
+def ndjson_chunk(payloads):
+    return "".join(json.dumps(payload, separators=(",", ":")) + "\n" for payload in payloads)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    value = str(value)
+    if value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_row(payload):
+    project = payload["project"]
+    assignee = payload["assignee"]
+    row = {
+        **payload,
+        "project": project["name"] if project else None,
+        "assignee": assignee["username"] if assignee else None,
+    }
+    return [_csv_cell(row[column]) for column in CSV_COLUMNS]
+
+
+def csv_chunk(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+
+def csv_header():
+    return csv_chunk([CSV_COLUMNS])
+
+
+def export_chunk(export_format, payloads):
+    """
+    Text for one batch of task payloads in the requested format.
+    """
+    if export_format == "csv":
+        return csv_chunk(csv_row(payload) for payload in payloads)
+    return ndjson_chunk(payloads)
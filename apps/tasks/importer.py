@@ -0,0 +1,264 @@
+# NOTES:
+# Bulk import of tasks from a CSV, JSON (array of objects) or NDJSON file,
+# used by the upload endpoint (TaskImportApiView) and
+# `manage.py import_tasks`.
+#
+# - the file is parsed as a stream (csv.DictReader, line by line, or an
+#   incremental decoder for a JSON array), never loaded whole
+# - every row is validated by clean_task_create(), same rules as the
+#   create API; invalid rows are reported with their row number and skipped
+# - valid rows are inserted IMPORT_BATCH_SIZE at a time with one
+#   insert_many (ids reserved in one go, documents built like bulk.py),
+#   then the stats (and project rollups) get one update per batch
+# Memory is bounded by the batch size, whatever the size of the file.
+#
+# A file that can't be parsed any further (e.g. broken JSON array) stops
+# the import: the rows before it are imported, the report says where it
+# stopped. Dashboards get a single "resync" event at the end instead of one
+# event per task.
+
+import csv
+import io
+import json
+
+from pymongo.errors import BulkWriteError
+
+from .bulk import insert_document, reserve_ids
+from .cache import invalidate_tasks
+from .events import EVENT_RESYNC, publish_task_events
+from .models import Task
+from .stats import record_task_changes, task_snapshot
+from .validation import clean_task_create
+
+IMPORT_FORMATS = ("csv", "json", "ndjson")
+IMPORT_BATCH_SIZE = 1000
+# Only the first errors are kept in the report, the others are counted
+MAX_REPORTED_ERRORS = 100
+# Reading a JSON array never buffers more than one row of this size
+MAX_ROW_CHARS = 1024 * 1024
+READ_CHUNK_CHARS = 64 * 1024
+
+ROW_TYPE_ERROR = "Each row must be an object."
+INVALID_JSON_ERROR = "Invalid JSON."
+WRITE_ERROR = "The write failed."
+
+# Yielded in place of a row that isn't valid JSON (NDJSON)
+INVALID_JSON = object()
+
+
+class ImportFormatError(ValueError):
+    """
+    Raised when the file can't be parsed any further.
+    """
+
+
+def import_format(filename, requested=None):
+    """
+    The format to parse a file with: the requested one, or the one of its
+    extension. None when neither is known.
+    """
+    if requested:
+        return requested if requested in IMPORT_FORMATS else None
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    if extension == "jsonl":
+        return "ndjson"
+    return extension if extension in IMPORT_FORMATS else None
+
+
+# ------------ Parsing ------------
+
+def text_stream(binary_file):
+    """
+    Text view of an uploaded / opened binary file (UTF-8, BOM allowed).
+    """
+    return io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+
+
+def csv_rows(text):
+    reader = csv.DictReader(text)
+    if not reader.fieldnames or "title" not in reader.fieldnames:
+        raise ImportFormatError("The CSV file needs a header row with a title column.")
+    for row, data in enumerate(reader, start=1):
+        yield row, data
+
+
+def ndjson_rows(text):
+    row = 0
+    for line in text:
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            yield row, json.loads(line)
+        except ValueError:
+            yield row, INVALID_JSON
+
+
+def json_array_rows(text, chunk_chars=READ_CHUNK_CHARS):
+    """
+    The values of a top-level JSON array, decoded one at a time.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+    row = 0
+    # What comes next: "[", a value or "]", a value, "," or "]"
+    expect = "["
+
+    def more():
+        nonlocal buffer, pos, eof
+        chunk = text.read(chunk_chars)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+    while True:
+        while pos < len(buffer) and buffer[pos].isspace():
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ImportFormatError(f"The JSON array ends early (after row {row}).")
+            more()
+            continue
+
+        char = buffer[pos]
+        if expect == "[":
+            if char != "[":
+                raise ImportFormatError("A JSON file must contain an array of tasks.")
+            pos += 1
+            expect = "first"
+            continue
+        if expect == "separator" or (expect == "first" and char == "]"):
+            if char == "]":
+                return
+            if char != ",":
+                raise ImportFormatError(f"Invalid JSON after row {row}.")
+            pos += 1
+            expect = "value"
+            continue
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except ValueError:
+            value, end = None, None
+        if end is None or (end == len(buffer) and not eof):
+            # Incomplete value (or one that could still go on): read more
+            if eof:
+                raise ImportFormatError(f"Row {row + 1} is not valid JSON.")
+            if len(buffer) - pos > MAX_ROW_CHARS:
+                raise ImportFormatError(f"Row {row + 1} is too large or not valid JSON.")
+            more()
+            continue
+
+        row += 1
+        pos = end
+        expect = "separator"
+        yield row, value
+
+
+def parse_rows(binary_file, import_format):
+    """
+    (row number, data) for every row of the file, row numbers start at 1.
+    """
+    text = text_stream(binary_file)
+    if import_format == "csv":
+        rows = csv_rows(text)
+    elif import_format == "ndjson":
+        rows = ndjson_rows(text)
+    else:
+        rows = json_array_rows(text)
+
+    try:
+        yield from rows
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFormatError(f"The file can't be read: {exc}")
+
+
+# ------------ Import ------------
+
+def new_report():
+    return {"rows": 0, "imported": 0, "failed": 0, "errors": [], "error": None}
+
+
+def row_failed(report, row, errors):
+    report["failed"] += 1
+    if len(report["errors"]) < MAX_REPORTED_ERRORS:
+        report["errors"].append({"row": row, "errors": errors})
+
+
+def insert_batch(user, batch, report):
+    """
+    Insert one batch of (row, Task) with one insert_many. Rows whose write
+    failed are reported. Returns the new stats doc (None if nothing was
+    inserted).
+    """
+    ids = reserve_ids(Task, len(batch))
+    docs = []
+    for (row, task), pk in zip(batch, ids):
+        task.pk = pk
+        docs.append(insert_document(task))
+
+    failed = set()
+    try:
+        Task.objects.mongo_insert_many(docs, ordered=False)
+    except BulkWriteError as exc:
+        # Unordered: everything but the reported writes went in
+        failed = {error["index"] for error in exc.details["writeErrors"]}
+        for index in sorted(failed):
+            row_failed(report, batch[index][0], {"__all__": WRITE_ERROR})
+
+    inserted = [task for index, (row, task) in enumerate(batch) if index not in failed]
+    report["imported"] += len(inserted)
+    if not inserted:
+        return None
+    return record_task_changes(user.pk, [(None, task_snapshot(task)) for task in inserted])
+
+
+def import_tasks(user, rows, batch_size=IMPORT_BATCH_SIZE, max_rows=None, progress=None):
+    """
+    Validate and insert (row number, data) rows as tasks of `user`.
+    `progress(report)` is called after every batch. Returns the report:
+    rows, imported, failed, errors (the first MAX_REPORTED_ERRORS, as
+    {"row", "errors"}) and error (why the import stopped early, if it did).
+    """
+    report = new_report()
+    batch = []
+    stats_doc = None
+
+    def flush():
+        nonlocal batch, stats_doc
+        if batch:
+            stats_doc = insert_batch(user, batch, report) or stats_doc
+            batch = []
+        if progress:
+            progress(report)
+
+    try:
+        for row, data in rows:
+            if max_rows is not None and report["rows"] >= max_rows:
+                report["error"] = f"Stopped after {max_rows} rows."
+                break
+            report["rows"] += 1
+
+            if not isinstance(data, dict):
+                error = INVALID_JSON_ERROR if data is INVALID_JSON else ROW_TYPE_ERROR
+                row_failed(report, row, {"__all__": error})
+                continue
+
+            fields, errors = clean_task_create(data)
+            if errors:
+                row_failed(report, row, errors)
+                continue
+
+            task = Task(**fields, created_by=user, assignee=user)
+            task.public_id = str(task.public_id)
+            task.refresh_search_terms()
+            batch.append((row, task))
+            if len(batch) >= batch_size:
+                flush()
+    except ImportFormatError as exc:
+        report["error"] = str(exc)
+    flush()
+
+    if report["imported"]:
+        invalidate_tasks(user.pk)
+        publish_task_events(user.pk, [{"type": EVENT_RESYNC}], stats_doc)
+    return report
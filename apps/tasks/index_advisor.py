@@ -0,0 +1,424 @@
+# NOTES:
+# Index advisor: runs the query shapes the app really sends (tasks, tips,
+# projects, accounts code paths) through MongoDB's explain and reports,
+# per shape:
+# - the winning plan (which index, if any)
+# - collection scans (COLLSCAN) and in-memory sorts (SORT stage)
+# - documents examined per document returned
+# For a shape with a problem, the compound index that would serve it is
+# proposed unless an existing index already starts with the same keys.
+#
+# The shapes are written out by hand next to the code they mirror (djongo
+# builds its queries from SQL, they can't be captured from the ORM). When a
+# view's query changes, change its shape here too.
+#
+# Used by `manage.py advise_indexes`, which can also create the proposed
+# indexes and fail a CI run on a seeded data set (see seed_benchmark).
+
+import datetime
+
+from bson.son import SON
+
+from .bulk import instance_from_document
+from .calendar_range import CALENDAR_MAX_DAYS, calendar_pipeline
+from .export import EXPORT_BATCH_SIZE, export_filter
+from .models import Task
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    TASK_LIST_SORT,
+    TIPS_PAGE_SIZE,
+    encode_cursor,
+    mongo_filter_after_cursor,
+)
+from .search import OTHER_TIER, TITLE_TIER, search_filter
+from .stats import OPEN_STATUSES, _naive_utc_now, current_window, to_mongo_date
+
+# Report a shape that examines more documents than this per document returned...
+RATIO_THRESHOLD = 10
+# ...once it examines at least this many (tiny data sets look fine anyway)
+MIN_EXAMINED = 100
+
+
+# ------------ Sample values ------------
+
+def sample_values(db, username=None):
+    """
+    Real values to run the shapes with: a user with tasks (or `username`),
+    one of their tasks, their projects, a session. Returns None when there
+    is no task.
+    """
+    if username:
+        user = db["auth_user"].find_one({"username": username}, projection={"id": 1, "username": 1})
+        if user is None:
+            return None
+        task = db[Task._meta.db_table].find_one({"created_by_id": user["id"]})
+    else:
+        task = db[Task._meta.db_table].find_one({}, sort=[("id", -1)])
+        user = task and db["auth_user"].find_one(
+            {"id": task["created_by_id"]}, projection={"id": 1, "username": 1}
+        )
+    if task is None or user is None:
+        return None
+
+    session = db["django_session"].find_one({}, projection={"session_key": 1})
+    project_ids = {
+        doc["id"]
+        for doc in db["projects_project"].find({"member_ids": user["id"]}, projection={"id": 1})
+    }
+    today, start_of_week = current_window()
+
+    return {
+        "user_id": user["id"],
+        "username": user["username"],
+        "public_id": task["public_id"],
+        "status": task["status"],
+        "cursor": encode_cursor(instance_from_document(Task, task)),
+        "term": (task.get("search_terms") or ["a"])[0],
+        "session_key": session["session_key"] if session else "0" * 32,
+        "project_ids": sorted(project_ids) or [task.get("project_id") or 0],
+        "today": to_mongo_date(today),
+        "week_start": datetime.datetime.combine(start_of_week, datetime.time.min),
+    }
+
+
+# ------------ Shapes ------------
+
+def query_shapes(sample):
+    """
+    The queries to explain, one dict per shape:
+    name, source (where the app sends it), collection, one of
+    find {filter, sort, limit} / count {filter} / pipeline, and the index
+    to propose as [(field, direction)] with its name.
+    """
+    tasks = Task._meta.db_table
+    user_id = sample["user_id"]
+    list_index = [("created_by_id", 1), ("due_sort", 1), ("created_at", -1), ("id", -1)]
+    project_index = [("project_id", 1), *list_index[1:]]
+
+    return [
+        {
+            "name": "task_detail",
+            "source": "views.get_task_for_user_or_404, async detail/update/delete",
+            "collection": tasks,
+            "filter": {"created_by_id": user_id, "public_id": sample["public_id"]},
+            "limit": 1,
+            "index": ([("created_by_id", 1), ("public_id", 1)], "tasks_task_owner_public_id_idx"),
+        },
+        {
+            "name": "task_list",
+            "source": "pagination.paginate_tasks (first page)",
+            "collection": tasks,
+            "filter": {"created_by_id": user_id},
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (list_index, "tasks_task_due_sort_idx"),
+        },
+        {
+            "name": "task_list_next_page",
+            "source": "pagination.paginate_tasks (with a cursor)",
+            "collection": tasks,
+            "filter": {
+                "$and": [{"created_by_id": user_id}, mongo_filter_after_cursor(sample["cursor"])]
+            },
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (list_index, "tasks_task_due_sort_idx"),
+        },
+        {
+            "name": "task_list_by_status",
+            "source": "TaskListApiView ?status=",
+            "collection": tasks,
+            "filter": {"created_by_id": user_id, "status": sample["status"]},
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (
+                [("created_by_id", 1), ("status", 1), *list_index[1:]],
+                "tasks_task_status_list_idx",
+            ),
+        },
+        {
+            "name": "task_export",
+            "source": "TaskExportApiView (one batch)",
+            "collection": tasks,
+            "filter": export_filter(user_id),
+            "sort": TASK_LIST_SORT,
+            "limit": EXPORT_BATCH_SIZE,
+            "index": (list_index, "tasks_task_due_sort_idx"),
+        },
+        {
+            "name": "task_calendar",
+            "source": "calendar_range.calendar_pipeline (a month)",
+            "collection": tasks,
+            "pipeline": calendar_pipeline(
+                user_id,
+                sample["today"].date(),
+                sample["today"].date() + datetime.timedelta(days=CALENDAR_MAX_DAYS - 1),
+            ),
+            "index": (list_index, "tasks_task_due_sort_idx"),
+        },
+        {
+            "name": "project_board",
+            "source": "projects.ProjectBoardApiView",
+            "collection": tasks,
+            "filter": {"project_id": sample["project_ids"][0]},
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (project_index, "tasks_task_project_list_idx"),
+        },
+        {
+            "name": "my_project_tasks",
+            "source": "projects.MyProjectTasksApiView",
+            "collection": tasks,
+            "filter": {"project_id": {"$in": sample["project_ids"]}},
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (project_index, "tasks_task_project_list_idx"),
+        },
+        {
+            "name": "project_memberships",
+            "source": "projects.membership.load_project_ids (cache miss)",
+            "collection": "projects_project",
+            "filter": {"member_ids": user_id},
+            "index": ([("member_ids", 1)], "projects_project_member_ids_idx"),
+        },
+        {
+            "name": "task_search_title",
+            "source": "views.search_tasks (title tier)",
+            "collection": tasks,
+            "filter": search_filter(user_id, [sample["term"]], TITLE_TIER),
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (
+                [("created_by_id", 1), ("title_terms", 1), *list_index[1:]],
+                "tasks_task_title_search_idx",
+            ),
+        },
+        {
+            "name": "task_search_other",
+            "source": "views.search_tasks (description tier)",
+            "collection": tasks,
+            "filter": search_filter(user_id, [sample["term"]], OTHER_TIER),
+            "sort": TASK_LIST_SORT,
+            "limit": DEFAULT_PAGE_SIZE,
+            "index": (
+                [("created_by_id", 1), ("search_terms", 1), *list_index[1:]],
+                "tasks_task_search_list_idx",
+            ),
+        },
+        {
+            "name": "stats_this_week",
+            "source": "stats.compute_stats_from_db",
+            "collection": tasks,
+            "count": True,
+            "filter": {
+                "created_by_id": user_id,
+                "created_at": {"$gte": sample["week_start"]},
+                "status": Task.STATUS_DONE,
+            },
+            "index": (
+                [("created_by_id", 1), ("status", 1), ("created_at", 1)],
+                "tasks_task_status_created_idx",
+            ),
+        },
+        {
+            "name": "stats_urgent_today",
+            "source": "stats.compute_stats_from_db",
+            "collection": tasks,
+            "count": True,
+            "filter": {
+                "created_by_id": user_id,
+                "status": {"$in": list(OPEN_STATUSES)},
+                "due_date": sample["today"],
+            },
+            "index": (
+                [("created_by_id", 1), ("status", 1), ("due_date", 1)],
+                "tasks_task_status_due_idx",
+            ),
+        },
+        {
+            "name": "stats_overdue",
+            "source": "stats.compute_stats_from_db",
+            "collection": tasks,
+            "count": True,
+            "filter": {
+                "created_by_id": user_id,
+                "status": {"$in": list(OPEN_STATUSES)},
+                "due_date": {"$lt": sample["today"]},
+            },
+            "index": (
+                [("created_by_id", 1), ("status", 1), ("due_date", 1)],
+                "tasks_task_status_due_idx",
+            ),
+        },
+        {
+            "name": "stats_doc",
+            "source": "stats.get_stats_doc",
+            "collection": "tasks_taskstats",
+            "filter": {"user_id": user_id},
+            "limit": 1,
+            "index": ([("user_id", 1)], "tasks_taskstats_user_idx"),
+        },
+        {
+            "name": "saved_tips",
+            "source": "pagination.paginate_tips (tips page, saved tips API)",
+            "collection": "tasks_tip",
+            "filter": {"user_id": user_id},
+            "sort": [("created_at", -1), ("id", -1)],
+            "limit": TIPS_PAGE_SIZE + 1,
+            "index": ([("user_id", 1), ("created_at", -1), ("id", -1)], "tasks_tip_user_recent_idx"),
+        },
+        {
+            "name": "login",
+            "source": "accounts SignInView (ModelBackend.authenticate)",
+            "collection": "auth_user",
+            "filter": {"username": sample["username"]},
+            "limit": 1,
+            "index": ([("username", 1)], "auth_user_username_idx"),
+        },
+        {
+            "name": "user_by_id",
+            "source": "CachedModelBackend.get_user on a cache miss, async_auth",
+            "collection": "auth_user",
+            "filter": {"id": user_id},
+            "limit": 1,
+            "index": ([("id", 1)], "auth_user_id_idx"),
+        },
+        {
+            "name": "session",
+            "source": "SessionStore.load on a cache miss, async_auth",
+            "collection": "django_session",
+            "filter": {"session_key": sample["session_key"], "expire_date": {"$gt": _naive_utc_now()}},
+            "limit": 1,
+            "index": ([("session_key", 1)], "django_session_key_idx"),
+        },
+    ]
+
+
+# ------------ Explain ------------
+
+def explain_command(shape):
+    if "pipeline" in shape:
+        command = SON([("aggregate", shape["collection"]), ("pipeline", shape["pipeline"]), ("cursor", {})])
+    elif shape.get("count"):
+        command = SON([("count", shape["collection"]), ("query", shape["filter"])])
+    else:
+        command = SON([("find", shape["collection"]), ("filter", shape["filter"])])
+        if shape.get("sort"):
+            command["sort"] = SON(shape["sort"])
+        if shape.get("limit"):
+            command["limit"] = shape["limit"]
+    return SON([("explain", command), ("verbosity", "executionStats")])
+
+
+def _find(doc, key):
+    """
+    First value of `key` anywhere in an explain document (its layout
+    differs between find / aggregate and server versions).
+    """
+    if isinstance(doc, dict):
+        if key in doc:
+            return doc[key]
+        children = doc.values()
+    elif isinstance(doc, list):
+        children = doc
+    else:
+        return None
+    for child in children:
+        found = _find(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def plan_stages(plan):
+    if not isinstance(plan, dict):
+        return
+    if "stage" in plan:
+        yield plan
+    for key in ("queryPlan", "inputStage"):
+        yield from plan_stages(plan.get(key))
+    for child in plan.get("inputStages", ()):
+        yield from plan_stages(child)
+
+
+def analyze_explain(explain, ratio_threshold=RATIO_THRESHOLD, min_examined=MIN_EXAMINED):
+    """
+    Summary of one explain result: plan, counters and issues.
+    """
+    stages = list(plan_stages(_find(explain, "winningPlan") or {}))
+    stats = _find(explain, "executionStats") or {}
+
+    returned = stats.get("nReturned", 0)
+    examined = stats.get("totalDocsExamined", 0)
+    result = {
+        "plan": " <- ".join(
+            stage["stage"] + (f" {stage['indexName']}" if stage.get("indexName") else "")
+            for stage in stages
+        ),
+        "returned": returned,
+        "docs_examined": examined,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "millis": stats.get("executionTimeMillis", 0),
+        "issues": [],
+    }
+
+    names = {stage["stage"] for stage in stages}
+    if "COLLSCAN" in names:
+        result["issues"].append("collection scan")
+    if "SORT" in names:
+        result["issues"].append("in-memory sort")
+    if examined >= min_examined and examined / max(returned, 1) > ratio_threshold:
+        result["issues"].append(f"{examined / max(returned, 1):.0f} docs examined per doc returned")
+    return result
+
+
+def index_exists(index_information, keys):
+    """
+    True when an existing index starts with `keys` (same fields, same
+    directions): it can serve everything the proposed one would.
+    """
+    wanted = [(field, int(direction)) for field, direction in keys]
+    for info in index_information.values():
+        existing = [(field, int(direction)) for field, direction in info["key"]]
+        if existing[: len(wanted)] == wanted:
+            return True
+    return False
+
+
+def advise(db, shapes, ratio_threshold=RATIO_THRESHOLD, min_examined=MIN_EXAMINED):
+    """
+    Explain every shape. Returns (reports, proposals): one report per shape,
+    and the indexes to create as {collection, keys, name, for}.
+    """
+    reports, proposals = [], {}
+    index_info = {}
+
+    for shape in shapes:
+        collection = shape["collection"]
+        explain = db.command(explain_command(shape))
+        report = {
+            "name": shape["name"],
+            "source": shape["source"],
+            "collection": collection,
+            **analyze_explain(explain, ratio_threshold, min_examined),
+        }
+        reports.append(report)
+
+        if not report["issues"] or not shape.get("index"):
+            continue
+        if collection not in index_info:
+            index_info[collection] = db[collection].index_information()
+        keys, name = shape["index"]
+        if index_exists(index_info[collection], keys):
+            continue
+        proposal = proposals.setdefault(
+            (collection, name), {"collection": collection, "keys": keys, "name": name, "for": []}
+        )
+        proposal["for"].append(shape["name"])
+
+    return reports, list(proposals.values())
+
+
+def create_indexes(db, proposals):
+    for proposal in proposals:
+        db[proposal["collection"]].create_index(proposal["keys"], name=proposal["name"])
@@ -0,0 +1,221 @@
+# NOTES:
+# Server push for the dashboard: GET /tasks/events/ as Server-Sent Events.
+#
+# Django 3.2 can't stream a response from async code, so this is a small raw
+# ASGI app that core/asgi.py puts in front of Django (only under ASGI, with
+# runserver / WSGI the dashboard keeps reloading after its own writes).
+# - one TaskEventBroker per process tails the capped events collection
+#   (events.py) in a single background thread and hands every document to
+#   the event loop
+# - an open connection is one asyncio.Queue and one coroutine, no thread,
+#   so a worker can hold many idle dashboards
+# - a comment line every KEEPALIVE_SECONDS keeps proxies from closing the
+#   stream, a client that falls QUEUE_SIZE messages behind gets one
+#   "resync" instead of an ever growing buffer
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from importlib import import_module
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http.cookie import parse_cookie
+from pymongo import CursorType
+from pymongo.errors import PyMongoError
+
+from apps.accounts.async_auth import aget_session_user, aload_session_store
+
+from .events import EVENT_RESYNC, EVENTS_COLLECTION
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = "/tasks/events/"
+KEEPALIVE_SECONDS = 25
+QUEUE_SIZE = 100
+# How long the browser waits before reconnecting
+RETRY_MS = 3000
+
+
+def sse_message(message):
+    data = json.dumps(message, cls=DjangoJSONEncoder)
+    return f"event: tasks\ndata: {data}\n\n".encode()
+
+
+class TaskEventBroker:
+    """
+    Fans the documents of the events collection out to the subscribed
+    connections of this process, by user id.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._loop = None
+        self._thread = None
+
+    def subscribe(self, user_id):
+        self._ensure_started()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[user_id]
+
+    def dispatch(self, doc):
+        """
+        Runs on the event loop: queue one events document for its users.
+        """
+        message = {"events": doc.get("events", []), "stats": doc.get("stats")}
+        for user_id in doc.get("user_ids", []):
+            for queue in self._subscribers.get(user_id, ()):
+                try:
+                    queue.put_nowait(message)
+                except asyncio.QueueFull:
+                    # Slow client: drop what it has not read, it reloads instead
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({"events": [{"type": EVENT_RESYNC}], "stats": message["stats"]})
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(target=self._tail, name="task-events", daemon=True)
+        self._thread.start()
+
+    def _tail(self):
+        """
+        Background thread: follow the capped collection for as long as the
+        process lives. Only documents written after start-up are pushed.
+        A new cursor resumes after the last document delivered.
+        """
+        started, last_id = False, None
+        while True:
+            try:
+                collection = Task.objects.mongo_database[EVENTS_COLLECTION]
+                if not started:
+                    newest = collection.find_one(sort=[("$natural", -1)], projection={"_id": 1})
+                    # Empty collection: everything that shows up is new
+                    last_id = newest["_id"] if newest else None
+                    started = True
+
+                cursor = collection.find(tail_filter(last_id), cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    for doc in cursor:
+                        last_id = doc["_id"]
+                        self._loop.call_soon_threadsafe(self.dispatch, doc)
+            except PyMongoError:
+                logger.warning("Task events tail failed, retrying.", exc_info=True)
+
+            # The cursor dies on an empty collection or a failover, start a new one
+            time.sleep(1)
+
+
+def tail_filter(last_id):
+    """
+    Events after the last one delivered (all of them when none was).
+    """
+    return {"_id": {"$gt": last_id}} if last_id is not None else {}
+
+
+broker = TaskEventBroker()
+
+
+async def user_from_scope(scope):
+    headers = dict(scope.get("headers", []))
+    cookies = parse_cookie(headers.get(b"cookie", b"").decode("latin-1"))
+    engine = import_module(settings.SESSION_ENGINE)
+    session = engine.SessionStore(cookies.get(settings.SESSION_COOKIE_NAME))
+    return await aget_session_user(await aload_session_store(session))
+
+
+async def wait_for_disconnect(receive):
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def send_plain(send, status, text):
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"text/plain; charset=utf-8")],
+        }
+    )
+    await send({"type": "http.response.body", "body": text.encode()})
+
+
+async def task_events_stream(scope, receive, send):
+    if scope["method"] != "GET":
+        await send_plain(send, 405, "Method not allowed")
+        return
+
+    user = await user_from_scope(scope)
+    if not user.is_authenticated:
+        await send_plain(send, 401, "Authentication required")
+        return
+
+    queue = broker.subscribe(user.pk)
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream"),
+                    (b"cache-control", b"no-cache"),
+                    # nginx would otherwise buffer the stream
+                    (b"x-accel-buffering", b"no"),
+                ],
+            }
+        )
+        await send(
+            {"type": "http.response.body", "body": f"retry: {RETRY_MS}\n\n".encode(), "more_body": True}
+        )
+
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, disconnected},
+                timeout=KEEPALIVE_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                getter.cancel()
+                break
+            if getter in done:
+                body = sse_message(getter.result())
+            else:
+                getter.cancel()
+                body = b": ping\n\n"
+            await send({"type": "http.response.body", "body": body, "more_body": True})
+    finally:
+        broker.unsubscribe(user.pk, queue)
+        disconnected.cancel()
+
+
+def mount_task_events(django_application):
+    """
+    ASGI app serving EVENTS_PATH itself and everything else with Django.
+    """
+
+    async def application(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+            await task_events_stream(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return application
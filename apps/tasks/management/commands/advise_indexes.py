@@ -0,0 +1,96 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.index_advisor import (
+    MIN_EXAMINED,
+    RATIO_THRESHOLD,
+    advise,
+    create_indexes,
+    query_shapes,
+    sample_values,
+)
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    """
+    python manage.py advise_indexes [--user <username>] [--create]
+        [--ratio 10] [--min-examined 100] [--json] [--fail-on-issues]
+
+    Explain the app's real query shapes and report collection scans,
+    in-memory sorts and docs examined per doc returned, with the compound
+    indexes that would fix them. --create builds the proposed indexes
+    (add them to a migration afterwards to keep them, see 0008).
+
+    In CI, against a seeded data set:
+        python manage.py seed_benchmark --tasks 100000
+        python manage.py advise_indexes --user bench_000000 --fail-on-issues
+    """
+
+    help = "Explain the task / tip / account queries and propose missing indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", dest="username", help="Run the shapes as this username.")
+        parser.add_argument("--create", action="store_true", help="Create the proposed indexes.")
+        parser.add_argument("--ratio", type=float, default=RATIO_THRESHOLD)
+        parser.add_argument("--min-examined", type=int, default=MIN_EXAMINED)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+        parser.add_argument(
+            "--fail-on-issues",
+            action="store_true",
+            help="Exit with an error when a shape has an issue (for CI).",
+        )
+
+    def handle(self, *args, **options):
+        db = Task.objects.mongo_database
+
+        sample = sample_values(db, options["username"])
+        if sample is None:
+            raise CommandError(
+                "No task to sample the queries with (seed some with seed_benchmark)."
+            )
+
+        reports, proposals = advise(
+            db, query_shapes(sample), options["ratio"], options["min_examined"]
+        )
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"shapes": reports, "proposals": proposals}, indent=2))
+        else:
+            self.print_report(sample, reports, proposals)
+
+        if options["create"] and proposals:
+            create_indexes(db, proposals)
+            self.stdout.write(self.style.SUCCESS(f"Created {len(proposals)} index(es)."))
+
+        with_issues = [report["name"] for report in reports if report["issues"]]
+        if options["fail_on_issues"] and with_issues:
+            raise CommandError(f"Query shapes with issues: {', '.join(with_issues)}")
+
+    def print_report(self, sample, reports, proposals):
+        self.stdout.write(f"Sampled as user '{sample['username']}' (id {sample['user_id']}).\n")
+
+        for report in reports:
+            style = self.style.WARNING if report["issues"] else self.style.SUCCESS
+            self.stdout.write(style(f"{report['name']}  [{report['collection']}]"))
+            self.stdout.write(f"  from:     {report['source']}")
+            self.stdout.write(f"  plan:     {report['plan'] or '?'}")
+            self.stdout.write(
+                f"  returned: {report['returned']}, docs examined: {report['docs_examined']}, "
+                f"keys examined: {report['keys_examined']}, {report['millis']} ms"
+            )
+            for issue in report["issues"]:
+                self.stdout.write(style(f"  ! {issue}"))
+
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("\nNo missing index."))
+            return
+
+        self.stdout.write("\nProposed indexes:")
+        for proposal in proposals:
+            keys = ", ".join(f"{field} {direction}" for field, direction in proposal["keys"])
+            self.stdout.write(
+                f"  {proposal['collection']}.{proposal['name']} ({keys})"
+                f"  for {', '.join(proposal['for'])}"
+            )
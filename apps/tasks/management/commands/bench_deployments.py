@@ -0,0 +1,143 @@
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.benchmark import create_login_session, latency_summary
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    python manage.py bench_deployments --user <username>
+        --target wsgi=http://127.0.0.1:8000/tasks/api/tasks/
+        --target asgi=http://127.0.0.1:8001/tasks/api/async/tasks/
+        [--concurrency 50] [--requests 2000] [--json results.json]
+
+    Fires the same GET workload at each running deployment and compares
+    throughput and latency. Start the servers first, e.g.:
+        gunicorn core.wsgi -w 2 --threads 8 -b 127.0.0.1:8000
+        uvicorn core.asgi:application --workers 2 --port 8001
+
+    Every worker thread keeps one keep-alive connection, so we measure the
+    server and not TCP handshakes. The session is created for --user directly
+    in the DB, no login request is needed.
+    """
+
+    help = "Compare concurrent-request throughput of the WSGI and ASGI deployments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", dest="username", required=True)
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=url, repeat for every deployment to compare.",
+        )
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=50)
+        parser.add_argument("--json", dest="json_path", help="Also write the results here.")
+
+    def handle(self, *args, **options):
+        targets = []
+        for raw in options["target"]:
+            name, sep, url = raw.partition("=")
+            if not sep or not url.startswith("http"):
+                raise CommandError(f"Invalid --target '{raw}', use name=http://host:port/path")
+            targets.append((name, url))
+
+        cookie = f"{settings.SESSION_COOKIE_NAME}={self.create_session(options['username'])}"
+
+        results = []
+        for name, url in targets:
+            self.run(url, cookie, options["warmup"], options["concurrency"])
+            result = self.run(url, cookie, options["requests"], options["concurrency"])
+            result["name"] = name
+            result["url"] = url
+            results.append(result)
+            self.report(result)
+
+        if options["json_path"]:
+            with open(options["json_path"], "w", encoding="utf-8") as fh:
+                json.dump(
+                    {
+                        "concurrency": options["concurrency"],
+                        "requests": options["requests"],
+                        "results": results,
+                    },
+                    fh,
+                    indent=2,
+                )
+
+    def create_session(self, username):
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User '{username}' does not exist.")
+
+        return create_login_session(user)
+
+    def run(self, url, cookie, total, concurrency):
+        parts = urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        connection_class = (
+            http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        )
+
+        local = threading.local()
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def one_request(_):
+            if not hasattr(local, "conn"):
+                local.conn = connection_class(parts.netloc, timeout=30)
+
+            start = time.perf_counter()
+            try:
+                local.conn.request("GET", path, headers={"Cookie": cookie})
+                response = local.conn.getresponse()
+                response.read()
+                ok = response.status == 200
+            except (OSError, http.client.HTTPException) as exc:
+                local.conn.close()
+                del local.conn
+                ok, response = False, exc
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                if ok:
+                    latencies.append(elapsed)
+                else:
+                    errors.append(getattr(response, "status", repr(response)))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one_request, range(total)))
+        duration = time.perf_counter() - started
+
+        return {
+            "ok": len(latencies),
+            "errors": len(errors),
+            "error_samples": [str(e) for e in errors[:5]],
+            "duration_s": round(duration, 3),
+            "requests_per_s": round(len(latencies) / duration, 1) if duration else 0.0,
+            **latency_summary(latencies),
+        }
+
+    def report(self, result):
+        self.stdout.write(
+            f"{result['name']:>8}: {result['requests_per_s']:>8} req/s  "
+            f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  "
+            f"p99 {result['p99_ms']} ms  errors {result['errors']}"
+        )
+        if result["errors"]:
+            self.stdout.write(self.style.WARNING(f"          e.g. {result['error_samples']}"))
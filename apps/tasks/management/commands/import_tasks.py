@@ -0,0 +1,86 @@
+import json
+import sys
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.importer import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    import_format,
+    import_tasks,
+    parse_rows,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    python manage.py import_tasks <file|-> --user <username>
+        [--format csv|json|ndjson] [--batch-size 1000] [--json]
+
+    Create a task per row of a CSV / JSON array / NDJSON file (or stdin),
+    validated like the create API and inserted in batches. Progress is
+    printed after every batch, row errors at the end.
+    """
+
+    help = "Import tasks for a user from a CSV, JSON or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, - for stdin.")
+        parser.add_argument("--user", dest="username", required=True)
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Default: from the file extension.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["username"]).first()
+        if user is None:
+            raise CommandError(f"User '{options['username']}' does not exist.")
+
+        path = options["path"]
+        file_format = import_format(path, options["format"])
+        if file_format is None:
+            raise CommandError("Unknown file format, pass --format csv|json|ndjson.")
+
+        start = time.perf_counter()
+
+        def progress(report):
+            elapsed = time.perf_counter() - start
+            self.stderr.write(
+                f"{report['rows']} rows: {report['imported']} imported, "
+                f"{report['failed']} failed ({report['rows'] / max(elapsed, 1e-6):.0f} rows/s)"
+            )
+
+        try:
+            source = sys.stdin.buffer if path == "-" else open(path, "rb")
+        except OSError as exc:
+            raise CommandError(f"Can't open {path}: {exc}")
+
+        with source:
+            report = import_tasks(
+                user,
+                parse_rows(source, file_format),
+                batch_size=max(1, options["batch_size"]),
+                progress=progress,
+            )
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        for error in report["errors"]:
+            self.stdout.write(f"row {error['row']}: {error['errors']}")
+        if report["failed"] > len(report["errors"]):
+            self.stdout.write(f"... and {report['failed'] - len(report['errors'])} more failed rows")
+        if report["error"]:
+            self.stdout.write(self.style.ERROR(report["error"]))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {report['imported']} of {report['rows']} rows "
+                f"in {time.perf_counter() - start:.1f}s."
+            )
+        )
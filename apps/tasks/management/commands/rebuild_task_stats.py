@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.cache import invalidate_tasks
+from apps.tasks.stats import rebuild_task_stats
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    """
+    python manage.py rebuild_task_stats [--user <username>]
+
+    Recompute the materialized dashboard stats from the tasks collection.
+    Use it to repair drift (e.g. tasks edited from the admin panel).
+    """
+
+    help = "Rebuild the per-user dashboard stats documents."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="username",
+            help="Only rebuild the stats of this username.",
+        )
+
+    def handle(self, *args, **options):
+        username = options.get("username")
+
+        if username:
+            user_ids = list(
+                User.objects.filter(username=username).values_list("pk", flat=True)
+            )
+            if not user_ids:
+                raise CommandError(f"User '{username}' does not exist.")
+        else:
+            user_ids = User.objects.values_list("pk", flat=True).iterator()
+
+        rebuilt = 0
+        for user_id in user_ids:
+            rebuild_task_stats(user_id)
+            # Cached lists / details may be as stale as the stats were
+            invalidate_tasks(user_id)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {rebuilt} user(s)."))
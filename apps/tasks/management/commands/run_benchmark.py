@@ -0,0 +1,136 @@
+import datetime
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.benchmark import (
+    BENCHMARK_RESULTS_DIR,
+    ClientTransport,
+    HttpTransport,
+    benchmark_scale,
+    build_workload,
+    compare_results,
+    git_revision,
+    previous_results,
+    run_workload,
+    save_results,
+    summarize,
+    workload_users,
+)
+
+
+class Command(BaseCommand):
+    """
+    python manage.py run_benchmark [--requests 2000] [--users 20] [--seed 1]
+        [--base-url http://127.0.0.1:8000] [--max-regression 20]
+
+    Replays the seeded workload (see seed_benchmark) and reports p50 / p95 /
+    p99 latency, throughput and MongoDB commands per request, per endpoint.
+
+    By default the requests go through Django in this process (no server
+    needed, DB commands are counted). With --base-url they are sent to a
+    running deployment instead.
+
+    Every run is stored in benchmarks/results/<time>-<commit>.json and
+    compared with the previous stored run. --max-regression fails the command
+    when a p95 or the DB commands of an endpoint grew more than that %.
+    Write requests change the data, re-seed for runs you want to compare.
+    """
+
+    help = "Run the task / tip API benchmark and store the results."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--warmup", type=int, default=100)
+        parser.add_argument("--users", type=int, default=20, help="Benchmark users sending requests.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--base-url", help="Benchmark a running server instead of in-process.")
+        parser.add_argument("--results-dir", type=Path, default=BENCHMARK_RESULTS_DIR)
+        parser.add_argument("--no-save", action="store_true", help="Don't store this run.")
+        parser.add_argument("--compare", type=Path, help="Compare with this stored run instead of the latest.")
+        parser.add_argument("--max-regression", type=float)
+
+    def handle(self, *args, **options):
+        users, task_ids = workload_users(options["users"])
+        if not users:
+            raise CommandError("No benchmark users, run `manage.py seed_benchmark` first.")
+
+        if options["base_url"]:
+            transport = HttpTransport(options["base_url"], users)
+        else:
+            transport = ClientTransport(users)
+
+        # The warm-up uses another seed so it doesn't pre-cache the measured requests
+        warmup = build_workload(options["warmup"], len(users), seed=options["seed"] + 1)
+        run_workload(warmup, transport, users, task_ids)
+
+        started_at = datetime.datetime.now(datetime.timezone.utc)
+        plan = build_workload(options["requests"], len(users), seed=options["seed"])
+        samples, duration = run_workload(plan, transport, users, task_ids)
+
+        commit, dirty = git_revision()
+        result = {
+            "commit": commit,
+            "dirty": dirty,
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "target": transport.name,
+            "seed": options["seed"],
+            "users": len(users),
+            "scale": benchmark_scale(),
+            "duration_s": round(duration, 3),
+            **summarize(samples, duration),
+        }
+        self.report(result)
+
+        results_dir = options["results_dir"]
+        saved = None
+        if not options["no_save"]:
+            saved = save_results(result, results_dir)
+            self.stdout.write(f"\nSaved {saved}")
+
+        if options["compare"]:
+            if not options["compare"].exists():
+                raise CommandError(f"{options['compare']} does not exist.")
+            baseline = json.loads(options["compare"].read_text(encoding="utf-8"))
+        else:
+            baseline = previous_results(results_dir, exclude=saved)
+
+        if baseline:
+            self.compare(baseline, result, options["max_regression"])
+
+    def report(self, result):
+        total = result["total"]
+        self.stdout.write(
+            f"{result['target']} @ {result['commit']}{' (dirty)' if result['dirty'] else ''}: "
+            f"{total['requests']} requests, {total['requests_per_s']} req/s, "
+            f"{result['scale']['tasks']} tasks in the DB\n"
+        )
+        self.stdout.write(
+            f"{'endpoint':<12} {'reqs':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'db ops':>7}"
+        )
+        for name, row in [*result["scenarios"].items(), ("TOTAL", total)]:
+            db_ops = "-" if row["db_commands_mean"] is None else row["db_commands_mean"]
+            self.stdout.write(
+                f"{name:<12} {row['requests']:>6} {row['errors']:>4} {row['p50_ms']:>8} "
+                f"{row['p95_ms']:>8} {row['p99_ms']:>8} {db_ops:>7}"
+            )
+
+    def compare(self, baseline, result, max_regression):
+        self.stdout.write(f"\nCompared with {baseline['commit']} ({baseline['started_at']}):")
+
+        regressions = []
+        for name, metric, old, new, change in compare_results(baseline, result):
+            if metric not in ("p95_ms", "db_commands_mean") or change is None:
+                continue
+            line = f"  {name:<12} {metric:<17} {old:>9} -> {new:<9} {change:+.1f}%"
+            if max_regression is not None and change > max_regression:
+                regressions.append(line)
+                line = self.style.ERROR(line)
+            self.stdout.write(line)
+
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} metric(s) regressed more than {max_regression}%."
+            )
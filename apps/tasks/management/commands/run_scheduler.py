@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from apps.tasks.scheduler import CHECK_INTERVAL, DailyScheduler, roll_stats
+
+
+class Command(BaseCommand):
+    """
+    python manage.py run_scheduler [--once] [--interval 30]
+
+    Keep the date-dependent dashboard counters (urgent today, overdue,
+    this week) on the current day: rolls every stats doc now, then after
+    every midnight. Run one of these next to the web workers, or use
+    --once from cron right after midnight.
+    """
+
+    help = "Roll the dashboard stats to the new day / week (background worker)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Roll once and exit.")
+        parser.add_argument("--interval", type=float, default=CHECK_INTERVAL)
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            rolled = roll_stats()
+            self.stdout.write(self.style.SUCCESS(f"Rolled {rolled} stats doc(s)."))
+            return
+
+        scheduler = DailyScheduler(check_interval=options["interval"])
+        self.stdout.write("Scheduler running, Ctrl+C to stop.")
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
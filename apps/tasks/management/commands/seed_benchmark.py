@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks.benchmark import (
+    BENCH_PASSWORD,
+    BENCH_PREFIX,
+    clear_benchmark_data,
+    seed_benchmark_data,
+)
+
+
+class Command(BaseCommand):
+    """
+    python manage.py seed_benchmark [--users 100] [--projects 50]
+        [--tasks 10000] [--tips 2000] [--seed 1] [--clear]
+
+    Write a reproducible benchmark data set (the same --seed always gives
+    the same data). Scales from 1k to 1M tasks, e.g. --tasks 1000000.
+    Users are named bench_000000, bench_000001... with the password
+    "bench-password". --clear removes the previous benchmark data first,
+    --clear-only removes it and stops.
+    """
+
+    help = "Seed fake users, projects, tasks and tips for run_benchmark."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--projects", type=int, default=50)
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--tips", type=int, default=2000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--clear", action="store_true", help="Remove the old benchmark data first.")
+        parser.add_argument("--clear-only", action="store_true", help="Only remove the benchmark data.")
+
+    def handle(self, *args, **options):
+        if options["clear"] or options["clear_only"]:
+            removed = clear_benchmark_data()
+            self.stdout.write(f"Removed {removed} benchmark user(s) and their data.")
+            if options["clear_only"]:
+                return
+
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+
+        counts = seed_benchmark_data(
+            users=options["users"],
+            projects=options["projects"],
+            tasks=options["tasks"],
+            tips=options["tips"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+
+        summary = ", ".join(f"{count} {kind}" for kind, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary}."))
+        self.stdout.write(f"Log in as {BENCH_PREFIX}000000 / {BENCH_PASSWORD}")
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0006_tip_tasks_tip_user_id_7d752f_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='task_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('week_start', models.DateField(blank=True, null=True)),
+                ('in_progress_this_week', models.IntegerField(default=0)),
+                ('completed_this_week', models.IntegerField(default=0)),
+                ('stats_date', models.DateField(blank=True, null=True)),
+                ('urgent_today', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
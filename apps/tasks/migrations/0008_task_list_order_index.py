@@ -0,0 +1,39 @@
+# Compound index for the keyset-paginated task list:
+#   filter created_by_id, sort due_date ASC, created_at DESC, id DESC
+#
+# Djongo turns models.Index into ascending-only Mongo indexes, and Mongo can
+# only use an index for a sort whose directions match it (or its exact
+# inverse), so this one is created with pymongo directly.
+
+from django.db import migrations
+
+INDEX_NAME = "tasks_task_list_order_idx"
+INDEX_KEYS = [
+    ("created_by_id", 1),
+    ("due_date", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+
+def create_list_order_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].create_index(INDEX_KEYS, name=INDEX_NAME)
+
+
+def drop_list_order_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_taskstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_list_order_index, drop_list_order_index),
+    ]
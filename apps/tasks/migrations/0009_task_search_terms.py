@@ -0,0 +1,61 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:48
+
+from django.db import migrations, models
+import djongo.models.fields
+from pymongo import UpdateOne
+
+from apps.tasks.search import build_search_terms
+
+BATCH_SIZE = 1000
+
+
+def backfill_search_terms(apps, schema_editor):
+    """
+    Fill the terms of existing tasks straight on the collection,
+    in batches so big collections are never loaded at once.
+    """
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+
+    batch = []
+    for doc in collection.find({}, {"title": 1, "description": 1}, batch_size=BATCH_SIZE):
+        search_terms, title_terms = build_search_terms(
+            doc.get("title"), doc.get("description")
+        )
+        batch.append(
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"search_terms": search_terms, "title_terms": title_terms}},
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            collection.bulk_write(batch, ordered=False)
+            batch = []
+
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_list_order_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='search_terms',
+            field=djongo.models.fields.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='title_terms',
+            field=djongo.models.fields.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_by', 'search_terms'], name='tasks_task_created_578036_idx'),
+        ),
+        migrations.RunPython(backfill_search_terms, migrations.RunPython.noop),
+    ]
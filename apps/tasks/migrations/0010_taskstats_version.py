@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0009_task_search_terms'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstats',
+            name='version',
+            field=models.BigIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Capped collection carrying the live task events (see apps/tasks/events.py).
+#
+# Capped so old events fall off on their own, and so the push server can
+# follow it with a tailable cursor. It has no Django model, events are only
+# written and tailed with pymongo.
+
+from django.db import migrations
+
+COLLECTION = "tasks_task_events"
+SIZE_BYTES = 16 * 1024 * 1024
+MAX_DOCUMENTS = 100000
+
+
+def create_events_collection(apps, schema_editor):
+    db = schema_editor.connection.connection
+    if COLLECTION not in db.list_collection_names():
+        db.create_collection(COLLECTION, capped=True, size=SIZE_BYTES, max=MAX_DOCUMENTS)
+
+
+def drop_events_collection(apps, schema_editor):
+    db = schema_editor.connection.connection
+    db.drop_collection(COLLECTION)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_taskstats_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_events_collection, drop_events_collection),
+    ]
@@ -0,0 +1,68 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:13
+#
+# Task.due_sort: the due date with "no due date" stored as 9999-12-31, so the
+# database can sort the task list with tasks without a due date last.
+# - AddField writes the default (no due date) on every task, RunPython then
+#   copies the real due dates (pipeline update, MongoDB 4.2+)
+# - the list index moves from due_date to due_sort, created with pymongo
+#   for the mixed directions (see 0008)
+
+from django.db import migrations
+
+import apps.tasks.models
+import datetime
+
+OLD_INDEX_NAME = "tasks_task_list_order_idx"
+OLD_INDEX_KEYS = [
+    ("created_by_id", 1),
+    ("due_date", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+INDEX_NAME = "tasks_task_due_sort_idx"
+INDEX_KEYS = [
+    ("created_by_id", 1),
+    ("due_sort", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+
+def fill_due_sort(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+
+    collection.update_many(
+        {"due_date": {"$ne": None}}, [{"$set": {"due_sort": "$due_date"}}]
+    )
+    collection.create_index(INDEX_KEYS, name=INDEX_NAME)
+    collection.drop_index(OLD_INDEX_NAME)
+
+
+def restore_list_order_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+
+    collection.create_index(OLD_INDEX_KEYS, name=OLD_INDEX_NAME)
+    collection.drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_task_events_collection'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={'ordering': ['due_sort', '-created_at', '-id']},
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='due_sort',
+            field=apps.tasks.models.DueSortField(default=datetime.date(9999, 12, 31), editable=False),
+        ),
+        migrations.RunPython(fill_due_sort, restore_list_order_index),
+    ]
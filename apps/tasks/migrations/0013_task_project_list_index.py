@@ -0,0 +1,39 @@
+# Compound index for the project board API (apps/projects/views.py):
+#   filter project_id (one id or $in the user's projects),
+#   sort due_sort ASC, created_at DESC, id DESC
+# With $in, MongoDB merges the per-project index ranges (SORT_MERGE), so
+# "tasks of all my projects" needs no in-memory sort either.
+# Mixed directions, so created with pymongo (see 0008).
+
+from django.db import migrations
+
+INDEX_NAME = "tasks_task_project_list_idx"
+INDEX_KEYS = [
+    ("project_id", 1),
+    ("due_sort", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+
+def create_project_list_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].create_index(INDEX_KEYS, name=INDEX_NAME)
+
+
+def drop_project_list_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_due_sort'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_project_list_index, drop_project_list_index),
+    ]
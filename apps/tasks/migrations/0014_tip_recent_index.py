@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:24
+#
+# Keyset-paginated saved tips: filter user_id, sort created_at DESC, id DESC.
+# The (user, created_at) index of 0006 can't give the id tie-breaker order,
+# so it is replaced with a mixed-direction one created with pymongo (see
+# 0008). The new index also serves everything the old one did.
+
+from django.db import migrations
+
+INDEX_NAME = "tasks_tip_user_recent_idx"
+INDEX_KEYS = [
+    ("user_id", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+
+def create_recent_index(apps, schema_editor):
+    Tip = apps.get_model("tasks", "Tip")
+    db = schema_editor.connection.connection
+    db[Tip._meta.db_table].create_index(INDEX_KEYS, name=INDEX_NAME)
+
+
+def drop_recent_index(apps, schema_editor):
+    Tip = apps.get_model("tasks", "Tip")
+    db = schema_editor.connection.connection
+    db[Tip._meta.db_table].drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0013_task_project_list_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='tip',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.RunPython(create_recent_index, drop_recent_index),
+        migrations.RemoveIndex(
+            model_name='tip',
+            name='tasks_tip_user_id_7d752f_idx',
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:32
+#
+# TaskStats.overdue: open tasks due before the stats day.
+# Existing docs have no count for it yet, so they are all moved off their
+# window: the scheduler (or the next request) rebuilds them with it.
+
+from django.db import migrations, models
+
+
+def mark_stats_stale(apps, schema_editor):
+    TaskStats = apps.get_model("tasks", "TaskStats")
+    db = schema_editor.connection.connection
+    db[TaskStats._meta.db_table].update_many({}, {"$set": {"stats_date": None}})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0014_tip_recent_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='taskstats',
+            name='overdue',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(mark_stats_stale, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:10
+#
+# The search terms no longer hold one letter prefixes and only index the
+# first words of a description (see apps/tasks/search.py): rewrite them on
+# every task so existing documents (and the multikey index) shrink too.
+
+from django.db import migrations
+from pymongo import UpdateOne
+
+from apps.tasks.search import build_search_terms
+
+BATCH_SIZE = 1000
+
+
+def rebuild_search_terms(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+
+    batch = []
+    for doc in collection.find({}, {"title": 1, "description": 1}, batch_size=BATCH_SIZE):
+        search_terms, title_terms = build_search_terms(
+            doc.get("title"), doc.get("description")
+        )
+        batch.append(
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"search_terms": search_terms, "title_terms": title_terms}},
+            )
+        )
+        if len(batch) >= BATCH_SIZE:
+            collection.bulk_write(batch, ordered=False)
+            batch = []
+
+    if batch:
+        collection.bulk_write(batch, ordered=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0015_taskstats_overdue'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild_search_terms, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Compound index for the status-filtered task list (TaskListApiView and
+# the async list with ?status=, the export with ?status=):
+#   filter created_by_id + status,
+#   sort due_sort ASC, created_at DESC, id DESC
+# Without it the filter runs on tasks_task_due_sort_idx and examines every
+# task of the user to fill a page of one status (`manage.py advise_indexes`).
+# Mixed directions, so created with pymongo (see 0008). It starts with the
+# (created_by, status) index of 0005, which is dropped.
+
+from django.db import migrations
+
+INDEX_NAME = "tasks_task_status_list_idx"
+INDEX_KEYS = [
+    ("created_by_id", 1),
+    ("status", 1),
+    ("due_sort", 1),
+    ("created_at", -1),
+    ("id", -1),
+]
+
+
+def create_status_list_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].create_index(INDEX_KEYS, name=INDEX_NAME)
+
+
+def drop_status_list_index(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    db = schema_editor.connection.connection
+    db[Task._meta.db_table].drop_index(INDEX_NAME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0016_rebuild_search_terms'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_status_list_index, drop_status_list_index),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_created_69a8b4_idx',
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Multikey indexes for the two ranking tiers of search (apps/tasks/search.py),
+# each a find in list order:
+#   filter created_by_id + title_terms / search_terms ($all on the prefixes),
+#   sort due_sort ASC, created_at DESC, id DESC
+# A page reads about `limit` index entries instead of every match of a short
+# prefix. Mixed directions, so created with pymongo (see 0008). They start
+# with the (created_by, search_terms) index of 0009, which is dropped.
+
+from django.db import migrations
+
+LIST_ORDER = [("due_sort", 1), ("created_at", -1), ("id", -1)]
+INDEXES = {
+    "tasks_task_title_search_idx": [("created_by_id", 1), ("title_terms", 1)] + LIST_ORDER,
+    "tasks_task_search_list_idx": [("created_by_id", 1), ("search_terms", 1)] + LIST_ORDER,
+}
+
+
+def create_search_indexes(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+    for name, keys in INDEXES.items():
+        collection.create_index(keys, name=name)
+
+
+def drop_search_indexes(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    collection = schema_editor.connection.connection[Task._meta.db_table]
+    for name in INDEXES:
+        collection.drop_index(name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0017_task_status_list_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_created_578036_idx',
+        ),
+    ]
@@ -1,10 +1,34 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from djongo.models import DjongoManager, JSONField
 from apps.projects.models import Project
+from .search import build_search_terms
+import datetime
 import uuid
 
 User = get_user_model()
 
+# Stored in place of "no due date" in Task.due_sort, after every real date
+NO_DUE_DATE = datetime.date(9999, 12, 31)
+
+
+def due_sort_key(due_date):
+    return due_date or NO_DUE_DATE
+
+
+class DueSortField(models.DateField):
+    """
+    Copy of the task's due_date where "no due date" is NO_DUE_DATE, so an
+    ascending (indexed) sort puts the tasks without a due date last.
+    Always derived from due_date when the task is written.
+    """
+
+    def pre_save(self, model_instance, add):
+        value = due_sort_key(model_instance.due_date)
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Task(models.Model):
     # This will generated a public id which will be used for details, edit and delete
     public_id = models.CharField(
@@ -90,6 +114,8 @@ class Task(models.Model):
     )
 
     due_date = models.DateField(null=True, blank=True)
+    # Sort key of the task list: due date, tasks without one last
+    due_sort = DueSortField(default=NO_DUE_DATE, editable=False)
 
     # when the task was actually completed (optional)
     completed_at = models.DateTimeField(null=True, blank=True)
@@ -97,17 +123,46 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Per-task inverted index used by the search box (see search.py).
+    # Always rebuilt from title/description in save().
+    search_terms = JSONField(default=list, blank=True, editable=False)
+    title_terms = JSONField(default=list, blank=True, editable=False)
+
+    # mongo_* methods give us aggregation pipelines on the raw collection
+    objects = DjongoManager()
+
     class Meta:
-        ordering = ["task_type", "status", "due_date", "-created_at"]
-        indexes = [
-            # Index to speed up "tasks for this user by status"
-            models.Index(fields=["created_by", "status"]),
-        ]
+        # Same order as the task list, served by tasks_task_due_sort_idx
+        ordering = ["due_sort", "-created_at", "-id"]
+        # "Tasks for this user by status" (in list order) is served by
+        # tasks_task_status_list_idx, created by migration 0017, and the two
+        # search tiers (search.py) by the multikey indexes of migration 0018
 
     def __str__(self):
         if self.project:
             return f"[{self.project.name}] {self.title}"
         return self.title
+
+    def refresh_search_terms(self):
+        self.search_terms, self.title_terms = build_search_terms(
+            self.title, self.description
+        )
+
+    def save(self, *args, **kwargs):
+        self.refresh_search_terms()
+
+        # Partial saves that touch the text / due date must also write
+        # what is derived from them
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {"title", "description"} & update_fields:
+                update_fields |= {"search_terms", "title_terms"}
+            if "due_date" in update_fields:
+                update_fields.add("due_sort")
+            kwargs["update_fields"] = update_fields
+
+        super().save(*args, **kwargs)
     
 
 class Tip(models.Model):
@@ -122,11 +177,51 @@ class Tip(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
-        indexes = [
-            # Index to speed up "tips for this user ordered by date"
-            models.Index(fields=["user", "created_at"]),
-        ]
+        # Same order as the saved tips pages, served by
+        # tasks_tip_user_recent_idx (migration 0014, mixed directions)
+        ordering = ["-created_at", "-id"]
 
     def __str__(self):
         return f"{self.category or 'Tip'}: {self.text[:40]}..."
+
+
+class TaskStats(models.Model):
+    """
+    Materialized dashboard counters for one user.
+
+    The counters only make sense for the window they were computed in:
+    - week_start: Monday of the week the "this week" counters belong to
+    - stats_date: the day "urgent_today" and "overdue" were computed for
+
+    The write paths bump these with $inc. The scheduler rolls the documents
+    to the new window after midnight (apps/tasks/scheduler.py), and
+    apps/tasks/stats.py rebuilds one a request finds stale or missing.
+    """
+
+    # user is the primary key so the doc can be upserted by user_id directly
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="task_stats",
+    )
+
+    week_start = models.DateField(null=True, blank=True)
+    in_progress_this_week = models.IntegerField(default=0)
+    completed_this_week = models.IntegerField(default=0)
+
+    stats_date = models.DateField(null=True, blank=True)
+    urgent_today = models.IntegerField(default=0)
+    # Open tasks due before stats_date
+    overdue = models.IntegerField(default=0)
+
+    # Bumped on every write to the user's tasks (ETag of the task endpoints)
+    version = models.BigIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # mongo_* methods give us atomic $inc / upserts on the raw collection
+    objects = DjongoManager()
+
+    def __str__(self):
+        return f"Stats for {self.user} ({self.week_start})"
@@ -0,0 +1,210 @@
+# NOTES:
+# Keyset ("cursor") pagination for the task list API.
+# Instead of OFFSET (which still walks every skipped row) we remember the sort
+# key of the last task we sent, and the next page starts right after it:
+#   ORDER BY due_sort ASC, created_at DESC, id DESC
+# id is only there as a tie-breaker so two tasks with the same due date and
+# creation time never get skipped or repeated.
+#
+# due_sort is the due date with "no due date" stored as a far-future date
+# (models.NO_DUE_DATE), so tasks without one come last and the database
+# sorts (and pages) them with the same index as everything else.
+
+import base64
+import datetime
+import json
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import due_sort_key
+from .search import SEARCH_TIERS
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+TASK_LIST_ORDERING = ("due_sort", "-created_at", "-id")
+# Same order for raw pymongo queries
+TASK_LIST_SORT = [("due_sort", 1), ("created_at", -1), ("id", -1)]
+
+# Saved tips: newest first, served by tasks_tip_user_recent_idx
+TIPS_PAGE_SIZE = 20
+TIP_LIST_ORDERING = ("-created_at", "-id")
+TIP_LIST_SORT = [("created_at", -1), ("id", -1)]
+
+
+class InvalidCursor(ValueError):
+    """
+    Raised when the client sends a cursor we did not produce.
+    """
+
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Clamp the ?limit= query param into [1, maximum].
+    """
+    try:
+        limit = int(raw_limit)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(task):
+    """
+    Build an opaque cursor that points right after this task.
+    """
+    key = [
+        task.due_date.isoformat() if task.due_date else None,
+        task.created_at.isoformat() if task.created_at else None,
+        task.pk,
+    ]
+    raw = json.dumps(key, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """
+    Inverse of encode_cursor(). Returns (due_date, created_at, pk).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        due_raw, created_raw, pk = json.loads(base64.urlsafe_b64decode(padded))
+
+        due_date = datetime.date.fromisoformat(due_raw) if due_raw else None
+        created_at = datetime.datetime.fromisoformat(created_raw)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor.")
+
+    return due_date, created_at, pk
+
+
+def filter_after_cursor(qs, cursor):
+    """
+    Keep only the tasks that sort strictly after the cursor.
+    """
+    due_date, created_at, pk = decode_cursor(cursor)
+    due_sort = due_sort_key(due_date)
+
+    # Same due date: newer first, then higher id first
+    same_due = Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+
+    return qs.filter(Q(due_sort__gt=due_sort) | (Q(due_sort=due_sort) & same_due))
+
+
+def mongo_filter_after_cursor(cursor):
+    """
+    Raw MongoDB version of filter_after_cursor(), for the async views.
+    Values use djongo's storage shape (naive UTC datetimes, dates at midnight).
+    """
+    due_date, created_at, pk = decode_cursor(cursor)
+    if timezone.is_aware(created_at):
+        created_at = timezone.make_naive(created_at, datetime.timezone.utc)
+
+    same_due = {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": pk}},
+        ]
+    }
+
+    due = datetime.datetime.combine(due_sort_key(due_date), datetime.time.min)
+    return {"$or": [{"due_sort": {"$gt": due}}, {"due_sort": due, **same_due}]}
+
+
+def paginate_tasks(qs, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    Return (tasks, next_cursor) for one page.
+    We fetch limit + 1 rows so we know if there is a next page without
+    running a separate count query.
+    """
+    qs = qs.order_by(*TASK_LIST_ORDERING)
+
+    if cursor:
+        qs = filter_after_cursor(qs, cursor)
+
+    tasks = list(qs[: limit + 1])
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    next_cursor = encode_cursor(tasks[-1]) if has_more and tasks else None
+    return tasks, next_cursor
+
+
+# ------------ Search ------------
+
+def encode_search_cursor(tier, task):
+    """
+    Cursor pointing right after this task of a search ranking tier
+    (search.SEARCH_TIERS): "<tier>.<list cursor>".
+    """
+    return f"{tier}.{encode_cursor(task)}"
+
+
+def decode_search_cursor(cursor):
+    """
+    Inverse of encode_search_cursor(). Returns (tier, list cursor).
+    """
+    tier, _, task_cursor = cursor.partition(".")
+    if tier not in SEARCH_TIERS:
+        raise InvalidCursor("Invalid cursor.")
+    decode_cursor(task_cursor)
+    return tier, task_cursor
+
+
+# ------------ Saved tips ------------
+
+def encode_tip_cursor(tip):
+    """
+    Opaque cursor pointing right after this tip.
+    """
+    raw = json.dumps([tip.created_at.isoformat(), tip.pk], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_tip_cursor(cursor):
+    """
+    Inverse of encode_tip_cursor(). Returns (created_at, pk).
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, pk = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.datetime.fromisoformat(created_raw), int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor.")
+
+
+def paginate_tips(qs, cursor=None, limit=TIPS_PAGE_SIZE):
+    """
+    Return (tips, next_cursor) for one page of saved tips, newest first.
+    """
+    qs = qs.order_by(*TIP_LIST_ORDERING)
+
+    if cursor:
+        created_at, pk = decode_tip_cursor(cursor)
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    tips = list(qs[: limit + 1])
+    has_more = len(tips) > limit
+    tips = tips[:limit]
+
+    next_cursor = encode_tip_cursor(tips[-1]) if has_more and tips else None
+    return tips, next_cursor
+
+
+def mongo_filter_after_tip_cursor(cursor):
+    """
+    Raw MongoDB version of the paginate_tips() cursor filter, for the async
+    views.
+    """
+    created_at, pk = decode_tip_cursor(cursor)
+    if timezone.is_aware(created_at):
+        created_at = timezone.make_naive(created_at, datetime.timezone.utc)
+
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": pk}},
+        ]
+    }
@@ -0,0 +1,98 @@
+# NOTES:
+# Background job for the date-dependent dashboard counters.
+#
+# "urgent today", "overdue" and the "this week" counters change at midnight
+# without any task write. Instead of leaving it to the first request of the
+# day (which then pays four count queries per user), the scheduler rolls
+# every stats doc to the new window right after the day (and so the week)
+# boundary. Request handlers then only read the doc.
+#
+# - restart-safe: which docs still need rolling is stored in the docs
+#   themselves (stats_date), so a scheduler started after a crash, a
+#   deploy or a night off simply rolls whatever is still stale
+# - idempotent: a doc is only written if it is still on an old window, two
+#   schedulers (or a scheduler and a request) never roll a doc twice
+# - the clock is injectable, tests drive it without sleeping
+#
+# Run it as one separate worker: `manage.py run_scheduler`
+# (or `run_scheduler --once` from cron right after midnight).
+
+import logging
+import threading
+
+from django.utils import timezone
+
+from .models import TaskStats
+from .stats import roll_task_stats, stale_stats_filter
+
+logger = logging.getLogger(__name__)
+
+ROLL_BATCH_SIZE = 500
+# How often the scheduler looks at the clock (the roll is at most this late)
+CHECK_INTERVAL = 30.0
+
+
+def roll_stats(today=None):
+    """
+    Roll every stats doc that is not on today's window.
+    Returns the number of docs rolled.
+    """
+    today = today or timezone.localdate()
+    cursor = TaskStats.objects.mongo_find(
+        stale_stats_filter(today),
+        projection={"_id": 0, "user_id": 1},
+        batch_size=ROLL_BATCH_SIZE,
+    )
+
+    rolled = 0
+    try:
+        for doc in cursor:
+            if roll_task_stats(doc["user_id"], today) is not None:
+                rolled += 1
+    finally:
+        cursor.close()
+    return rolled
+
+
+class DailyScheduler:
+    """
+    Runs `job(today)` once per local day: when started, then after every
+    midnight. A failed run is retried at the next check.
+    """
+
+    def __init__(self, job=roll_stats, clock=timezone.now, check_interval=CHECK_INTERVAL):
+        self.job = job
+        self._clock = clock
+        self.check_interval = check_interval
+        self.last_day = None
+        self.stopped = threading.Event()
+
+    def today(self):
+        return timezone.localdate(self._clock())
+
+    def run_pending(self):
+        """
+        Run the job if it hasn't run for today yet. Returns its result, or
+        None when there was nothing to run.
+        """
+        today = self.today()
+        if today == self.last_day:
+            return None
+
+        result = self.job(today)
+        # Only after a successful run, a failure is retried
+        self.last_day = today
+        return result
+
+    def run_forever(self):
+        while not self.stopped.is_set():
+            try:
+                rolled = self.run_pending()
+                if rolled is not None:
+                    logger.info("Rolled %s stats docs to %s.", rolled, self.last_day)
+            except Exception:
+                logger.warning("Scheduled stats roll failed, retrying.", exc_info=True)
+            self.stopped.wait(self.check_interval)
+
+    def stop(self):
+        self.stopped.set()
@@ -0,0 +1,111 @@
+# NOTES:
+# Task search used to be title__icontains, which djongo turns into an
+# unanchored regex over every task document (and it never looked at the
+# description).
+#
+# Instead every task keeps a small inverted index on its own document:
+# - search_terms: the prefixes of the words of the title + the first
+#   MAX_DESCRIPTION_WORDS words of the description
+# - title_terms:  the same, for the title only (used to rank title hits higher)
+#
+# Prefixes go from MIN_PREFIX_LENGTH to MAX_PREFIX_LENGTH characters, and
+# query words shorter than MIN_PREFIX_LENGTH are ignored (one letter matches
+# almost everything anyway). A word adds at most 19 terms, so a task has at
+# most 19 * (title words + MAX_DESCRIPTION_WORDS) of them: a 255 character
+# title has at most 85 words of 2+ characters, so under 2,600 terms in the
+# worst case and a few dozen for a usual task, whatever the description size.
+#
+# A query like "proj mee" becomes {search_terms: {$all: ["proj", "mee"]}}.
+# Results are ranked in two tiers, each in list order (due_sort, created_at,
+# id) and paginated like the list:
+# 1. tasks with every term in the title ({title_terms: {$all: ...}})
+# 2. the other matches (a term only in the description)
+# Each tier is a find on a multikey index that ends with the list order
+# (migration 0018), so a page reads about `limit` index entries even when
+# a short prefix like "pl" matches thousands of tasks: nothing is loaded and
+# sorted in memory.
+# This module only builds terms and filters, the views run them.
+
+import re
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# Shorter query words are ignored, shorter prefixes are not indexed
+MIN_PREFIX_LENGTH = 2
+# Longer prefixes than this are very unlikely to be typed, keep docs small
+MAX_PREFIX_LENGTH = 20
+# Long descriptions only contribute their first words to the index
+MAX_DESCRIPTION_WORDS = 50
+# A search box query never needs more than a handful of words
+MAX_QUERY_TERMS = 8
+
+# Ranking tiers, best first (see search_filter())
+TITLE_TIER = "t"
+OTHER_TIER = "d"
+SEARCH_TIERS = (TITLE_TIER, OTHER_TIER)
+
+
+def tokenize(text, limit=None, exclude=()):
+    """
+    Lowercase words of a text that can be searched (MIN_PREFIX_LENGTH
+    characters or more), in order, without duplicates and without the ones
+    in `exclude`. Stops after `limit` words.
+    """
+    seen = []
+    for match in WORD_RE.finditer((text or "").lower()):
+        word = match.group()
+        if len(word) < MIN_PREFIX_LENGTH or word in seen or word in exclude:
+            continue
+        seen.append(word)
+        if limit is not None and len(seen) >= limit:
+            break
+    return seen
+
+
+def prefixes(words):
+    """
+    The indexed prefixes of the given words ("task" -> ta, tas, task).
+    """
+    terms = set()
+    for word in words:
+        for length in range(MIN_PREFIX_LENGTH, min(len(word), MAX_PREFIX_LENGTH) + 1):
+            terms.add(word[:length])
+    return sorted(terms)
+
+
+def build_search_terms(title, description=""):
+    """
+    Return (search_terms, title_terms) to store on a task document.
+    """
+    title_words = tokenize(title)
+    description_words = tokenize(description, MAX_DESCRIPTION_WORDS, exclude=title_words)
+
+    title_terms = prefixes(title_words)
+    search_terms = prefixes(title_words + description_words)
+    return search_terms, title_terms
+
+
+def query_terms(query):
+    """
+    Terms to look up for a search box query. Every word is treated as a
+    prefix, so results show up while the user is still typing. Words shorter
+    than MIN_PREFIX_LENGTH are left out.
+    """
+    return [word[:MAX_PREFIX_LENGTH] for word in tokenize(query, MAX_QUERY_TERMS)]
+
+
+def search_filter(user_id, terms, tier, status=None):
+    """
+    Raw filter of one ranking tier of the user's matches for the terms:
+    TITLE_TIER is the tasks with every term in their title, OTHER_TIER the
+    rest of the matches.
+    """
+    query = {"created_by_id": user_id}
+    if tier == TITLE_TIER:
+        query["title_terms"] = {"$all": terms}
+    else:
+        query["search_terms"] = {"$all": terms}
+        query["title_terms"] = {"$not": {"$all": terms}}
+    if status:
+        query["status"] = status
+    return query
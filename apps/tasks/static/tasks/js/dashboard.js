@@ -46,11 +46,20 @@
     (root && root.dataset.apiListUrl) || "/tasks/api/tasks/";
   const detailBaseUrl =
     (root && root.dataset.apiDetailBaseUrl) || "/tasks/api/tasks/";
+  const bulkUrl =
+    (root && root.dataset.apiBulkUrl) || "/tasks/api/tasks/bulk/";
 
   // Current tab filter: "all", "in_progress", "done"
   let currentStatusFilter = "all";
   let currentSearchQuery = "";
 
+  // "Select" mode: row checkboxes pick tasks for a bulk "mark as done"
+  let selectMode = false;
+  const selectedTaskIds = new Set();
+
+  // The tasks shown in the table, by id (used to place live updates)
+  const loadedTasks = new Map();
+
   // ---------------- Add Task panel open/close helpers ----------------
   const openPanel = () => {
     if (!panel) return;
@@ -376,27 +385,15 @@
   };
 
   // ---------------- Render & load functions ----------------
-  const renderTasks = (tasks) => {
-    if (!tableBody) return;
-
-    tableBody.innerHTML = "";
-
-    if (!tasks.length) {
-      tableBody.innerHTML = `
-        <tr>
-          <td colspan="3" class="px-6 py-4 text-sm text-slate-400">
-            No tasks yet. Click “Add Task” to create your first one.
-          </td>
-        </tr>`;
-      return;
+  const taskRowHtml = (task) => {
+    let checkboxState = "";
+    if (task.status === "done") {
+      checkboxState = "checked disabled";
+    } else if (selectedTaskIds.has(task.id)) {
+      checkboxState = "checked";
     }
 
-    const rowsHtml = tasks
-      .map((task) => {
-        const checkboxState =
-          task.status === "done" ? "checked disabled" : "";
-
-        return `
+    return `
           <tr data-task-id="${task.id}"
               class="hover:bg-slate-50 cursor-pointer">
             <td class="px-6 py-3 text-slate-800">
@@ -417,15 +414,68 @@
               ${statusPillHtml(task.status)}
             </td>
           </tr>`;
-      })
-      .join("");
+  };
 
-    tableBody.innerHTML = rowsHtml;
+  const renderTasks = (tasks) => {
+    if (!tableBody) return;
+
+    tableBody.innerHTML = "";
+    loadedTasks.clear();
+    tasks.forEach((task) => loadedTasks.set(task.id, task));
+
+    if (!tasks.length) {
+      tableBody.innerHTML = `
+        <tr>
+          <td colspan="3" class="px-6 py-4 text-sm text-slate-400">
+            No tasks yet. Click “Add Task” to create your first one.
+          </td>
+        </tr>`;
+      return;
+    }
+
+    tableBody.innerHTML = tasks.map(taskRowHtml).join("");
   };
 
-  async function loadTasks(statusFilter = "all", searchQuery = "") {
-    if (!listUrl) return;
+  // Add the next page under the rows we already have
+  const appendTasks = (tasks) => {
+    if (!tableBody || !tasks.length) return;
+    tasks.forEach((task) => loadedTasks.set(task.id, task));
+    tableBody.insertAdjacentHTML("beforeend", tasks.map(taskRowHtml).join(""));
+  };
+
+  const renderStats = (stats) => {
+    if (!stats) return;
+
+    const inProgressEl = document.getElementById("stat-in-progress");
+    const completedEl = document.getElementById("stat-completed");
+    const urgentEl = document.getElementById("stat-urgent-today");
+    const overdueEl = document.getElementById("stat-overdue");
+
+    if (inProgressEl) {
+      inProgressEl.textContent = stats.tasks_in_progress_this_week;
+    }
+    if (completedEl) {
+      completedEl.textContent = stats.tasks_completed_this_week;
+    }
+    if (urgentEl) {
+      urgentEl.textContent = stats.tasks_urgent_today;
+    }
+    if (overdueEl) {
+      overdueEl.textContent = stats.tasks_overdue;
+    }
+  };
 
+  // ---------------- Pagination state ----------------
+  // The list API returns one page + a "next" cursor. We keep the cursor of
+  // the current filter and fetch the following page when the table is
+  // scrolled close to the bottom.
+  const PAGE_SIZE = 50;
+  let nextCursor = null;
+  let isLoadingPage = false;
+  // Bumped on every fresh load so late responses for an old filter are ignored
+  let listRequestId = 0;
+
+  const buildListUrl = (statusFilter, searchQuery, cursor = null) => {
     const params = new URLSearchParams();
 
     if (statusFilter && statusFilter !== "all") {
@@ -436,10 +486,23 @@
       params.append("q", searchQuery.trim());
     }
 
-    const url =
-      params.toString().length > 0 ? `${listUrl}?${params.toString()}` : listUrl;
+    params.append("limit", PAGE_SIZE);
+
+    if (cursor) {
+      params.append("cursor", cursor);
+    }
+
+    return `${listUrl}?${params.toString()}`;
+  };
+
+  async function loadTasks(statusFilter = "all", searchQuery = "") {
+    if (!listUrl) return;
+
+    const requestId = ++listRequestId;
+    const url = buildListUrl(statusFilter, searchQuery);
 
     try {
+      isLoadingPage = true;
       const response = await fetch(url, {
         headers: {
           "X-Requested-With": "XMLHttpRequest",
@@ -452,30 +515,185 @@
       }
 
       const data = await response.json();
+      if (requestId !== listRequestId) return;
+
+      nextCursor = data.next || null;
       renderTasks(data.tasks || []);
+      renderStats(data.stats);
+    } catch (err) {
+      console.error("Error loading tasks", err);
+    } finally {
+      if (requestId === listRequestId) {
+        isLoadingPage = false;
+      }
+    }
+  }
 
-      if (data.stats) {
-        const inProgressEl = document.getElementById("stat-in-progress");
-        const completedEl = document.getElementById("stat-completed");
-        const urgentEl = document.getElementById("stat-urgent-today");
+  async function loadNextPage() {
+    if (!listUrl || !nextCursor || isLoadingPage) return;
 
-        if (inProgressEl) {
-          inProgressEl.textContent = data.stats.tasks_in_progress_this_week;
-        }
-        if (completedEl) {
-          completedEl.textContent = data.stats.tasks_completed_this_week;
-        }
-        if (urgentEl) {
-          urgentEl.textContent = data.stats.tasks_urgent_today;
-        }
+    const requestId = listRequestId;
+    const url = buildListUrl(
+      currentStatusFilter,
+      currentSearchQuery,
+      nextCursor
+    );
+
+    try {
+      isLoadingPage = true;
+      const response = await fetch(url, {
+        headers: {
+          "X-Requested-With": "XMLHttpRequest",
+        },
+      });
+
+      if (!response.ok) {
+        console.error("Failed to load more tasks", response.status);
+        return;
       }
+
+      const data = await response.json();
+      if (requestId !== listRequestId) return;
+
+      nextCursor = data.next || null;
+      appendTasks(data.tasks || []);
     } catch (err) {
-      console.error("Error loading tasks", err);
+      console.error("Error loading more tasks", err);
+    } finally {
+      if (requestId === listRequestId) {
+        isLoadingPage = false;
+      }
     }
   }
 
+  // ---------------- Live updates (server push) ----------------
+  // Under ASGI the server pushes every change to our tasks over SSE
+  // (/tasks/events/), also the ones made in other tabs. Rows are patched in
+  // place and the stat cards take the pushed counters, so writes don't
+  // reload the list. Without the stream (runserver / WSGI) we reload after
+  // our own writes like before.
+  const eventsUrl = (root && root.dataset.eventsUrl) || "/tasks/events/";
+  let liveConnected = false;
+  let liveWasConnected = false;
+
+  async function refreshAfterWrite() {
+    if (liveConnected) return;
+    await loadTasks(currentStatusFilter, currentSearchQuery);
+  }
+
+  // Same order as the list API: due date (tasks without one last),
+  // then newest first
+  const compareTasks = (a, b) => {
+    if (a.due_date !== b.due_date) {
+      if (!a.due_date) return 1;
+      if (!b.due_date) return -1;
+      return a.due_date < b.due_date ? -1 : 1;
+    }
+    if (a.created_at === b.created_at) return 0;
+    return (a.created_at || "") > (b.created_at || "") ? -1 : 1;
+  };
+
+  const removeTaskRow = (taskId) => {
+    const row = tableBody.querySelector(`tr[data-task-id="${taskId}"]`);
+    if (row) row.remove();
+    loadedTasks.delete(taskId);
+
+    if (selectedTaskIds.delete(taskId)) updateBulkButton();
+  };
+
+  const applyTaskEvent = (event) => {
+    if (!tableBody || !event.id) return;
+
+    const task = event.task;
+    const wasShown = loadedTasks.has(event.id);
+    removeTaskRow(event.id);
+
+    if (!task || event.type === "deleted") return;
+    if (currentStatusFilter !== "all" && task.status !== currentStatusFilter) {
+      return;
+    }
+    // We can't tell if a new task matches the search, leave the results as they are
+    if (currentSearchQuery && !wasShown) return;
+
+    const before = Array.from(
+      tableBody.querySelectorAll("tr[data-task-id]")
+    ).find((row) => {
+      const other = loadedTasks.get(row.getAttribute("data-task-id"));
+      return other && compareTasks(task, other) < 0;
+    });
+
+    // Sorts after the loaded rows: it comes with a later page
+    if (!before && nextCursor) return;
+
+    if (!loadedTasks.size) tableBody.innerHTML = "";
+    loadedTasks.set(task.id, task);
+
+    if (before) {
+      before.insertAdjacentHTML("beforebegin", taskRowHtml(task));
+    } else {
+      tableBody.insertAdjacentHTML("beforeend", taskRowHtml(task));
+    }
+  };
+
+  const connectLiveUpdates = () => {
+    if (!window.EventSource || !tableBody) return;
+
+    const source = new EventSource(eventsUrl);
+
+    source.addEventListener("open", () => {
+      // Changes made while we were disconnected never reached us
+      if (liveWasConnected) loadTasks(currentStatusFilter, currentSearchQuery);
+      liveConnected = true;
+      liveWasConnected = true;
+    });
+
+    source.addEventListener("error", () => {
+      // The browser reconnects by itself, reload after writes meanwhile
+      liveConnected = false;
+    });
+
+    source.addEventListener("tasks", (message) => {
+      let data;
+      try {
+        data = JSON.parse(message.data);
+      } catch (err) {
+        console.error("Invalid live update", err);
+        return;
+      }
+
+      const events = data.events || [];
+      if (events.some((event) => event.type === "resync")) {
+        loadTasks(currentStatusFilter, currentSearchQuery);
+        return;
+      }
+
+      events.forEach(applyTaskEvent);
+      if (!loadedTasks.size && !nextCursor) renderTasks([]);
+      renderStats(data.stats);
+    });
+  };
+
+  // Lazy load the next page when the table's scroll area gets near the end
+  const tableScrollArea = tableBody
+    ? tableBody.closest(".overflow-y-auto")
+    : null;
+
+  if (tableScrollArea) {
+    tableScrollArea.addEventListener("scroll", () => {
+      const distanceToBottom =
+        tableScrollArea.scrollHeight -
+        tableScrollArea.scrollTop -
+        tableScrollArea.clientHeight;
+
+      if (distanceToBottom < 80) {
+        loadNextPage();
+      }
+    });
+  }
+
   // Initial load
   loadTasks(currentStatusFilter, currentSearchQuery);
+  connectLiveUpdates();
   attachTaskRowClickHandlers();
   setActiveStatusTab(currentStatusFilter);
 
@@ -509,7 +727,7 @@
           return;
         }
 
-        await loadTasks(currentStatusFilter, currentSearchQuery);
+        await refreshAfterWrite();
         closePanel();
 
         // Show confirmation message
@@ -580,7 +798,7 @@
         checkboxEl.disabled = true;
       }
 
-      await loadTasks(currentStatusFilter, currentSearchQuery);
+      await refreshAfterWrite();
     } catch (err) {
       console.error("[checkbox] Error marking complete", err);
       if (checkboxEl) {
@@ -602,6 +820,17 @@
       const taskId = checkbox.getAttribute("data-task-id");
       if (!taskId) return;
 
+      // In select mode the checkbox only selects the row
+      if (selectMode) {
+        if (checkbox.checked) {
+          selectedTaskIds.add(taskId);
+        } else {
+          selectedTaskIds.delete(taskId);
+        }
+        updateBulkButton();
+        return;
+      }
+
       if (!checkbox.checked) {
         checkbox.checked = true;
         return;
@@ -611,6 +840,93 @@
     });
   }
 
+  // ----------------------- Select many -> mark done ---------------------
+  // One request to the bulk API instead of one per task.
+  const toggleSelectBtn = document.getElementById("toggle-select-mode");
+  const bulkCompleteBtn = document.getElementById("bulk-complete-btn");
+  const bulkCountEl = document.getElementById("bulk-selected-count");
+
+  const updateBulkButton = () => {
+    if (bulkCountEl) bulkCountEl.textContent = selectedTaskIds.size;
+    if (bulkCompleteBtn) bulkCompleteBtn.disabled = selectedTaskIds.size === 0;
+  };
+
+  const setSelectMode = (enabled) => {
+    selectMode = enabled;
+    selectedTaskIds.clear();
+    updateBulkButton();
+
+    if (bulkCompleteBtn) bulkCompleteBtn.classList.toggle("hidden", !enabled);
+    if (toggleSelectBtn) {
+      toggleSelectBtn.querySelector("span").textContent = enabled
+        ? "Cancel"
+        : "Select";
+    }
+
+    // Clear the selection marks, done tasks stay checked
+    if (tableBody) {
+      tableBody
+        .querySelectorAll('input[type="checkbox"][data-task-id]:not(:disabled)')
+        .forEach((el) => {
+          el.checked = false;
+        });
+    }
+  };
+
+  const bulkCompleteSelected = async () => {
+    if (!selectedTaskIds.size) return;
+
+    const operations = Array.from(selectedTaskIds).map((id) => ({
+      op: "complete",
+      id,
+    }));
+
+    try {
+      if (bulkCompleteBtn) bulkCompleteBtn.disabled = true;
+
+      const response = await fetch(bulkUrl, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          "X-CSRFToken": getCsrfToken(),
+          "X-Requested-With": "XMLHttpRequest",
+        },
+        body: JSON.stringify({ operations }),
+      });
+
+      const data = await response.json().catch(() => ({}));
+
+      if (!response.ok) {
+        console.error("[bulk] Failed to mark tasks done", response.status, data);
+        alert("Could not update the selected tasks. Please try again.");
+        updateBulkButton();
+        return;
+      }
+
+      const failed = (data.results || []).filter((r) => !r.ok);
+      if (failed.length) {
+        console.warn("[bulk] Some tasks were not updated", failed);
+        alert(`${failed.length} task(s) could not be marked as done.`);
+      } else if (window.showToast) {
+        window.showToast(`${operations.length} task(s) marked as done.`);
+      }
+
+      setSelectMode(false);
+      await refreshAfterWrite();
+    } catch (err) {
+      console.error("[bulk] Error marking tasks done", err);
+      alert("Network error while updating the tasks. Please try again.");
+      updateBulkButton();
+    }
+  };
+
+  if (toggleSelectBtn) {
+    toggleSelectBtn.addEventListener("click", () => setSelectMode(!selectMode));
+  }
+  if (bulkCompleteBtn) {
+    bulkCompleteBtn.addEventListener("click", bulkCompleteSelected);
+  }
+
   // --------------- Delete task from details modal ---------------
   const handleDeleteTaskClick = async () => {
     if (!taskDetailsTaskIdInput) return;
@@ -646,7 +962,7 @@
       }
 
       closeDetailsPanel();
-      await loadTasks(currentStatusFilter, currentSearchQuery);
+      await refreshAfterWrite();
     } catch (err) {
       console.error("Error deleting task", err);
       alert("Network error while deleting the task. Please try again.");
@@ -822,7 +1138,7 @@
           return;
         }
 
-        await loadTasks(currentStatusFilter, currentSearchQuery);
+        await refreshAfterWrite();
 
         if (data.task) {
           renderTaskDetails(data.task);
@@ -884,7 +1200,7 @@
     if (!limited.length) {
       searchSuggestionsEl.innerHTML = `
         <div class="px-3 py-2 text-slate-400 text-xs">
-          No task titles match
+          No tasks match
         </div>
       `;
       searchSuggestionsEl.classList.remove("hidden");
@@ -932,6 +1248,8 @@
       params.append("status", currentStatusFilter);
     }
     params.append("q", query.trim());
+    // The dropdown only shows 5 suggestions
+    params.append("limit", 5);
 
     const url = `${listUrl}?${params.toString()}`;
 
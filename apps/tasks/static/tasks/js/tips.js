@@ -233,6 +233,9 @@ document.addEventListener("DOMContentLoaded", function () {
   const errorEl = document.getElementById("tip-error");
   const successEl = document.getElementById("tip-success");
   const savedTipsTableBody = document.getElementById("saved-tips-table-body");
+  const savedTipsScroll = document.getElementById("saved-tips-scroll");
+  const savedTipsSentinel = document.getElementById("saved-tips-sentinel");
+  const savedTipsLoading = document.getElementById("saved-tips-loading");
   const layout = document.getElementById("tips-layout");
 
   // -------------------------
@@ -291,9 +294,112 @@ document.addEventListener("DOMContentLoaded", function () {
     }
   };
 
+  // -------------------------
+  // Saved tip rows
+  // -------------------------
+  const buildTipRow = (tip) => {
+    const row = document.createElement("tr");
+    row.setAttribute("data-tip-id", tip.id);
+    row.className = "hover:bg-slate-50";
+
+    row.innerHTML = `
+      <td class="px-6 py-3 text-slate-800 align-top">
+        <p class="text-sm"></p>
+      </td>
+      <td class="px-6 py-3 text-slate-500 text-xs align-top whitespace-nowrap">
+        ${tip.created_at.slice(0, 19).replace("T", " ")}
+      </td>
+      <td class="px-6 py-3 text-right align-top">
+        <button
+          type="button"
+          class="inline-flex items-center justify-center rounded-full p-2 text-slate-400 hover:text-rose-500 delete-tip-btn"
+          title="Delete tip"
+        >
+          <iconify-icon icon="lucide:trash-2" class="text-lg"></iconify-icon>
+        </button>
+      </td>
+    `;
+    // Tip text is user data, never parse it as HTML
+    row.querySelector("p").textContent = tip.text;
+    return row;
+  };
+
+  // -------------------------
+  // Infinite scroll over the saved tips
+  // -------------------------
+  // The first page comes with the HTML, its "next" cursor is on the tbody.
+  // Pages are keyset-paginated, so deleting or saving tips meanwhile never
+  // shifts the next page.
+  let nextTipsCursor = savedTipsTableBody ? savedTipsTableBody.dataset.nextCursor : "";
+  let loadingTips = false;
+
+  const loadMoreTips = () => {
+    if (!nextTipsCursor || loadingTips) return;
+    loadingTips = true;
+    if (savedTipsLoading) {
+      savedTipsLoading.classList.remove("hidden");
+    }
+
+    const url = `${savedTipsTableBody.dataset.apiUrl}?cursor=${encodeURIComponent(nextTipsCursor)}`;
+    fetch(url, { headers: { "X-Requested-With": "XMLHttpRequest" } })
+      .then((response) => response.json())
+      .then((data) => {
+        if (!data.ok) {
+          nextTipsCursor = "";
+          return;
+        }
+        data.tips.forEach((tip) => {
+          // A tip saved on this page meanwhile is already there
+          if (!savedTipsTableBody.querySelector(`tr[data-tip-id="${tip.id}"]`)) {
+            savedTipsTableBody.appendChild(buildTipRow(tip));
+          }
+        });
+        nextTipsCursor = data.next || "";
+      })
+      .catch((err) => {
+        console.error("Error loading saved tips:", err);
+      })
+      .finally(() => {
+        loadingTips = false;
+        if (savedTipsLoading) {
+          savedTipsLoading.classList.add("hidden");
+        }
+        // Still at the bottom (short page): keep going
+        if (nextTipsCursor && savedTipsScroll && savedTipsSentinel) {
+          const box = savedTipsScroll.getBoundingClientRect();
+          if (savedTipsSentinel.getBoundingClientRect().top <= box.bottom) {
+            loadMoreTips();
+          }
+        }
+      });
+  };
+
+  if (savedTipsTableBody && savedTipsSentinel && "IntersectionObserver" in window) {
+    const observer = new IntersectionObserver(
+      (entries) => {
+        if (entries.some((entry) => entry.isIntersecting)) {
+          loadMoreTips();
+        }
+      },
+      { root: savedTipsScroll, rootMargin: "0px 0px 120px 0px" }
+    );
+    observer.observe(savedTipsSentinel);
+  }
+
   // -------------------------
   // "Get Tip" Button
   // -------------------------
+  // Keys of the last tips shown, sent back so the server skips them
+  // (same limit as RECENT_TIPS_LIMIT in views.py)
+  const RECENT_TIPS_LIMIT = 5;
+  const recentTipKeys = [];
+
+  const tipUrl = () => {
+    if (!recentTipKeys.length) return getBtn.dataset.apiUrl;
+    const separator = getBtn.dataset.apiUrl.includes("?") ? "&" : "?";
+    return `${getBtn.dataset.apiUrl}${separator}exclude=${recentTipKeys.join(",")}`;
+  };
+
   if (getBtn) {
     getBtn.addEventListener("click", function () {
       clearMessages();
@@ -303,7 +409,7 @@ document.addEventListener("DOMContentLoaded", function () {
         loadingTextEl.classList.remove("hidden");
       }
 
-      fetch(getBtn.dataset.apiUrl, {
+      fetch(tipUrl(), {
         headers: { "X-Requested-With": "XMLHttpRequest" },
       })
         .then((response) => response.json())
@@ -326,6 +432,10 @@ document.addEventListener("DOMContentLoaded", function () {
             }
 
             const tip = data.tip;
+            if (tip.id) {
+              recentTipKeys.push(tip.id);
+              recentTipKeys.splice(0, recentTipKeys.length - RECENT_TIPS_LIMIT);
+            }
             if (tipTextEl) {
               tipTextEl.textContent = tip.text;
             }
@@ -391,27 +501,7 @@ document.addEventListener("DOMContentLoaded", function () {
           const tip = data.tip;
           if (!savedTipsTableBody) return;
 
-          const row = document.createElement("tr");
-          row.setAttribute("data-tip-id", tip.id);
-          row.className = "hover:bg-slate-50";
-
-          row.innerHTML = `
-            <td class="px-6 py-3 text-slate-800 align-top">
-              <p class="text-sm">${tip.text}</p>
-            </td>
-            <td class="px-6 py-3 text-slate-500 text-xs align-top whitespace-nowrap">
-              ${tip.created_at.slice(0, 19).replace("T", " ")}
-            </td>
-            <td class="px-6 py-3 text-right align-top">
-              <button
-                type="button"
-                class="inline-flex items-center justify-center rounded-full p-2 text-slate-400 hover:text-rose-500 delete-tip-btn"
-                title="Delete tip"
-              >
-                <iconify-icon icon="lucide:trash-2" class="text-lg"></iconify-icon>
-              </button>
-            </td>
-          `;
+          const row = buildTipRow(tip);
 
           // Remove the "No tips saved yet" row if it's still there
           const emptyRow = document.getElementById("saved-tips-empty-row");
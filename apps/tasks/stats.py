@@ -0,0 +1,370 @@
+# NOTES:
+# The dashboard stats used to be recomputed on every request by loading every
+# task the user ever created. Now each user has one TaskStats document that the
+# write paths keep up to date with $inc, so reading the stats is one indexed
+# find_one on the user's primary key.
+#
+# The counters are tied to a "window" (the current week + the current day).
+# The scheduler (scheduler.py) rolls every doc to the new window right after
+# midnight, so requests normally just read it. When a request still finds a
+# doc on an old window (scheduler not running yet) or no doc, it rebuilds
+# it itself with four indexed count queries.
+#
+# That rebuild is conditional on what the request read (the doc's version,
+# or no doc at all): if another request rebuilt or rolled it meanwhile, the
+# fresh counters are kept and a write path retries its $inc on them instead
+# of overwriting them with its own (possibly older) counts.
+#
+# The same doc carries a "version" counter bumped by every task write, it is
+# what the list/detail endpoints use as ETag.
+
+import datetime
+
+from django.utils import timezone
+from pymongo import ReturnDocument
+
+from apps.projects.rollups import record_project_changes
+
+from .models import Task, TaskStats
+
+OPEN_STATUSES = (Task.STATUS_TODO, Task.STATUS_IN_PROGRESS)
+
+# doc field -> key sent to the frontend / template
+STATS_FIELDS = {
+    "in_progress_this_week": "tasks_in_progress_this_week",
+    "completed_this_week": "tasks_completed_this_week",
+    "urgent_today": "tasks_urgent_today",
+    "overdue": "tasks_overdue",
+}
+
+# A write retries its $inc after somebody else's rebuild at most this often
+STATS_UPDATE_ATTEMPTS = 3
+
+_UNREAD = object()
+
+
+# ------------ Window helpers ------------
+
+def current_window(today=None):
+    """
+    Return (today, start_of_week) for the stats window.
+    Weeks start on Monday, same as the old compute_task_stats().
+    """
+    today = today or timezone.localdate()
+    start_of_week = today - datetime.timedelta(days=today.weekday())
+    return today, start_of_week
+
+
+def to_mongo_date(value):
+    """
+    Djongo stores DateField values as naive datetimes at midnight,
+    so raw queries have to use the same shape.
+    """
+    if value is None:
+        return None
+    return datetime.datetime(value.year, value.month, value.day)
+
+
+def _naive_utc_now():
+    return timezone.make_naive(timezone.now(), datetime.timezone.utc)
+
+
+def task_snapshot(task):
+    """
+    The only fields the stats (and the project rollups) depend on.
+    Accepts a Task or a values() dict.
+    """
+    if task is None:
+        return None
+    if isinstance(task, dict):
+        return {
+            "status": task.get("status"),
+            "due_date": task.get("due_date"),
+            "created_at": task.get("created_at"),
+            "project_id": task.get("project_id"),
+        }
+    return {
+        "status": task.status,
+        "due_date": task.due_date,
+        "created_at": task.created_at,
+        "project_id": task.project_id,
+    }
+
+
+def _contribution(snapshot, today, start_of_week):
+    """
+    How much a single task adds to each counter in the given window.
+    """
+    counts = dict.fromkeys(STATS_FIELDS, 0)
+    if not snapshot:
+        return counts
+
+    status = snapshot.get("status")
+    created_at = snapshot.get("created_at")
+    created_date = timezone.localtime(created_at).date() if created_at else None
+
+    if created_date and start_of_week <= created_date <= today:
+        if status == Task.STATUS_IN_PROGRESS:
+            counts["in_progress_this_week"] += 1
+        elif status == Task.STATUS_DONE:
+            counts["completed_this_week"] += 1
+
+    due_date = snapshot.get("due_date")
+    if due_date and status in OPEN_STATUSES:
+        if due_date == today:
+            counts["urgent_today"] += 1
+        elif due_date < today:
+            counts["overdue"] += 1
+
+    return counts
+
+
+def stats_delta(before, after, today=None):
+    """
+    Difference between two snapshots of the same task, ready for $inc.
+    before=None means the task was created, after=None means it was deleted.
+    Counters that don't change are left out.
+    """
+    today, start_of_week = current_window(today)
+    old = _contribution(before, today, start_of_week)
+    new = _contribution(after, today, start_of_week)
+
+    return {
+        field: new[field] - old[field]
+        for field in STATS_FIELDS
+        if new[field] != old[field]
+    }
+
+
+def serialize_stats(doc):
+    """
+    Convert a TaskStats doc (or dict of counters) into the frontend keys.
+    """
+    doc = doc or {}
+    return {key: doc.get(field, 0) for field, key in STATS_FIELDS.items()}
+
+
+# ------------ Rebuild (also used by the management command) ------------
+
+def compute_stats_from_db(user_id, today=None):
+    """
+    Count the stats straight from the tasks collection.
+    Four count queries, all filtered on created_by first so they hit the
+    (created_by, status) index instead of loading any task into Python.
+    """
+    today, start_of_week = current_window(today)
+    week_start_dt = timezone.make_aware(
+        datetime.datetime.combine(start_of_week, datetime.time.min)
+    )
+
+    user_tasks = Task.objects.filter(created_by_id=user_id)
+    this_week = user_tasks.filter(created_at__gte=week_start_dt)
+
+    return {
+        "in_progress_this_week": this_week.filter(
+            status=Task.STATUS_IN_PROGRESS
+        ).count(),
+        "completed_this_week": this_week.filter(status=Task.STATUS_DONE).count(),
+        "urgent_today": user_tasks.filter(
+            status__in=OPEN_STATUSES, due_date=today
+        ).count(),
+        "overdue": user_tasks.filter(
+            status__in=OPEN_STATUSES, due_date__lt=today
+        ).count(),
+    }
+
+
+def _window_fields(user_id, today):
+    """
+    Freshly counted stats for today's window, as stored on the doc.
+    """
+    today, start_of_week = current_window(today)
+    counts = compute_stats_from_db(user_id, today)
+    return {
+        **counts,
+        "week_start": to_mongo_date(start_of_week),
+        "stats_date": to_mongo_date(today),
+        "updated_at": _naive_utc_now(),
+    }
+
+
+def _window_update(user_id, today):
+    """
+    Update storing freshly counted stats for today's window.
+    Also bumps the version, the payloads that include stats changed too.
+    """
+    return {"$set": _window_fields(user_id, today), "$inc": {"version": 1}}
+
+
+def rebuild_task_stats(user_id, today=None):
+    """
+    Recompute the stats doc for one user and store it (upsert), whatever it
+    holds. For repairs (management command, failed bulk writes); the request
+    paths use refresh_stale_stats().
+    Returns the stored doc.
+    """
+    return TaskStats.objects.mongo_find_one_and_update(
+        {"user_id": user_id},
+        _window_update(user_id, today),
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def refresh_stale_stats(user_id, doc=_UNREAD, today=None):
+    """
+    Rebuild a stats doc that is missing or not on today's window, unless
+    someone else does it first: the write is conditional on the doc read
+    (`doc`, read here if not given) being unchanged.
+    Returns the rebuilt doc, or None if it was already current or changed
+    meanwhile (read it again, or retry the $inc).
+    """
+    if doc is _UNREAD:
+        doc = TaskStats.objects.mongo_find_one({"user_id": user_id})
+    if stats_doc_is_current(doc, today):
+        return None
+
+    if doc is None:
+        # Only insert: a doc created meanwhile is left alone
+        existing = TaskStats.objects.mongo_find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {**_window_fields(user_id, today), "version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.BEFORE,
+        )
+        if existing is not None:
+            return None
+        return TaskStats.objects.mongo_find_one({"user_id": user_id})
+
+    return TaskStats.objects.mongo_find_one_and_update(
+        {"user_id": user_id, "version": doc.get("version")},
+        _window_update(user_id, today),
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def stale_stats_filter(today=None):
+    """
+    Stats docs not on today's window (the week always rolls with the day).
+    """
+    today, _ = current_window(today)
+    return {"stats_date": {"$ne": to_mongo_date(today)}}
+
+
+def roll_task_stats(user_id, today=None):
+    """
+    Move one user's stats doc to today's window, unless it already is
+    (a request or another worker got there first): running it twice is
+    harmless. Returns the updated doc, or None if there was nothing to do.
+    """
+    today, _ = current_window(today)
+    return TaskStats.objects.mongo_find_one_and_update(
+        {"user_id": user_id, **stale_stats_filter(today)},
+        _window_update(user_id, today),
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+# ------------ Read / write paths used by the views ------------
+
+def stats_doc_is_current(doc, today=None):
+    """
+    True if the doc exists and its counters are for today's window.
+    """
+    today, start_of_week = current_window(today)
+    return bool(
+        doc
+        and doc.get("week_start") == to_mongo_date(start_of_week)
+        and doc.get("stats_date") == to_mongo_date(today)
+    )
+
+
+def get_stats_doc(user_id, today=None):
+    """
+    One indexed read in the common case. If the stored window is stale
+    (day or week rolled over) or the doc doesn't exist yet, rebuild it.
+    """
+    doc = TaskStats.objects.mongo_find_one({"user_id": user_id})
+    if stats_doc_is_current(doc, today):
+        return doc
+
+    refreshed = refresh_stale_stats(user_id, doc, today)
+    if refreshed is not None:
+        return refreshed
+    # Rebuilt by someone else meanwhile
+    return TaskStats.objects.mongo_find_one({"user_id": user_id})
+
+
+def get_task_stats(user, today=None):
+    """
+    Dashboard stats of this user in the frontend format.
+    """
+    return serialize_stats(get_stats_doc(user.pk, today))
+
+
+def task_set_version(doc):
+    """
+    Change counter of the user's whole task set (see record_task_change).
+    """
+    return (doc or {}).get("version", 0)
+
+
+def record_task_change(user_id, before, after, today=None):
+    """
+    Apply the effect of one task write to the user's stats doc, and bump
+    the version of the user's task set (used for ETags).
+
+    Call this AFTER the task write. The update only matches a doc that is
+    on the current window; if nothing matched (missing doc / rolled over)
+    we rebuild it from the DB, which already includes this write. If
+    someone else rebuilt it first, the $inc is applied to theirs.
+    Returns the updated stats doc (it goes out with the live events).
+    """
+    return record_task_changes(user_id, [(before, after)], today)
+
+
+def record_task_changes(user_id, changes, today=None):
+    """
+    Same as record_task_change() for a batch of (before, after) pairs:
+    the deltas are summed so the whole batch is still one update.
+    Project tasks also update their projects' rollups.
+    """
+    record_project_changes(changes)
+
+    today, _ = current_window(today)
+    query, update = stats_change_update(user_id, changes, today)
+    for _ in range(STATS_UPDATE_ATTEMPTS):
+        doc = TaskStats.objects.mongo_find_one_and_update(
+            query, update, return_document=ReturnDocument.AFTER
+        )
+        if doc is not None:
+            return doc
+
+        doc = refresh_stale_stats(user_id, today=today)
+        if doc is not None:
+            return doc
+
+    # Kept changing under us: the doc holds somebody else's counters
+    return TaskStats.objects.mongo_find_one({"user_id": user_id})
+
+
+def stats_change_update(user_id, changes, today=None):
+    """
+    (filter, update) applying a batch of (before, after) task snapshots to
+    the stats doc. The filter only matches a doc on the current window.
+    """
+    today, start_of_week = current_window(today)
+
+    total = dict.fromkeys(STATS_FIELDS, 0)
+    for before, after in changes:
+        for field, value in stats_delta(before, after, today).items():
+            total[field] += value
+    delta = {field: value for field, value in total.items() if value}
+
+    query = {
+        "user_id": user_id,
+        "week_start": to_mongo_date(start_of_week),
+        "stats_date": to_mongo_date(today),
+    }
+    update = {"$inc": {**delta, "version": 1}, "$set": {"updated_at": _naive_utc_now()}}
+    return query, update
@@ -1,3 +1,1468 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import random
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db.models.signals import post_save
+from django.test import RequestFactory, SimpleTestCase, TestCase, tag
+from django.urls import reverse
+from django.utils import timezone
+from pymongo.collection import Collection
+from pymongo.cursor import Cursor as PymongoCursor
+from pymongo.database import Database
+from pymongo.errors import AutoReconnect
+
+from apps.projects.models import Project
+from core.db_backend.base import FailoverProxy
+from core.db_backend import command_metrics
+from core.db_backend.command_metrics import CommandRecorder, CommandTracker
+from core.db_backend.endpoints import EndpointSelector
+from core.db_backend.pool_metrics import PoolMetrics
+from core.views import db_pool_stats
+from core.middleware import tracked_stream
+from core.request_metrics import RequestMetrics
+
+from .benchmark import build_workload, compare_results, latency_summary, request_for
+from .bulk import insert_document
+from .cache import detail_key, get_cache, get_or_compute, invalidate_tasks, list_key, lock_key
+from .calendar_range import InvalidRange, calendar_days, calendar_pipeline, parse_range
+from .events import EVENT_COMPLETED, EVENT_CREATED, EVENT_DELETED, EVENT_UPDATED, task_event
+from . import importer
+from .export import csv_header, export_chunk, export_filter, task_batches
+from .importer import ImportFormatError, import_tasks, json_array_rows, parse_rows
+from .index_advisor import analyze_explain, explain_command, index_exists, query_shapes
+from .live import QUEUE_SIZE, TaskEventBroker
+from .models import NO_DUE_DATE, Task, TaskStats, Tip
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    TASK_LIST_SORT,
+    InvalidCursor,
+    decode_cursor,
+    decode_search_cursor,
+    decode_tip_cursor,
+    encode_cursor,
+    encode_search_cursor,
+    encode_tip_cursor,
+    mongo_filter_after_cursor,
+    mongo_filter_after_tip_cursor,
+    parse_limit,
+)
+from .scheduler import DailyScheduler, roll_stats
+from .search import (
+    MAX_DESCRIPTION_WORDS,
+    OTHER_TIER,
+    TITLE_TIER,
+    build_search_terms,
+    query_terms,
+    search_filter,
+)
+from .stats import current_window, get_stats_doc, record_task_change, stats_delta, to_mongo_date
+from .tips import AliasSampler, TipCatalog, parse_tip_keys
+from .validation import clean_task_create, clean_task_update
+from .versions import recorded_write
+from .views import (
+    TASK_PAYLOAD_FIELDS,
+    TaskBulkApiView,
+    complete_task_atomically,
+    search_tasks,
+    serialize_task,
+    serialize_tasks,
+    task_list_etag,
+)
+
+User = get_user_model()
+
+
+def aware(year, month, day, hour=12):
+    return timezone.make_aware(datetime.datetime(year, month, day, hour))
+
+
+# ------------ Materialized stats ------------
+class StatsWindowTests(SimpleTestCase):
+    def test_week_starts_on_monday(self):
+        # 2025-12-14 is a Sunday, 2025-12-15 the next Monday
+        self.assertEqual(
+            current_window(datetime.date(2025, 12, 14)),
+            (datetime.date(2025, 12, 14), datetime.date(2025, 12, 8)),
+        )
+        self.assertEqual(
+            current_window(datetime.date(2025, 12, 15)),
+            (datetime.date(2025, 12, 15), datetime.date(2025, 12, 15)),
+        )
+
+
+class StatsDeltaTests(SimpleTestCase):
+    today = datetime.date(2025, 12, 17)  # Wednesday
+
+    def snapshot(self, status, created_at, due_date=None):
+        return {"status": status, "created_at": created_at, "due_date": due_date}
+
+    def test_create_in_progress_this_week(self):
+        after = self.snapshot(Task.STATUS_IN_PROGRESS, aware(2025, 12, 16))
+        self.assertEqual(
+            stats_delta(None, after, self.today), {"in_progress_this_week": 1}
+        )
+
+    def test_complete_moves_between_counters(self):
+        before = self.snapshot(Task.STATUS_IN_PROGRESS, aware(2025, 12, 15), self.today)
+        after = dict(before, status=Task.STATUS_DONE)
+        self.assertEqual(
+            stats_delta(before, after, self.today),
+            {
+                "in_progress_this_week": -1,
+                "completed_this_week": 1,
+                "urgent_today": -1,
+            },
+        )
+
+    def test_task_from_last_week_only_touches_urgent(self):
+        before = self.snapshot(Task.STATUS_TODO, aware(2025, 12, 14))
+        after = dict(before, status=Task.STATUS_DONE, due_date=self.today)
+        self.assertEqual(stats_delta(before, after, self.today), {})
+
+        after = dict(before, due_date=self.today)
+        self.assertEqual(stats_delta(before, after, self.today), {"urgent_today": 1})
+
+    def test_no_change_is_empty(self):
+        snap = self.snapshot(Task.STATUS_TODO, aware(2025, 12, 17))
+        self.assertEqual(stats_delta(snap, dict(snap), self.today), {})
+
+    def test_overdue(self):
+        before = self.snapshot(Task.STATUS_TODO, aware(2025, 12, 1), datetime.date(2025, 12, 16))
+        self.assertEqual(
+            stats_delta(before, dict(before, status=Task.STATUS_DONE), self.today), {"overdue": -1}
+        )
+        self.assertEqual(
+            stats_delta(before, dict(before, due_date=self.today), self.today),
+            {"overdue": -1, "urgent_today": 1},
+        )
+
+
+@mock.patch("apps.tasks.stats.compute_stats_from_db", return_value={})
+class StatsRebuildTests(SimpleTestCase):
+    today = datetime.date(2025, 12, 17)
+    stale = {"user_id": 1, "version": 4, "stats_date": datetime.datetime(2025, 12, 16)}
+
+    def test_stale_doc_is_rebuilt_only_if_unchanged(self, _):
+        after = {"status": Task.STATUS_TODO, "created_at": aware(2025, 12, 17)}
+        with mock.patch.object(TaskStats, "objects") as objects:
+            objects.mongo_find_one.return_value = self.stale
+            objects.mongo_find_one_and_update.side_effect = [None, {"version": 5}]
+            self.assertEqual(record_task_change(1, None, after, self.today), {"version": 5})
+
+        query = objects.mongo_find_one_and_update.call_args_list[1][0][0]
+        self.assertEqual(query, {"user_id": 1, "version": 4})
+
+    def test_increment_is_retried_after_someone_elses_rebuild(self, _):
+        after = {"status": Task.STATUS_IN_PROGRESS, "created_at": aware(2025, 12, 17)}
+        with mock.patch.object(TaskStats, "objects") as objects:
+            objects.mongo_find_one.return_value = self.stale
+            objects.mongo_find_one_and_update.side_effect = [None, None, {"version": 6}]
+            self.assertEqual(record_task_change(1, None, after, self.today), {"version": 6})
+
+        calls = objects.mongo_find_one_and_update.call_args_list
+        self.assertEqual(calls[2][0], calls[0][0])
+        self.assertEqual(calls[2][0][1]["$inc"], {"in_progress_this_week": 1, "version": 1})
+
+    def test_missing_doc_is_only_inserted(self, _):
+        with mock.patch.object(TaskStats, "objects") as objects:
+            objects.mongo_find_one.side_effect = [None, {"version": 1}]
+            objects.mongo_find_one_and_update.return_value = None
+            self.assertEqual(get_stats_doc(1, self.today), {"version": 1})
+
+        update = objects.mongo_find_one_and_update.call_args[0][1]
+        self.assertEqual(list(update), ["$setOnInsert"])
+
+
+class DailySchedulerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = timezone.make_aware(datetime.datetime(2025, 12, 14, 23, 59))
+        self.runs = []
+        self.scheduler = DailyScheduler(job=self.job, clock=lambda: self.now)
+
+    def job(self, today):
+        self.runs.append(today)
+        return 3
+
+    def test_runs_at_start_then_once_per_day(self):
+        self.assertEqual(self.scheduler.run_pending(), 3)
+        self.assertIsNone(self.scheduler.run_pending())
+
+        self.now += datetime.timedelta(minutes=2)  # Monday: new day and week
+        self.scheduler.run_pending()
+        self.scheduler.run_pending()
+
+        self.assertEqual(self.runs, [datetime.date(2025, 12, 14), datetime.date(2025, 12, 15)])
+
+    def test_failed_run_is_retried(self):
+        self.scheduler.job = mock.Mock(side_effect=[RuntimeError("db down"), 0])
+
+        with self.assertRaises(RuntimeError):
+            self.scheduler.run_pending()
+        self.assertEqual(self.scheduler.run_pending(), 0)
+        self.assertEqual(self.scheduler.job.call_count, 2)
+
+    def test_only_stale_docs_are_rolled(self):
+        today = datetime.date(2025, 12, 15)
+        with mock.patch.object(TaskStats, "objects") as objects:
+            objects.mongo_find.return_value = mock.MagicMock()
+            objects.mongo_find.return_value.__iter__.return_value = [{"user_id": 1}, {"user_id": 2}]
+            objects.mongo_find_one_and_update.side_effect = [{"user_id": 1}, None]
+            with mock.patch("apps.tasks.stats.compute_stats_from_db", return_value={}):
+                self.assertEqual(roll_stats(today), 1)
+
+        query = objects.mongo_find_one_and_update.call_args_list[0][0][0]
+        self.assertEqual(query, {"user_id": 1, "stats_date": {"$ne": datetime.datetime(2025, 12, 15)}})
+        objects.mongo_find.return_value.close.assert_called_once_with()
+
+
+# ------------ Cursor pagination ------------
+class CursorTests(SimpleTestCase):
+    def test_round_trip(self):
+        task = Task(pk=42, due_date=datetime.date(2025, 12, 20))
+        task.created_at = aware(2025, 12, 1)
+
+        self.assertEqual(
+            decode_cursor(encode_cursor(task)),
+            (task.due_date, task.created_at, 42),
+        )
+
+    def test_round_trip_without_due_date(self):
+        task = Task(pk=7)
+        task.created_at = aware(2025, 12, 1)
+
+        self.assertEqual(decode_cursor(encode_cursor(task)), (None, task.created_at, 7))
+
+    def test_garbage_cursor_is_rejected(self):
+        for cursor in ["", "not-a-cursor", "WzEsMl0"]:
+            with self.assertRaises(InvalidCursor):
+                decode_cursor(cursor)
+
+    def test_raw_filter_uses_djongo_shapes(self):
+        task = Task(pk=42, due_date=datetime.date(2025, 12, 20))
+        task.created_at = timezone.make_aware(
+            datetime.datetime(2025, 12, 1, 12), datetime.timezone.utc
+        )
+
+        after = mongo_filter_after_cursor(encode_cursor(task))
+        due = datetime.datetime(2025, 12, 20)
+        created = datetime.datetime(2025, 12, 1, 12)
+
+        self.assertEqual(after["$or"][0], {"due_sort": {"$gt": due}})
+        self.assertEqual(after["$or"][1]["due_sort"], due)
+        self.assertIn({"created_at": created, "id": {"$lt": 42}}, after["$or"][1]["$or"])
+
+    def test_tasks_without_due_date_sort_last(self):
+        task = Task(pk=7)
+        task.created_at = aware(2025, 12, 1)
+
+        after = mongo_filter_after_cursor(encode_cursor(task))
+
+        self.assertEqual(after["$or"][0], {"due_sort": {"$gt": datetime.datetime(9999, 12, 31)}})
+        self.assertEqual(Task._meta.get_field("due_sort").pre_save(task, add=True), NO_DUE_DATE)
+        task.due_date = datetime.date(2025, 12, 20)
+        self.assertEqual(Task._meta.get_field("due_sort").pre_save(task, add=True), task.due_date)
+
+    def test_limit_is_clamped(self):
+        self.assertEqual(parse_limit(None), 50)
+        self.assertEqual(parse_limit("abc"), 50)
+        self.assertEqual(parse_limit("0"), 1)
+        self.assertEqual(parse_limit("10000"), 200)
+
+    def test_tip_cursor_round_trip(self):
+        tip = Tip(pk=9, created_at=aware(2025, 12, 1))
+
+        self.assertEqual(decode_tip_cursor(encode_tip_cursor(tip)), (tip.created_at, 9))
+        with self.assertRaises(InvalidCursor):
+            decode_tip_cursor(encode_cursor(Task(pk=1, created_at=aware(2025, 12, 1))))
+
+        # Async views: same key as a raw filter, in djongo's naive UTC
+        created_at = timezone.make_naive(tip.created_at, datetime.timezone.utc)
+        self.assertEqual(
+            mongo_filter_after_tip_cursor(encode_tip_cursor(tip)),
+            {"$or": [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "id": {"$lt": 9}}]},
+        )
+
+
+# ------------ Calendar ------------
+class CalendarTests(SimpleTestCase):
+    def test_range(self):
+        self.assertEqual(
+            parse_range("2025-12-01"), (datetime.date(2025, 12, 1), datetime.date(2025, 12, 7))
+        )
+        for start, end in [
+            ("", None),
+            ("2025-12-01", "2025-13-01"),
+            ("2025-12-10", "2025-12-01"),
+            ("2025-12-01", "2026-01-12"),
+            ("9999-12-25", "9999-12-31"),
+        ]:
+            with self.assertRaises(InvalidRange):
+                parse_range(start, end)
+
+    def test_range_query_on_the_list_index(self):
+        match = calendar_pipeline(1, datetime.date(2025, 12, 1), datetime.date(2025, 12, 7))[0]["$match"]
+
+        self.assertEqual(
+            match,
+            {
+                "created_by_id": 1,
+                "due_sort": {
+                    "$gte": datetime.datetime(2025, 12, 1),
+                    "$lte": datetime.datetime(2025, 12, 7),
+                },
+            },
+        )
+
+    def test_days_report_the_overflow(self):
+        groups = [{"_id": datetime.datetime(2025, 12, 1), "count": 12, "ids": [9, 4, 3]}]
+
+        self.assertEqual(
+            calendar_days(groups),
+            [{"date": "2025-12-01", "count": 12, "ids": [9, 4, 3], "more": 9}],
+        )
+
+
+# ------------ Export ------------
+class ExportTests(SimpleTestCase):
+    payload = {
+        "id": "abc",
+        "title": "=HYPERLINK(\"x\")",
+        "description": "Line 1\nLine 2, with a comma",
+        "task_type": "personal",
+        "status": "todo",
+        "priority": "high",
+        "due_date": "2025-12-20",
+        "completed_at": None,
+        "created_at": "2025-12-01T12:00:00+00:00",
+        "updated_at": "2025-12-01T12:00:00+00:00",
+        "project": {"id": 3, "name": "Launch"},
+        "created_by": {"id": 1, "username": "me"},
+        "assignee": None,
+    }
+
+    def test_batches_start_small(self):
+        docs = ({"id": i, "title": f"Task {i}"} for i in range(1, 8))
+
+        sizes = [len(batch) for batch in task_batches(docs, batch_size=3, first_batch_size=1)]
+
+        self.assertEqual(sizes, [1, 3, 3])
+
+    def test_ndjson_is_one_task_per_line(self):
+        lines = export_chunk("ndjson", [self.payload, self.payload]).splitlines()
+
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0]), self.payload)
+
+    def test_csv_rows(self):
+        text = csv_header() + export_chunk("csv", [self.payload])
+        header, row = list(csv.reader(io.StringIO(text)))
+
+        self.assertEqual(header[:2], ["id", "title"])
+        self.assertEqual(row[1], "'=HYPERLINK(\"x\")")
+        self.assertEqual(row[2], self.payload["description"])
+        self.assertEqual(row[-2:], ["Launch", ""])
+
+    def test_filter(self):
+        self.assertEqual(
+            export_filter(1, "done", ["pla"]),
+            {"created_by_id": 1, "status": "done", "search_terms": {"$all": ["pla"]}},
+        )
+
+
+# ------------ Import ------------
+class ImportTests(SimpleTestCase):
+    def rows(self, text, file_format):
+        return list(parse_rows(io.BytesIO(text.encode("utf-8")), file_format))
+
+    def test_json_array_is_read_in_chunks(self):
+        text = ' [{"title": "A"},\n {"title": "B\\u00e9"}, 3]'
+
+        rows = list(json_array_rows(io.StringIO(text), chunk_chars=3))
+
+        self.assertEqual(rows, [(1, {"title": "A"}), (2, {"title": "Bé"}), (3, 3)])
+        for broken in ['{"title": "A"}', '[{"title": "A"}', '[{"title": "A"},]']:
+            with self.assertRaises(ImportFormatError):
+                list(json_array_rows(io.StringIO(broken), chunk_chars=4))
+
+    def test_csv_and_ndjson_rows(self):
+        self.assertEqual(
+            self.rows("\ufefftitle,due_date\nA,2025-12-20\n", "csv"),
+            [(1, {"title": "A", "due_date": "2025-12-20"})],
+        )
+        with self.assertRaises(ImportFormatError):
+            self.rows("name\nA\n", "csv")
+
+        rows = self.rows('{"title": "A"}\n\nnot json\n', "ndjson")
+        self.assertEqual(rows[0], (1, {"title": "A"}))
+        self.assertIs(rows[1][1], importer.INVALID_JSON)
+
+    def test_rows_are_validated_and_batched(self):
+        rows = [
+            (1, {"title": "A"}),
+            (2, {"title": ""}),
+            (3, {"title": "B", "due_date": "20/12/2025"}),
+            (4, {"title": "C"}),
+            (5, {"title": "D"}),
+            (6, ["not", "an", "object"]),
+        ]
+        batches = []
+
+        def insert_batch(user, batch, report):
+            batches.append([task.title for _, task in batch])
+            report["imported"] += len(batch)
+
+        user = User(pk=1)
+        with mock.patch.object(importer, "insert_batch", side_effect=insert_batch), mock.patch.object(
+            importer, "invalidate_tasks"
+        ), mock.patch.object(importer, "publish_task_events"):
+            report = import_tasks(user, rows, batch_size=2)
+
+        self.assertEqual(batches, [["A", "C"], ["D"]])
+        self.assertEqual((report["rows"], report["imported"], report["failed"]), (6, 3, 3))
+        self.assertEqual(
+            [(error["row"], list(error["errors"])) for error in report["errors"]],
+            [(2, ["title"]), (3, ["due_date"]), (6, ["__all__"])],
+        )
+
+
+# ------------ Search terms ------------
+class SearchTermsTests(SimpleTestCase):
+    def test_terms_are_prefixes_of_title_and_description(self):
+        search_terms, title_terms = build_search_terms("Plan Sprint", "plan the demo")
+
+        self.assertEqual(title_terms, ["pl", "pla", "plan", "sp", "spr", "spri", "sprin", "sprint"])
+        for term in ["plan", "spr", "the", "dem", "demo"]:
+            self.assertIn(term, search_terms)
+        self.assertNotIn("demo", title_terms)
+        self.assertNotIn("d", search_terms)
+
+    def test_only_the_first_description_words_are_indexed(self):
+        description = " ".join(f"word{n}" for n in range(MAX_DESCRIPTION_WORDS + 10))
+        search_terms, _ = build_search_terms("Title", description)
+
+        self.assertIn(f"word{MAX_DESCRIPTION_WORDS - 1}", search_terms)
+        self.assertNotIn(f"word{MAX_DESCRIPTION_WORDS}", search_terms)
+
+    def test_query_terms_are_lowercased_words(self):
+        self.assertEqual(query_terms("  Meet, PROJ! "), ["meet", "proj"])
+        self.assertEqual(query_terms("a b c"), [])
+        self.assertEqual(query_terms("!!"), [])
+        self.assertEqual(query_terms(None), [])
+
+    def test_tiers_split_title_matches_from_the_rest(self):
+        title = search_filter(3, ["plan"], TITLE_TIER, status=Task.STATUS_DONE)
+        other = search_filter(3, ["plan"], OTHER_TIER)
+
+        self.assertEqual(
+            title,
+            {"created_by_id": 3, "title_terms": {"$all": ["plan"]}, "status": "done"},
+        )
+        self.assertEqual(
+            other,
+            {
+                "created_by_id": 3,
+                "search_terms": {"$all": ["plan"]},
+                "title_terms": {"$not": {"$all": ["plan"]}},
+            },
+        )
+
+    def search_doc(self, pk):
+        return {"id": pk, "title": f"Task {pk}", "due_date": None, "created_at": datetime.datetime(2026, 1, 1)}
+
+    def test_search_pages_run_limited_finds_in_list_order(self):
+        with mock.patch.object(Task, "objects") as objects:
+            # One title match, then the page is filled from the other tier
+            objects.mongo_find.side_effect = [[self.search_doc(1)], [self.search_doc(2), self.search_doc(3)]]
+            tasks, next_cursor = search_tasks(User(pk=3), ["plan"], limit=2)
+
+        self.assertEqual([task.pk for task in tasks], [1, 2])
+        first, second = objects.mongo_find.call_args_list
+        self.assertEqual(first[1]["sort"], TASK_LIST_SORT)
+        self.assertEqual((first[1]["limit"], second[1]["limit"]), (3, 2))
+        self.assertEqual(second[0][0]["search_terms"], {"$all": ["plan"]})
+
+        # The next page resumes the other tier right after task 2
+        self.assertEqual(decode_search_cursor(next_cursor)[0], OTHER_TIER)
+        with mock.patch.object(Task, "objects") as objects:
+            objects.mongo_find.return_value = [self.search_doc(3)]
+            tasks, next_cursor = search_tasks(User(pk=3), ["plan"], cursor=next_cursor, limit=2)
+
+        self.assertEqual(([task.pk for task in tasks], next_cursor), ([3], None))
+        query = objects.mongo_find.call_args[0][0]
+        self.assertEqual(query["$and"][0]["search_terms"], {"$all": ["plan"]})
+        self.assertIn("$or", query["$and"][1])
+
+    def test_search_cursor_needs_a_known_tier(self):
+        task = Task(pk=4, created_at=aware(2026, 1, 1))
+        cursor = encode_search_cursor(TITLE_TIER, task)
+
+        self.assertEqual(decode_search_cursor(cursor), (TITLE_TIER, encode_cursor(task)))
+        with self.assertRaises(InvalidCursor):
+            decode_search_cursor(encode_cursor(task))
+        with self.assertRaises(InvalidCursor):
+            decode_search_cursor("x." + encode_cursor(task))
+
+
+# ------------ Tip catalog ------------
+class TipCatalogTests(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "tips.json"
+        self.now = 0.0
+        self.catalog = TipCatalog(self.path, check_interval=5, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, tips):
+        self.path.write_text(json.dumps(tips), encoding="utf-8")
+
+    def test_filters_by_category(self):
+        self.write([
+            {"category": "focus", "text": "A"},
+            {"category": "planning", "text": "B"},
+        ])
+        self.assertEqual(self.catalog.categories(), ["focus", "planning"])
+        self.assertEqual(self.catalog.sample(category="planning")["text"], "B")
+        self.assertIsNone(self.catalog.sample(category="missing"))
+
+    def test_reloads_only_after_interval_when_file_changes(self):
+        self.write([{"category": "focus", "text": "A"}])
+        self.assertEqual(self.catalog.sample()["text"], "A")
+
+        self.write([{"category": "focus", "text": "A much longer tip"}])
+        self.assertEqual(self.catalog.sample()["text"], "A")
+
+        self.now = 10
+        self.assertEqual(self.catalog.sample()["text"], "A much longer tip")
+
+    def test_avoids_recent_tips(self):
+        self.write([{"category": "focus", "text": t} for t in "ABCD"])
+        self.catalog.categories()  # load the file
+        recent = [t["key"] for t in self.catalog.tips if t["text"] != "D"]
+
+        rng = random.Random(1)
+        for _ in range(20):
+            self.assertEqual(self.catalog.sample(exclude=recent, rng=rng)["text"], "D")
+
+    def test_keys_of_other_categories_dont_lift_the_exclusion(self):
+        self.write(
+            [{"category": "focus", "text": t} for t in "AB"]
+            + [{"category": "rest", "text": t} for t in "CDE"]
+        )
+        self.catalog.categories()
+        keys = {t["text"]: t["key"] for t in self.catalog.tips}
+        recent = [keys["A"], keys["C"], keys["D"]]
+
+        rng = random.Random(1)
+        for _ in range(20):
+            self.assertEqual(self.catalog.sample("focus", exclude=recent, rng=rng)["text"], "B")
+        # Everything excluded: a repeat is better than nothing
+        self.assertIsNotNone(self.catalog.sample("focus", exclude=[keys["A"], keys["B"]], rng=rng))
+
+    def test_exclude_param(self):
+        self.assertEqual(
+            parse_tip_keys("0123456789ab,<script>,abcdefabcdef,", limit=5),
+            ["0123456789ab", "abcdefabcdef"],
+        )
+        self.assertEqual(parse_tip_keys("aaaaaaaaaaaa,bbbbbbbbbbbb", limit=1), ["bbbbbbbbbbbb"])
+
+    def test_missing_file_uses_fallback(self):
+        self.assertEqual(self.catalog.sample()["text"], "No tips file found yet.")
+
+
+class AliasSamplerTests(SimpleTestCase):
+    def test_respects_weights(self):
+        sampler = AliasSampler(["a", "b"], [1, 3])
+        rng = random.Random(7)
+        draws = [sampler.sample(rng) for _ in range(4000)]
+        self.assertAlmostEqual(draws.count("b") / len(draws), 0.75, delta=0.03)
+
+
+# ------------ Validation / bulk documents ------------
+class TaskValidationTests(SimpleTestCase):
+    def test_create_defaults_invalid_choices(self):
+        fields, errors = clean_task_create(
+            {"title": " Plan ", "status": "nope", "priority": "high", "due_date": ""}
+        )
+        self.assertEqual(errors, {})
+        self.assertEqual(fields["title"], "Plan")
+        self.assertEqual(fields["status"], Task.STATUS_TODO)
+        self.assertEqual(fields["priority"], Task.PRIORITY_HIGH)
+        self.assertIsNone(fields["due_date"])
+
+    def test_create_errors(self):
+        self.assertEqual(clean_task_create({}), ({}, {"title": "This field is required."}))
+        fields, errors = clean_task_create({"title": "A", "due_date": "12/01/2025"})
+        self.assertEqual(list(errors), ["due_date"])
+
+    def test_update_leaves_out_invalid_choices(self):
+        fields, errors = clean_task_update({"title": "A", "status": "bad", "priority": "low"})
+        self.assertEqual(errors, {})
+        self.assertNotIn("status", fields)
+        self.assertEqual(fields["priority"], Task.PRIORITY_LOW)
+        self.assertIsNone(fields["due_date"])
+        self.assertEqual(fields["due_sort"], NO_DUE_DATE)
+
+    def test_project_must_be_visible(self):
+        fields, _ = clean_task_create({"title": "A", "project": "5"}, project_ids={5})
+        self.assertEqual((fields["project_id"], fields["task_type"]), (5, Task.TYPE_PROJECT))
+
+        for project in ("6", "x", True):
+            self.assertEqual(
+                clean_task_create({"title": "A", "project": project}, project_ids={5}),
+                ({}, {"project": "Unknown project."}),
+            )
+        # Callers that don't check access (the importer) ignore it
+        self.assertNotIn("project_id", clean_task_create({"title": "A", "project": "6"})[0])
+
+        # Update: missing keeps the project, empty takes the task out
+        self.assertNotIn("project_id", clean_task_update({"title": "A"}, project_ids={5})[0])
+        fields, _ = clean_task_update({"title": "A", "project": ""}, project_ids=frozenset())
+        self.assertEqual((fields["project_id"], fields["task_type"]), (None, Task.TYPE_PERSONAL))
+
+
+class TaskBulkPlanTests(SimpleTestCase):
+    def setUp(self):
+        self.task = Task(pk=1, public_id="t1", title="Old", status=Task.STATUS_TODO, created_by_id=3)
+        self.view = TaskBulkApiView()
+        self.view.user = User(pk=3, username="ann")
+        self.view.now = timezone.now()
+        self.view.project_ids = None
+        self.view.tasks = {"t1": self.task}
+        self.view.new_ids = [10, 11]
+        self.view.writes, self.view.changes = [], []
+
+    def test_writes_keep_the_request_order(self):
+        operations = [
+            {"op": "update", "id": "t1", "data": {"title": "A"}},
+            {"op": "create", "data": {"title": "New"}},
+            {"op": "delete", "id": "t1"},
+            {"op": "create", "data": {"title": "Newer"}},
+        ]
+        for index, op in enumerate(operations):
+            self.view.plan(index, op)
+
+        writes = [(index, type(write).__name__) for index, write in self.view.writes]
+        self.assertEqual(
+            writes, [(0, "UpdateOne"), (1, "InsertOne"), (2, "DeleteOne"), (3, "InsertOne")]
+        )
+        self.assertEqual([index for index, _, _ in self.view.changes], [0, 1, 2, 3])
+        self.assertEqual(self.view.writes[3][1]._doc["id"], 11)
+
+    def test_each_result_has_the_task_after_its_operation(self):
+        results = [
+            self.view.plan(0, {"op": "update", "id": "t1", "data": {"title": "A"}}),
+            self.view.plan(1, {"op": "complete", "id": "t1"}),
+            self.view.plan(2, {"op": "update", "id": "t1", "data": {"title": "B"}}),
+            self.view.plan(3, {"op": "complete", "id": "t1"}),
+        ]
+
+        self.assertEqual(
+            [(r["_task"].title, r["_task"].status) for r in results],
+            [("A", "todo"), ("A", "done"), ("B", "done"), ("B", "done")],
+        )
+        # The last one was already done: nothing to write
+        self.assertEqual(len(self.view.writes), 3)
+
+
+class TaskCompleteTests(SimpleTestCase):
+    def complete(self, doc):
+        with mock.patch.object(Task, "objects") as objects:
+            objects.mongo_find_one_and_update.return_value = doc
+            result = complete_task_atomically(User(pk=3), "t1", aware(2025, 12, 2))
+        objects.mongo_find_one_and_update.assert_called_once()
+        return result, objects.mongo_find_one_and_update.call_args
+
+    def test_already_done_is_one_round_trip(self):
+        doc = {"id": 1, "public_id": "t1", "status": "done", "completed_at": datetime.datetime(2025, 12, 1)}
+        (before, after), call = self.complete(doc)
+
+        self.assertIs(after, before)
+        self.assertEqual(after.completed_at.date(), datetime.date(2025, 12, 1))
+        # No status condition: a done task is matched too, and kept as it is
+        self.assertEqual(call[0][0], {"created_by_id": 3, "public_id": "t1"})
+        completed_at = call[0][1][0]["$set"]["completed_at"]["$cond"]
+        self.assertEqual(completed_at[:2], [{"$eq": ["$status", "done"]}, "$completed_at"])
+
+    def test_open_task_is_completed(self):
+        (before, after), _ = self.complete({"id": 1, "public_id": "t1", "status": "todo", "completed_at": None})
+
+        self.assertEqual((before.status, after.status), ("todo", "done"))
+        self.assertEqual(after.completed_at, aware(2025, 12, 2))
+
+        self.assertEqual(self.complete(None)[0], (None, None))
+
+
+class InsertDocumentTests(SimpleTestCase):
+    def test_same_shape_as_orm_insert(self):
+        task = Task(title="Plan", created_by_id=3, due_date=datetime.date(2025, 12, 20))
+        task.pk = 9
+        task.refresh_search_terms()
+
+        doc = insert_document(task)
+
+        self.assertEqual(doc["id"], 9)
+        self.assertEqual(doc["created_by_id"], 3)
+        self.assertEqual(doc["due_date"], datetime.datetime(2025, 12, 20))
+        self.assertEqual(doc["due_sort"], datetime.datetime(2025, 12, 20))
+        self.assertIsNone(doc["created_at"].tzinfo)
+        self.assertEqual(doc["title_terms"], ["pl", "pla", "plan"])
+        self.assertIsInstance(doc["public_id"], str)
+
+
+# ------------ Async views ------------
+class AsyncViewsTests(SimpleTestCase):
+    async def test_anonymous_user_is_redirected_to_login(self):
+        response = await self.async_client.get(reverse("tasks:async_list"))
+
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("next=", response["Location"])
+        self.assertIn('db;desc="0 MongoDB commands"', response["Server-Timing"])
+
+
+# ------------ Live events ------------
+class TaskEventTests(SimpleTestCase):
+    def test_event_type_from_snapshots(self):
+        todo = {"status": Task.STATUS_TODO}
+        done = {"status": Task.STATUS_DONE}
+
+        self.assertEqual(task_event(None, todo, {"id": "a"})["type"], EVENT_CREATED)
+        self.assertEqual(task_event(todo, done, {"id": "a"})["type"], EVENT_COMPLETED)
+        self.assertEqual(task_event(done, done, {"id": "a"})["type"], EVENT_UPDATED)
+
+        deleted = task_event(todo, None, public_id="a")
+        self.assertEqual(deleted, {"type": EVENT_DELETED, "id": "a", "task": None})
+
+
+@mock.patch.object(TaskEventBroker, "_ensure_started")
+class TaskEventBrokerTests(SimpleTestCase):
+    async def test_dispatch_reaches_only_listed_users(self, _):
+        broker = TaskEventBroker()
+        mine, other = broker.subscribe(1), broker.subscribe(2)
+
+        broker.dispatch({"user_ids": [1], "events": [{"type": "created"}], "stats": None})
+
+        self.assertEqual(mine.get_nowait()["events"], [{"type": "created"}])
+        self.assertTrue(other.empty())
+
+        broker.unsubscribe(1, mine)
+        broker.unsubscribe(2, other)
+        broker.dispatch({"user_ids": [1], "events": [], "stats": None})
+        self.assertTrue(mine.empty())
+
+    async def test_slow_client_gets_a_resync(self, _):
+        broker = TaskEventBroker()
+        queue = broker.subscribe(1)
+
+        for _ in range(QUEUE_SIZE + 1):
+            broker.dispatch({"user_ids": [1], "events": [{"type": "updated"}], "stats": {}})
+
+        self.assertEqual(queue.qsize(), 1)
+        self.assertEqual(queue.get_nowait()["events"], [{"type": "resync"}])
+
+    def test_tail_resumes_after_the_last_delivered_event(self, _):
+        broker = TaskEventBroker()
+        broker._loop = mock.Mock()
+
+        class Cursor:
+            # Dies once read, like a tailable cursor after a failover
+            def __init__(self, docs):
+                self.docs, self.alive = docs, True
+
+            def __iter__(self):
+                self.alive = False
+                return iter(self.docs)
+
+        with mock.patch.object(Task, "objects") as objects, mock.patch("apps.tasks.live.time.sleep") as sleep:
+            collection = objects.mongo_database.__getitem__.return_value
+            collection.find_one.return_value = None
+            collection.find.side_effect = [Cursor([{"_id": "a"}, {"_id": "b"}]), Cursor([])]
+            sleep.side_effect = [None, StopIteration]
+
+            with self.assertRaises(StopIteration):
+                broker._tail()
+
+        filters = [call[0][0] for call in collection.find.call_args_list]
+        self.assertEqual(filters, [{}, {"_id": {"$gt": "b"}}])
+        collection.find_one.assert_called_once()
+
+
+# ------------ Benchmark ------------
+class BenchmarkTests(SimpleTestCase):
+    def test_workload_is_reproducible(self):
+        plan = build_workload(200, users=5, seed=7)
+
+        self.assertEqual(plan, build_workload(200, users=5, seed=7))
+        self.assertNotEqual(plan, build_workload(200, users=5, seed=8))
+        self.assertTrue(all(0 <= step["user"] < 5 for step in plan))
+
+    def test_task_steps_need_a_task(self):
+        step = build_workload(1, users=1)[0]
+        step["scenario"] = "detail"
+
+        self.assertIsNone(request_for(step, 0, []))
+        method, path, body = request_for(step, 0, ["abc"])
+        self.assertEqual((method, path, body), ("GET", reverse("tasks:api_detail", args=["abc"]), None))
+
+    def test_latency_summary_and_compare(self):
+        summary = latency_summary([0.001 * n for n in range(1, 101)])
+        self.assertEqual(summary["p50_ms"], 51.0)
+        self.assertEqual(summary["p99_ms"], 99.0)
+
+        before = {"scenarios": {"list": {"p95_ms": 10.0, "db_commands_mean": 4}}}
+        after = {"scenarios": {"list": {"p95_ms": 12.0, "db_commands_mean": 4}, "tip": {}}}
+        self.assertEqual(
+            compare_results(before, after),
+            [("list", "p95_ms", 10.0, 12.0, 20.0), ("list", "db_commands_mean", 4, 4, 0.0)],
+        )
+
+    def test_command_tracker_counts_inside_track_only(self):
+        tracker = CommandTracker()
+        event = SimpleNamespace(command_name="find", duration_micros=1500, reply={"ok": 1})
+
+        tracker.started(event)
+        with tracker.track(measure_bytes=True) as recorder:
+            tracker.started(event)
+            tracker.succeeded(event)
+        tracker.started(event)
+
+        self.assertEqual(recorder.commands, 1)
+        self.assertEqual(recorder.by_name["find"], 1)
+        self.assertAlmostEqual(recorder.duration, 0.0015)
+        self.assertEqual(recorder.slowest, ("find", 0.0015))
+        self.assertGreater(recorder.bytes_returned, 0)
+
+        # Sizes cost a re-encode per reply, off unless asked for
+        with tracker.track() as recorder, mock.patch.object(command_metrics, "BSON") as bson:
+            tracker.succeeded(event)
+        bson.encode.assert_not_called()
+        self.assertEqual(recorder.bytes_returned, 0)
+
+    def test_streamed_body_is_tracked(self):
+        tracker = CommandTracker()
+        event = SimpleNamespace(command_name="getMore", duration_micros=100, reply={})
+        done = mock.Mock()
+
+        def body():
+            for chunk in ("a", "b"):
+                tracker.started(event)
+                yield chunk
+
+        with mock.patch("core.middleware.command_tracker", tracker):
+            with tracker.track() as recorder:
+                stream = tracked_stream(body(), recorder, done)
+            # Sent after the view (and its track() block) returned
+            self.assertEqual(list(stream), ["a", "b"])
+
+        self.assertEqual(recorder.by_name["getMore"], 2)
+        done.assert_called_once_with()
+        # Nothing is counted between chunks
+        tracker.started(event)
+        self.assertEqual(recorder.commands, 2)
+
+    def test_request_metrics_render(self):
+        metrics = RequestMetrics()
+        recorder = CommandRecorder()
+        recorder.commands, recorder.duration = 3, 0.02
+        recorder.by_name.update({"find": 2, "aggregate": 1})
+        recorder.slowest = ("aggregate", 0.015)
+
+        metrics.record("tasks:api_list", "GET", 200, 0.03, recorder)
+        text = metrics.render()
+
+        labels = 'endpoint="tasks:api_list",method="GET"'
+        self.assertIn(f'cohub_db_commands_per_request_bucket{{{labels},le="3"}} 1', text)
+        self.assertIn(f'cohub_http_request_duration_seconds_count{{{labels}}} 1', text)
+        self.assertIn(f'cohub_db_commands_total{{{labels},command="find"}} 2', text)
+        self.assertIn(f'cohub_db_slowest_command_seconds{{{labels},command="aggregate"}} 0.015', text)
+
+
+# ------------ DB backend ------------
+class EndpointSelectorTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 0.0
+        self.healthy = {"atlas": False, "local": True}
+        logger = mock.patch("core.db_backend.endpoints.logger")
+        self.logger = logger.start()
+        self.addCleanup(logger.stop)
+
+    def selector(self):
+        return EndpointSelector(
+            [("atlas", "atlas"), ("local", "local")],
+            recheck_interval=60,
+            probe=lambda uri, timeout_ms: self.healthy[uri],
+            clock=lambda: self.now,
+            background=False,
+        )
+
+    def test_falls_back_and_recovers_after_the_cooldown(self):
+        selector = self.selector()
+        self.assertEqual(selector.active_uri(), "local")
+
+        # Back up, but not rechecked before recheck_interval
+        self.healthy["atlas"] = True
+        self.now = 59
+        self.assertEqual(selector.active_uri(), "local")
+
+        self.now = 60
+        selector.active_uri()
+        self.assertEqual(selector.active_uri(), "atlas")
+        self.assertEqual(selector.active_name(), "atlas")
+
+    def test_failure_moves_on_once(self):
+        self.healthy["atlas"] = True
+        selector = self.selector()
+        self.assertEqual(selector.active_uri(), "atlas")
+
+        selector.mark_failed("atlas")
+        # A second report about the old host (another thread) is ignored
+        selector.mark_failed("atlas")
+        self.assertEqual(selector.active_uri(), "local")
+        self.logger.warning.assert_called_once()
+
+        # The cooldown starts at the failover
+        self.now = 30
+        self.assertEqual(selector.active_uri(), "local")
+        self.now = 60
+        selector.active_uri()
+        self.assertEqual(selector.active_uri(), "atlas")
+
+    def test_preferred_still_down_keeps_the_fallback(self):
+        selector = self.selector()
+        selector.active_uri()
+
+        self.now = 60
+        selector.active_uri()
+        self.assertEqual(selector.active_uri(), "local")
+        # Next probe waits for another full interval
+        self.healthy["atlas"] = True
+        self.now = 119
+        self.assertEqual(selector.active_uri(), "local")
+
+    def test_manager_calls_report_connection_failures(self):
+        on_failure = mock.Mock()
+        database = mock.MagicMock(spec=Database)
+        collection = database.__getitem__.return_value = mock.MagicMock(spec=Collection)
+        collection.find_one.side_effect = AutoReconnect("down")
+
+        tasks = FailoverProxy(database, on_failure)["tasks_task"]
+        with self.assertRaises(AutoReconnect):
+            tasks.find_one({})
+        on_failure.assert_called_once_with()
+
+        # find() runs while iterating
+        cursor = collection.find.return_value = mock.MagicMock(spec=PymongoCursor)
+        cursor.__next__.side_effect = AutoReconnect("down")
+        with self.assertRaises(AutoReconnect):
+            list(tasks.find({}))
+        self.assertEqual(on_failure.call_count, 2)
+
+
+class PoolMetricsTests(SimpleTestCase):
+    address = ("db", 27017)
+
+    def setUp(self):
+        self.now = 0.0
+        self.metrics = PoolMetrics(clock=lambda: self.now)
+        self.event = SimpleNamespace(address=self.address)
+
+    def check_out(self, wait, failed=False):
+        self.metrics.connection_check_out_started(self.event)
+        self.now += wait
+        if failed:
+            self.metrics.connection_check_out_failed(self.event)
+        else:
+            self.metrics.connection_checked_out(self.event)
+
+    def test_checkouts_and_wait_times(self):
+        self.metrics.connection_created(self.event)
+        self.check_out(0.002)
+        self.check_out(0.010)
+        self.metrics.connection_checked_in(self.event)
+        self.check_out(0.5, failed=True)
+
+        stats = self.metrics.snapshot()["db:27017"]
+        self.assertEqual(stats["connections_created"], 1)
+        self.assertEqual((stats["checkouts"], stats["checked_out"], stats["max_checked_out"]), (2, 1, 2))
+        self.assertEqual(stats["checkout_failures"], 1)
+        self.assertAlmostEqual(stats["wait_time_total"], 0.512)
+        self.assertAlmostEqual(stats["wait_time_max"], 0.5)
+        self.assertAlmostEqual(stats["wait_time_avg"], 0.256)
+
+    def test_pool_cleared_and_stray_checkin(self):
+        # Checked in after a reset (or a checkout before the listener was
+        # registered): never goes below 0
+        self.metrics.connection_checked_in(self.event)
+        self.metrics.pool_cleared(self.event)
+        self.metrics.connection_closed(self.event)
+
+        stats = self.metrics.snapshot()["db:27017"]
+        self.assertEqual((stats["checked_out"], stats["pool_cleared"], stats["connections_closed"]), (0, 1, 1))
+
+        self.metrics.reset()
+        self.assertEqual(self.metrics.snapshot(), {})
+
+    def test_health_payload(self):
+        self.check_out(0.004)
+        request = RequestFactory().get("/health/db-pool/")
+        request.user = User(pk=1, username="admin", is_staff=True, is_active=True)
+
+        with mock.patch("core.views.pool_metrics", self.metrics):
+            payload = json.loads(db_pool_stats(request).content)
+
+        self.assertTrue(payload["ok"])
+        self.assertEqual(payload["pools"]["db:27017"]["checkouts"], 1)
+        self.assertIn("maxPoolSize", payload["pool_options"])
+        self.assertIn("waitQueueTimeoutMS", payload["pool_options"])
+
+        request.user = User(pk=2, username="ann", is_active=True)
+        self.assertEqual(db_pool_stats(request).status_code, 302)
+
+
+class TaskCacheTests(SimpleTestCase):
+    def setUp(self):
+        get_cache().clear()
+
+    def test_default_config_caches(self):
+        # Local memory, one process: the cache is on
+        self.assertTrue(settings.TASK_CACHE_ENABLED)
+        compute = mock.Mock(return_value={"n": 1})
+
+        self.assertEqual(get_or_compute("k", compute), {"n": 1})
+        self.assertEqual(get_or_compute("k", compute), {"n": 1})
+        compute.assert_called_once()
+
+    def test_not_cached_when_off(self):
+        compute = mock.Mock(return_value={"n": 1})
+
+        with self.settings(TASK_CACHE_ENABLED=False):
+            get_or_compute("k", compute)
+            get_or_compute("k", compute)
+        self.assertEqual(compute.call_count, 2)
+        self.assertIsNone(get_cache().get("k"))
+
+    def test_invalid_value_is_recomputed(self):
+        get_or_compute("k", lambda: 1)
+
+        self.assertEqual(get_or_compute("k", lambda: 2, is_valid=lambda value: value > 1), 2)
+
+    def test_invalidation_during_compute_is_not_overwritten(self):
+        key = list_key(1)
+
+        def compute():
+            # A write lands while the page is being read
+            invalidate_tasks(1)
+            return ["stale"]
+
+        self.assertEqual(get_or_compute(key, compute), ["stale"])
+        self.assertEqual(get_or_compute(key, lambda: ["fresh"]), ["fresh"])
+
+    def test_waiter_gets_the_lock_holders_value(self):
+        cache = get_cache()
+        key = detail_key(1, "abc")
+        cache.add(lock_key(key), "other worker")
+        clock = iter([0.0, 0.1, 0.2]).__next__
+
+        def sleep(seconds):
+            cache.set(key, {"id": "abc"})
+
+        compute = mock.Mock()
+        self.assertEqual(get_or_compute(key, compute, clock=clock, sleep=sleep), {"id": "abc"})
+        compute.assert_not_called()
+
+    def test_invalidate_drops_details_lists_and_stats(self):
+        cache = get_cache()
+        cache.set_many({detail_key(1, "a"): 1, detail_key(1, "b"): 2, list_key(1, "done"): 3})
+
+        invalidate_tasks(1, ["a"])
+
+        self.assertIsNone(cache.get(detail_key(1, "a")))
+        self.assertEqual(cache.get(detail_key(1, "b")), 2)
+        self.assertIsNone(cache.get(list_key(1, "done")))
+
+
+class TaskVersionTests(SimpleTestCase):
+    def setUp(self):
+        get_cache().clear()
+        today, start_of_week = current_window()
+        self.doc = {"version": 1, "stats_date": to_mongo_date(today), "week_start": to_mongo_date(start_of_week)}
+        self.user = User(pk=1, username="ann")
+
+    def etag(self):
+        request = RequestFactory().get("/tasks/api/tasks/")
+        request.user = self.user
+        return task_list_etag(request)
+
+    def test_project_rename_changes_the_etag(self):
+        with mock.patch.object(TaskStats, "objects") as stats, mock.patch.object(Task, "objects") as tasks:
+            stats.mongo_find_one.side_effect = lambda *args, **kwargs: dict(self.doc)
+            before = self.etag()
+            self.assertEqual(self.etag(), before)
+
+            tasks.mongo_find.return_value = [{"created_by_id": 1, "public_id": "abc"}]
+            stats.mongo_update_many.side_effect = lambda *args: self.doc.update(version=2)
+            with mock.patch.object(Project, "objects"):
+                post_save.send(sender=Project, instance=Project(pk=5, owner_id=1, name="Renamed"), created=False)
+
+            self.assertNotEqual(self.etag(), before)
+
+        self.assertEqual(tasks.mongo_find.call_args[0][0], {"project_id": 5})
+        stats.mongo_update_many.assert_called_once_with({"user_id": {"$in": [1]}}, {"$inc": {"version": 1}})
+
+    def test_recorded_writes_are_left_to_the_caller(self):
+        task = Task(created_by_id=1, public_id="abc")
+        with mock.patch.object(TaskStats, "objects") as stats:
+            with recorded_write():
+                post_save.send(sender=Task, instance=task, created=True)
+            stats.mongo_update_many.assert_not_called()
+
+            # e.g. an admin edit
+            post_save.send(sender=Task, instance=task, created=False)
+            stats.mongo_update_many.assert_called_once()
+
+
+class IndexAdvisorTests(SimpleTestCase):
+    def test_collection_scan_and_sort_are_reported(self):
+        explain = {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "SORT",
+                    "inputStage": {"stage": "COLLSCAN"},
+                }
+            },
+            "executionStats": {"nReturned": 5, "totalDocsExamined": 5000, "totalKeysExamined": 0},
+        }
+
+        report = analyze_explain(explain)
+
+        self.assertEqual(report["plan"], "SORT <- COLLSCAN")
+        self.assertEqual(
+            report["issues"],
+            ["collection scan", "in-memory sort", "1000 docs examined per doc returned"],
+        )
+
+    def test_index_scan_is_fine(self):
+        explain = {
+            "queryPlanner": {
+                "winningPlan": {
+                    "stage": "LIMIT",
+                    "inputStage": {
+                        "stage": "FETCH",
+                        "inputStage": {"stage": "IXSCAN", "indexName": "tasks_task_due_sort_idx"},
+                    },
+                }
+            },
+            "executionStats": {"nReturned": 50, "totalDocsExamined": 50},
+        }
+
+        report = analyze_explain(explain)
+
+        self.assertEqual(report["plan"], "LIMIT <- FETCH <- IXSCAN tasks_task_due_sort_idx")
+        self.assertEqual(report["issues"], [])
+
+    def test_index_exists_matches_prefixes(self):
+        info = {"idx": {"key": [("created_by_id", 1), ("status", 1), ("due_sort", 1.0)]}}
+
+        self.assertTrue(index_exists(info, [("created_by_id", 1), ("status", 1)]))
+        self.assertFalse(index_exists(info, [("created_by_id", 1), ("public_id", 1)]))
+
+    def test_shapes_build_explain_commands(self):
+        sample = {
+            "user_id": 1,
+            "username": "sara",
+            "public_id": "abc",
+            "status": "todo",
+            "cursor": encode_cursor(
+                Task(pk=3, due_date=None, created_at=timezone.now())
+            ),
+            "term": "pla",
+            "session_key": "k",
+            "project_ids": [2, 5],
+            "today": datetime.datetime(2026, 1, 5),
+            "week_start": datetime.datetime(2026, 1, 5),
+        }
+
+        commands = {shape["name"]: explain_command(shape) for shape in query_shapes(sample)}
+
+        self.assertEqual(list(commands["task_list"]["explain"]["sort"]), ["due_sort", "created_at", "id"])
+        self.assertIn("pipeline", commands["task_calendar"]["explain"])
+        self.assertEqual(commands["task_search_title"]["explain"]["limit"], DEFAULT_PAGE_SIZE)
+        self.assertEqual(commands["stats_urgent_today"]["explain"]["count"], "tasks_task")
+        self.assertEqual(commands["session"]["verbosity"], "executionStats")
+
+
+# ------------ Batch serializer (needs MongoDB) ------------
+@tag("db")
+class SerializeTasksTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user("owner", password="pass12345")
+        cls.mate = User.objects.create_user("mate", password="pass12345")
+        cls.project = Project.objects.create(name="Launch", owner=cls.owner)
+
+        for i in range(30):
+            Task.objects.create(
+                title=f"Task {i}",
+                created_by=cls.owner,
+                assignee=cls.mate if i % 2 else cls.owner,
+                project=cls.project if i % 3 == 0 else None,
+                task_type=Task.TYPE_PROJECT if i % 3 == 0 else Task.TYPE_PERSONAL,
+            )
+
+    def test_constant_number_of_queries(self):
+        qs = Task.objects.filter(created_by=self.owner).only(*TASK_PAYLOAD_FIELDS)
+
+        # tasks + users + projects, not 3 per task
+        with self.assertNumQueries(3):
+            serialize_tasks(qs)
+
+        # only personal tasks of the current user: no related queries at all
+        personal = qs.filter(task_type=Task.TYPE_PERSONAL, assignee=self.owner)
+        with self.assertNumQueries(1):
+            serialize_tasks(personal, known_users=[self.owner])
+
+    def test_same_json_as_single_serializer(self):
+        tasks = list(Task.objects.filter(created_by=self.owner))
+
+        self.assertEqual(
+            serialize_tasks(tasks, known_users=[self.owner]),
+            [serialize_task(task) for task in tasks],
+        )
+
+
+# ------------ Bulk endpoint (needs MongoDB) ------------
+@tag("db")
+class TaskBulkApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bulk", password="pass12345")
+        self.client.force_login(self.user)
+        self.tasks = [
+            Task.objects.create(title=f"Task {i}", created_by=self.user, assignee=self.user)
+            for i in range(3)
+        ]
+
+    def post(self, operations):
+        return self.client.post(
+            reverse("tasks:api_bulk"),
+            data=json.dumps({"operations": operations}),
+            content_type="application/json",
+        )
+
+    def test_mixed_batch_with_per_item_results(self):
+        first, second, third = (t.public_id for t in self.tasks)
+        response = self.post([
+            {"op": "create", "data": {"title": "New one", "status": "in_progress"}},
+            {"op": "complete", "id": first},
+            {"op": "update", "id": second, "data": {"title": "Renamed"}},
+            {"op": "delete", "id": third},
+            {"op": "complete", "id": third},
+            {"op": "create", "data": {"title": ""}},
+        ])
+        results = response.json()["results"]
+
+        self.assertEqual([r["status"] for r in results], [201, 200, 200, 200, 404, 400])
+        self.assertEqual(results[1]["task"]["status"], Task.STATUS_DONE)
+        self.assertEqual(Task.objects.get(public_id=second).title, "Renamed")
+        self.assertFalse(Task.objects.filter(public_id=third).exists())
+
+        created = Task.objects.get(public_id=results[0]["id"])
+        self.assertEqual(created.title_terms, ["ne", "new", "on", "one"])
+
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual(stats.in_progress_this_week, 1)
+        self.assertEqual(stats.completed_this_week, 1)
+
+    def test_rejects_empty_batch(self):
+        self.assertEqual(self.post([]).status_code, 400)
+
+
+# ------------ Atomic single-task writes (needs MongoDB) ------------
+@tag("db")
+class AtomicTaskWriteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("atomic", password="pass12345")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(
+            title="Write report",
+            created_by=self.user,
+            assignee=self.user,
+            status=Task.STATUS_IN_PROGRESS,
+        )
+
+    def test_complete_twice_counts_once(self):
+        url = reverse("tasks:api_mark_complete", args=[self.task.public_id])
+
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual(response.json()["task"]["status"], Task.STATUS_DONE)
+
+        stats = TaskStats.objects.get(user=self.user)
+        self.assertEqual(stats.completed_this_week, 1)
+        self.assertEqual(stats.in_progress_this_week, 0)
+
+    def test_update_returns_new_state_and_keeps_invalid_choices(self):
+        url = reverse("tasks:api_update", args=[self.task.public_id])
+        response = self.client.post(
+            url,
+            data=json.dumps({"title": "Write final report", "priority": "nope"}),
+            content_type="application/json",
+        )
+
+        task = response.json()["task"]
+        self.assertEqual(task["title"], "Write final report")
+        self.assertEqual(task["priority"], Task.PRIORITY_MID)
+        self.assertIn("final", Task.objects.get(pk=self.task.pk).search_terms)
+
+    def test_unknown_task_is_404(self):
+        url = reverse("tasks:api_update", args=["missing"])
+        response = self.client.post(
+            url, data=json.dumps({"title": "A"}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@tag("db")
+class AsyncTaskApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("async", password="pass12345")
+        self.client.force_login(self.user)
+        for i in range(5):
+            Task.objects.create(
+                title=f"Task {i}",
+                created_by=self.user,
+                assignee=self.user,
+                due_date=datetime.date(2025, 12, 10 + i % 2),
+            )
+
+    def test_same_json_as_sync_views(self):
+        sync = self.client.get(reverse("tasks:api_list"), {"limit": 2}).json()
+        async_ = self.client.get(reverse("tasks:async_list"), {"limit": 2}).json()
+        self.assertEqual(async_["tasks"], sync["tasks"])
+
+        sync_next = self.client.get(reverse("tasks:api_list"), {"limit": 2, "cursor": sync["next"]})
+        async_next = self.client.get(reverse("tasks:async_list"), {"limit": 2, "cursor": async_["next"]})
+        self.assertEqual(async_next.json()["tasks"], sync_next.json()["tasks"])
+
+    def test_complete_and_tip(self):
+        task = Task.objects.filter(created_by=self.user).first()
+        response = self.client.post(reverse("tasks:async_mark_complete", args=[task.public_id]))
+        self.assertEqual(response.json()["task"]["status"], Task.STATUS_DONE)
+
+        self.assertTrue(self.client.get(reverse("tasks:async_get_tip")).json()["ok"])
+
+    def test_saved_tips_pages(self):
+        for i in range(3):
+            Tip.objects.create(user=self.user, text=f"Tip {i}")
+
+        first = self.client.get(reverse("tasks:saved_tips_api"), {"limit": 2}).json()
+        rest = self.client.get(
+            reverse("tasks:saved_tips_api"), {"limit": 2, "cursor": first["next"]}
+        ).json()
+
+        self.assertEqual([t["text"] for t in first["tips"] + rest["tips"]], ["Tip 2", "Tip 1", "Tip 0"])
+        self.assertIsNone(rest["next"])
+        bad = self.client.get(reverse("tasks:saved_tips_api"), {"cursor": "nope"})
+        self.assertEqual(bad.status_code, 400)
+
+    def test_async_saved_tips(self):
+        for i in range(3):
+            self.client.post(
+                reverse("tasks:async_save_tip"),
+                data=json.dumps({"text": f"Tip {i}"}),
+                content_type="application/json",
+            )
+
+        sync = self.client.get(reverse("tasks:saved_tips_api"), {"limit": 2}).json()
+        async_ = self.client.get(reverse("tasks:async_saved_tips"), {"limit": 2}).json()
+        self.assertEqual(async_, sync)
+
+        tip_id = async_["tips"][0]["id"]
+        self.assertTrue(self.client.post(reverse("tasks:async_delete_tip", args=[tip_id])).json()["ok"])
+        response = self.client.post(reverse("tasks:async_delete_tip", args=[tip_id]))
+        self.assertEqual(response.status_code, 404)
+
+
+@tag("db")
+class TaskExportApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("export", password="pass12345")
+        self.client.force_login(self.user)
+        for i in range(3):
+            Task.objects.create(
+                title=f"Task {i}",
+                created_by=self.user,
+                assignee=self.user,
+                status=Task.STATUS_DONE if i == 0 else Task.STATUS_TODO,
+            )
+
+    def test_ndjson_matches_the_list_api(self):
+        response = self.client.get(reverse("tasks:api_export"))
+        exported = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        listed = self.client.get(reverse("tasks:api_list")).json()["tasks"]
+        self.assertEqual(exported, listed)
+
+    def test_csv_with_status_filter(self):
+        response = self.client.get(reverse("tasks:api_export"), {"format": "csv", "status": "todo"})
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(self.client.get(reverse("tasks:api_export"), {"format": "xml"}).status_code, 400)
+
+
+@tag("db")
+class TaskImportApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("importer", password="pass12345")
+        self.client.force_login(self.user)
+
+    def test_csv_upload(self):
+        upload = SimpleUploadedFile(
+            "tasks.csv",
+            b"title,status,due_date\nWrite spec,done,2025-12-20\n,todo,\nShip,todo,\n",
+            content_type="text/csv",
+        )
+
+        report = self.client.post(reverse("tasks:api_import"), {"file": upload}).json()
+
+        self.assertEqual((report["imported"], report["failed"]), (2, 1))
+        self.assertEqual(report["errors"][0]["row"], 2)
+        self.assertEqual(Task.objects.filter(created_by=self.user).count(), 2)
+        self.assertEqual(self.client.get(reverse("tasks:api_list")).json()["count"], 2)
+
+
+@tag("db")
+class TaskCalendarApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("calendar", password="pass12345")
+        self.client.force_login(self.user)
+        for i in range(4):
+            Task.objects.create(
+                title=f"Task {i}",
+                created_by=self.user,
+                assignee=self.user,
+                due_date=datetime.date(2025, 12, 1 + i // 3),
+            )
+        Task.objects.create(title="Someday", created_by=self.user, assignee=self.user)
+
+    def test_days_are_capped(self):
+        response = self.client.get(
+            reverse("tasks:api_calendar"), {"start": "2025-12-01", "end": "2025-12-31", "per_day": 2}
+        ).json()
+
+        self.assertEqual(response["total"], 4)
+        first, second = response["days"]
+        self.assertEqual((first["date"], first["count"], first["more"]), ("2025-12-01", 3, 1))
+        self.assertEqual([t["title"] for t in first["tasks"]], ["Task 2", "Task 1"])
+        self.assertEqual((second["count"], second["more"]), (1, 0))
@@ -0,0 +1,211 @@
+# NOTES:
+# Process-level catalog of the tips in tips-data.json.
+#
+# get_tip used to re-open and re-parse the JSON file on every request. Now the
+# file is parsed once per process and only reloaded when it actually changes:
+# - we stat() the file at most once every `check_interval` seconds
+# - if mtime/size changed we re-read it, and only rebuild when the content
+#   hash is different
+#
+# Tips are indexed by category and sampled with the alias method, so picking a
+# (weighted) random tip is O(1) no matter how many tips the file has.
+# A tip may carry an optional "weight" (default 1).
+
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from pathlib import Path
+
+TIPS_FILE = Path(__file__).resolve().parent / "tips-data.json"
+
+# tip_key() values: 12 hex characters
+TIP_KEY_RE = re.compile(r"[0-9a-f]{12}")
+
+FALLBACK_TIPS = [
+    {"category": "general", "text": "No tips file found yet."}
+]
+
+
+def tip_key(tip):
+    """
+    Stable short id of a tip (survives reloads as long as the text is the same).
+    """
+    return hashlib.sha1(tip["text"].encode("utf-8")).hexdigest()[:12]
+
+
+class AliasSampler:
+    """
+    Walker's alias method: O(n) to build, O(1) per weighted sample.
+    """
+
+    def __init__(self, items, weights):
+        self.items = list(items)
+        n = len(self.items)
+        self.prob = [0.0] * n
+        self.alias = [0] * n
+
+        if not n:
+            return
+
+        total = float(sum(weights))
+        scaled = [w * n / total for w in weights]
+        small = [i for i, w in enumerate(scaled) if w < 1.0]
+        large = [i for i, w in enumerate(scaled) if w >= 1.0]
+
+        while small and large:
+            s, l = small.pop(), large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        for i in small + large:
+            self.prob[i] = 1.0
+
+    def __len__(self):
+        return len(self.items)
+
+    def sample(self, rng=random):
+        i = rng.randrange(len(self.items))
+        return self.items[i] if rng.random() < self.prob[i] else self.items[self.alias[i]]
+
+
+class TipCatalog:
+    """
+    Thread-safe, lazily (re)loaded view of the tips file.
+    """
+
+    # How many random draws we try to avoid a recently seen tip
+    MAX_REDRAWS = 8
+
+    def __init__(self, path=TIPS_FILE, check_interval=5.0, clock=time.monotonic):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._signature = None
+        self._content_hash = None
+        self._next_check = 0.0
+
+        self.tips = []
+        self._all = AliasSampler([], [])
+        self._by_category = {}
+
+    # ------------ Loading ------------
+
+    def _stat_signature(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _refresh(self):
+        """
+        Reload if the file changed. Cheap when called often: at most one
+        stat() per check_interval, and no parsing unless the bytes changed.
+        """
+        now = self._clock()
+        if now < self._next_check:
+            return
+
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.check_interval
+
+            signature = self._stat_signature()
+            if signature == self._signature and self.tips:
+                return
+            self._signature = signature
+
+            if signature is None:
+                raw = json.dumps(FALLBACK_TIPS).encode("utf-8")
+            else:
+                raw = self.path.read_bytes()
+
+            content_hash = hashlib.sha256(raw).hexdigest()
+            if content_hash == self._content_hash:
+                return
+
+            self._build(json.loads(raw.decode("utf-8")))
+            self._content_hash = content_hash
+
+    def _build(self, raw_tips):
+        tips = []
+        for raw in raw_tips:
+            text = (raw.get("text") or "").strip()
+            if not text:
+                continue
+            tip = {
+                "text": text,
+                "category": raw.get("category") or "general",
+                "weight": max(float(raw.get("weight", 1) or 0), 0.0),
+            }
+            if tip["weight"] <= 0:
+                continue
+            tip["key"] = tip_key(tip)
+            tips.append(tip)
+
+        by_category = {}
+        for tip in tips:
+            by_category.setdefault(tip["category"], []).append(tip)
+
+        # Swap everything at once so readers never see a half-built index
+        self.tips = tips
+        self._all = AliasSampler(tips, [t["weight"] for t in tips])
+        self._by_category = {
+            category: AliasSampler(items, [t["weight"] for t in items])
+            for category, items in by_category.items()
+        }
+
+    # ------------ Public API ------------
+
+    def categories(self):
+        self._refresh()
+        return sorted(self._by_category)
+
+    def sample(self, category=None, exclude=(), rng=random):
+        """
+        Weighted random tip, optionally limited to one category.
+        Tips whose key is in `exclude` are avoided when possible: a few O(1)
+        redraws first, a linear pick over the remaining tips if those fail.
+        Returns None if there is nothing to pick from.
+        """
+        self._refresh()
+
+        sampler = self._by_category.get(category) if category else self._all
+        if not sampler or not len(sampler):
+            return None
+
+        exclude = set(exclude)
+        for _ in range(self.MAX_REDRAWS):
+            tip = sampler.sample(rng)
+            if tip["key"] not in exclude:
+                return tip
+
+        # Unlucky (or most of the category is excluded): pick among the rest.
+        # exclude may hold keys of other categories, only the eligible tips
+        # of this one count.
+        candidates = [t for t in sampler.items if t["key"] not in exclude]
+        if not candidates:
+            # Everything was seen recently, repeating one is all we can do
+            return tip
+        return rng.choices(candidates, weights=[t["weight"] for t in candidates])[0]
+
+
+def parse_tip_keys(raw, limit):
+    """
+    Tip keys sent back by the client (?exclude=key,key), at most `limit`.
+    Anything that isn't a tip key is dropped.
+    """
+    keys = [key for key in (raw or "").split(",") if TIP_KEY_RE.fullmatch(key)]
+    return keys[-limit:]
+
+
+# One catalog per process
+tip_catalog = TipCatalog()
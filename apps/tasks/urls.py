@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = "tasks"
 
@@ -12,9 +12,21 @@ urlpatterns = [
     # List / filter the tasks
     path("api/tasks/", views.TaskListApiView.as_view(), name="api_list"),
 
+    # Stream all the tasks as NDJSON / CSV
+    path("api/tasks/export/", views.TaskExportApiView.as_view(), name="api_export"),
+
+    # Tasks per due day in a date range (calendar / week views)
+    path("api/calendar/", views.TaskCalendarApiView.as_view(), name="api_calendar"),
+
     # Create a new task
     path("api/tasks/create/", views.TaskCreateApiView.as_view(), name="api_create"),
 
+    # Create / update / complete / delete many tasks in one request
+    path("api/tasks/bulk/", views.TaskBulkApiView.as_view(), name="api_bulk"),
+
+    # Create tasks from an uploaded CSV / JSON / NDJSON file
+    path("api/tasks/import/", views.TaskImportApiView.as_view(), name="api_import"),
+
     # Show single task's details
     path("api/tasks/<str:pk>/", views.TaskDetailApiView.as_view(), name="api_detail"),
 
@@ -24,12 +36,28 @@ urlpatterns = [
     # Update a task
     path("api/tasks/<str:public_id>/update/", views.TaskUpdateApiView.as_view(), name="api_update"),
 
+    # Delete a task
+    path("api/tasks/<str:public_id>/delete/", views.TaskDeleteApiView.as_view(), name="api_delete"),
+
     # Update status to done via checkbox
     path("api/tasks/<str:public_id>/complete/", views.TaskCompleteApiView.as_view(), name="api_complete"),
  
+    # -------- Async versions of the JSON endpoints (serve with ASGI) ----------
+    path("api/async/tasks/", async_views.task_list, name="async_list"),
+    path("api/async/tasks/create/", async_views.task_create, name="async_create"),
+    path("api/async/tasks/<str:pk>/", async_views.task_detail, name="async_detail"),
+    path("api/async/tasks/<str:public_id>/complete/", async_views.task_mark_complete, name="async_mark_complete"),
+    path("api/async/tasks/<str:public_id>/update/", async_views.task_update, name="async_update"),
+    path("api/async/tasks/<str:public_id>/delete/", async_views.task_delete, name="async_delete"),
+    path("api/async/tip/", async_views.get_tip, name="async_get_tip"),
+    path("api/async/tip/save/", async_views.save_tip, name="async_save_tip"),
+    path("api/async/tip/saved/", async_views.saved_tips, name="async_saved_tips"),
+    path("api/async/tip/<int:tip_id>/delete/", async_views.delete_tip, name="async_delete_tip"),
+
     # -------------- Tip paths ------------------
     path("tips/", views.tips_page, name="tips_page"),
     path("api/tip/", views.get_tip, name="get_tip_api"),
     path("api/tip/save/", views.save_tip, name="save_tip_api"),
+    path("api/tip/saved/", views.saved_tips, name="saved_tips_api"),
     path("api/tip/<int:tip_id>/delete/", views.delete_tip, name="delete_tip_api"),
 ]
\ No newline at end of file
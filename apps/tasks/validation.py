@@ -0,0 +1,116 @@
+# NOTES:
+# Validation of task fields sent by the clients, shared by the single-task
+# views (sync and async), the bulk API and the importer (importer.py), so a
+# task is accepted or rejected the same way whichever way it comes in.
+# Every function returns (fields, errors), only one of them is non-empty.
+#
+# A task is put in a project (or taken out of it) with "project": <id> / "".
+# Only the callers that pass project_ids (the projects the user can see,
+# membership.visible_project_ids()) accept it, the others ignore the key.
+
+import datetime
+
+from .models import Task, due_sort_key
+
+REQUIRED_ERROR = "This field is required."
+DUE_DATE_ERROR = "Invalid date format. Use YYYY-MM-DD."
+PROJECT_ERROR = "Unknown project."
+
+
+def _choice(value, choices, default):
+    """
+    Return value if it is one of the choices, default otherwise.
+    """
+    return value if value in dict(choices) else default
+
+
+def parse_due_date(raw):
+    """
+    Return (due_date, error). Empty values mean "no due date".
+    """
+    if not raw:
+        return None, None
+    try:
+        return datetime.date.fromisoformat(raw), None
+    except (TypeError, ValueError):
+        return None, DUE_DATE_ERROR
+
+
+def parse_project(raw, project_ids):
+    """
+    Return (fields, error) for the "project" of a task: empty makes it a
+    personal task, anything else must be one of project_ids.
+    """
+    if raw in (None, ""):
+        return {"project_id": None, "task_type": Task.TYPE_PERSONAL}, None
+    try:
+        project_id = int(raw)
+    except (TypeError, ValueError):
+        return {}, PROJECT_ERROR
+    if isinstance(raw, bool) or project_id not in project_ids:
+        return {}, PROJECT_ERROR
+    return {"project_id": project_id, "task_type": Task.TYPE_PROJECT}, None
+
+
+def clean_task_create(data, project_ids=None):
+    """
+    Validate the fields of a new task.
+    Returns (fields, errors), only one of them is non-empty.
+    """
+    title = str(data.get("title") or "").strip()
+    if not title:
+        return {}, {"title": REQUIRED_ERROR}
+
+    due_date, error = parse_due_date(data.get("due_date"))
+    if error:
+        return {}, {"due_date": error}
+
+    fields = {
+        "title": title,
+        "description": str(data.get("description") or "").strip(),
+        "task_type": _choice(data.get("task_type"), Task.TASK_TYPE_CHOICES, Task.TYPE_PERSONAL),
+        "status": _choice(data.get("status"), Task.STATUS_CHOICES, Task.STATUS_TODO),
+        "priority": _choice(data.get("priority"), Task.PRIORITY_CHOICES, Task.PRIORITY_MID),
+        "due_date": due_date,
+    }
+    if project_ids is not None and data.get("project") not in (None, ""):
+        project, error = parse_project(data["project"], project_ids)
+        if error:
+            return {}, {"project": error}
+        fields.update(project)
+    return fields, {}
+
+
+def clean_task_update(data, project_ids=None):
+    """
+    Validate an update of an existing task. Missing or invalid priority /
+    status are left out so the current value is kept (this way the update
+    never needs to read the task first), a missing due date clears it.
+    A missing "project" keeps the task where it is.
+    Returns (fields, errors), only one of them is non-empty.
+    """
+    title = str(data.get("title") or "").strip()
+    if not title:
+        return {}, {"title": REQUIRED_ERROR}
+
+    due_date, error = parse_due_date(data.get("due_date"))
+    if error:
+        return {}, {"due_date": error}
+
+    fields = {
+        "title": title,
+        "description": str(data.get("description") or "").strip(),
+        "due_date": due_date,
+        # Raw updates skip Task.save(), keep the list sort key in step
+        "due_sort": due_sort_key(due_date),
+    }
+    if data.get("priority") in dict(Task.PRIORITY_CHOICES):
+        fields["priority"] = data["priority"]
+    if data.get("status") in dict(Task.STATUS_CHOICES):
+        fields["status"] = data["status"]
+    if project_ids is not None and "project" in data:
+        project, error = parse_project(data["project"], project_ids)
+        if error:
+            return {}, {"project": error}
+        fields.update(project)
+    return fields, {}
@@ -0,0 +1,117 @@
+# NOTES:
+# The task list / detail ETags hash the per-user version on the stats doc
+# (views.py). The API write paths bump it through record_task_change(), but
+# a task payload also changes when:
+# - a task is written through the ORM outside those paths (admin panel,
+#   shell, cascades of a project or user delete)
+# - its project is renamed
+# - its creator or assignee changes username, or the assignee is deleted
+#   (assignee is SET_NULL, which Django applies without signals)
+# The signals below bump the version of every user whose payloads changed
+# and drop their cached entries (apps/tasks/cache.py), so no client keeps
+# getting 304s for a stale body.
+#
+# API paths that write tasks through the ORM and record the change
+# themselves do it inside `with recorded_write():`, the signals leave those
+# writes alone (one version bump per write, not two).
+
+import contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from apps.projects.models import Project
+
+from .cache import invalidate_tasks
+from .models import Task, TaskStats
+
+_recorded = contextvars.ContextVar("tasks_write_recorded", default=False)
+
+
+@contextmanager
+def recorded_write():
+    """
+    Task ORM writes in the block are recorded by the caller
+    (record_task_change() + invalidate_tasks()).
+    """
+    token = _recorded.set(True)
+    try:
+        yield
+    finally:
+        _recorded.reset(token)
+
+
+def bump_versions(public_ids_by_user):
+    """
+    Bump the task-set version of the users ({user_id: [public_id]}) and drop
+    their cached lists, stats and the details of those tasks.
+    """
+    if not public_ids_by_user:
+        return
+    TaskStats.objects.mongo_update_many(
+        {"user_id": {"$in": list(public_ids_by_user)}}, {"$inc": {"version": 1}}
+    )
+    for user_id, public_ids in public_ids_by_user.items():
+        invalidate_tasks(user_id, public_ids)
+
+
+def task_owners(task_filter):
+    """
+    {created_by_id: [public_id]} of the tasks matching a raw filter.
+    """
+    public_ids_by_user = defaultdict(list)
+    docs = Task.objects.mongo_find(task_filter, projection={"_id": 0, "created_by_id": 1, "public_id": 1})
+    for doc in docs:
+        public_ids_by_user[doc["created_by_id"]].append(str(doc["public_id"]))
+    return public_ids_by_user
+
+
+def payloads_changed(task_filter):
+    """
+    bump_versions() for the owners of every task matching a raw filter.
+    """
+    bump_versions(task_owners(task_filter))
+
+
+# ------------ Signals ------------
+
+def _task_changed(sender, instance, **kwargs):
+    if _recorded.get():
+        return
+    bump_versions({instance.created_by_id: [instance.public_id]})
+
+
+def _project_saved(sender, instance, created, **kwargs):
+    if not created:
+        payloads_changed({"project_id": instance.pk})
+
+
+def _user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Login only writes last_login
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    payloads_changed({"$or": [{"created_by_id": instance.pk}, {"assignee_id": instance.pk}]})
+
+
+def _remember_assigned(sender, instance, **kwargs):
+    # Other users' tasks assigned to this user are about to lose their
+    # assignee, without a signal
+    instance._assigned_tasks = task_owners(
+        {"assignee_id": instance.pk, "created_by_id": {"$ne": instance.pk}}
+    )
+
+
+def _user_deleted(sender, instance, **kwargs):
+    bump_versions(getattr(instance, "_assigned_tasks", None))
+
+
+def connect_signals():
+    User = get_user_model()
+    post_save.connect(_task_changed, sender=Task, dispatch_uid="tasks_version_task_save")
+    post_delete.connect(_task_changed, sender=Task, dispatch_uid="tasks_version_task_delete")
+    post_save.connect(_project_saved, sender=Project, dispatch_uid="tasks_version_project_save")
+    post_save.connect(_user_saved, sender=User, dispatch_uid="tasks_version_user_save")
+    pre_delete.connect(_remember_assigned, sender=User, dispatch_uid="tasks_version_user_predelete")
+    post_delete.connect(_user_deleted, sender=User, dispatch_uid="tasks_version_user_delete")
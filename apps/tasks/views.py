@@ -3,22 +3,110 @@
 # If user is not logged in → Django automatically redirects to your login page.
 # Once logged in, they land in the dashboard page.
 
+import copy
 import json  # parse JSON from fetch requests and handle dates
-import datetime  # parse JSON from fetch requests and handle dates
+import hashlib  # build ETags
 
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Q  # used for simple title__icontains search
-from django.http import JsonResponse, Http404  # send JSON back to the frontend
+from django.http import JsonResponse, Http404, StreamingHttpResponse  # send JSON back to the frontend
 from django.shortcuts import get_object_or_404  # fetch a task or return 404 if not found (security).
 from django.utils import timezone  # compare dates correctly based on my timezone settings.
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic import TemplateView
-
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from apps.projects.membership import visible_project_ids
+from apps.projects.models import Project
+from apps.projects.rollups import rebuild_project_rollups
+
+from .bulk import (
+    insert_document,
+    instance_from_document,
+    reserve_ids,
+    update_document,
+)
+from .cache import (
+    detail_key,
+    get_or_compute,
+    invalidate_saved_tips,
+    invalidate_tasks,
+    list_key,
+    saved_tips_key,
+    stats_key,
+)
+from .calendar_range import (
+    InvalidRange,
+    calendar_days,
+    calendar_pipeline,
+    parse_per_day,
+    parse_range,
+)
+from .events import EVENT_RESYNC, publish_task_events, task_event
+from .export import (
+    CONTENT_TYPES,
+    EXPORT_BATCH_SIZE,
+    EXPORT_FORMATS,
+    csv_header,
+    export_chunk,
+    export_filter,
+    export_projection,
+    task_batches,
+)
+from .importer import import_format, import_tasks, parse_rows
 from .models import Task
+from .pagination import (
+    DEFAULT_PAGE_SIZE,
+    TASK_LIST_SORT,
+    TIPS_PAGE_SIZE,
+    InvalidCursor,
+    decode_search_cursor,
+    encode_search_cursor,
+    mongo_filter_after_cursor,
+    paginate_tasks,
+    paginate_tips,
+    parse_limit,
+)
+from .search import SEARCH_TIERS, build_search_terms, query_terms, search_filter
+from .stats import (
+    get_stats_doc,
+    get_task_stats,
+    rebuild_task_stats,
+    record_task_change,
+    record_task_changes,
+    serialize_stats,
+    stats_doc_is_current,
+    task_set_version,
+    task_snapshot,
+)
+from .validation import clean_task_create, clean_task_update
+from .versions import recorded_write
 
 User = get_user_model()
 
+# Columns the task JSON needs, list queries fetch only these
+# (the search index arrays can be big and are never sent to the frontend)
+TASK_PAYLOAD_FIELDS = (
+    "public_id",
+    "title",
+    "description",
+    "task_type",
+    "status",
+    "priority",
+    "due_date",
+    "completed_at",
+    "created_at",
+    "updated_at",
+    "project",
+    "created_by",
+    "assignee",
+)
+
 # ------------ Helper functions ------------
 
 def task_query_for_user(user):
@@ -56,6 +144,100 @@ def parse_request_data(request):
 
     return request.POST.dict()
 
+
+def project_ids_for(user, data):
+    """
+    The projects a task of this request may be put in (see validation.py),
+    only loaded when the client sent one.
+    """
+    return visible_project_ids(user.pk) if data.get("project") else frozenset()
+
+# ------------ Atomic single-task writes ------------
+# The search index arrays are never needed to answer a write
+TASK_WRITE_PROJECTION = {"_id": 0, "search_terms": 0, "title_terms": 0}
+
+
+def update_task_atomically(user, public_id, values, extra_filter=None):
+    """
+    Apply `values` to one of the user's tasks with a single
+    find_one_and_update, the only round trip to the tasks collection.
+
+    Conditions (like "not done yet") go in extra_filter so they are checked
+    atomically with the write. Mongo hands back the pre-image and we apply
+    the same $set to it, which gives both the post-update task and the
+    snapshot the stats need.
+
+    Returns (before, after) Task instances, or (None, None) if nothing matched.
+    """
+    query = {"created_by_id": user.pk, "public_id": public_id, **(extra_filter or {})}
+    changes = update_document(Task, values)
+
+    doc = Task.objects.mongo_find_one_and_update(
+        query,
+        {"$set": changes},
+        projection=TASK_WRITE_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if doc is None:
+        return None, None
+
+    return (
+        instance_from_document(Task, doc),
+        instance_from_document(Task, {**doc, **changes}),
+    )
+
+
+def complete_task_update(now):
+    """
+    (update pipeline, $set changes) marking a task done. A task that already
+    is keeps its completed_at / updated_at, so one find_one_and_update
+    answers both cases (needs MongoDB 4.2+ for pipeline updates).
+    """
+    changes = update_document(
+        Task, {"status": Task.STATUS_DONE, "completed_at": now, "updated_at": now}
+    )
+    already_done = {"$eq": ["$status", Task.STATUS_DONE]}
+    pipeline = [
+        {
+            "$set": {
+                column: {"$cond": [already_done, f"${column}", {"$literal": value}]}
+                for column, value in changes.items()
+            }
+        }
+    ]
+    return pipeline, changes
+
+
+def completed_task(doc, changes):
+    """
+    (before, after) Task instances from the pre-image of a
+    complete_task_update() write. Both are the same instance when the task
+    was already done (nothing changed).
+    """
+    before = instance_from_document(Task, doc)
+    if before.status == Task.STATUS_DONE:
+        return before, before
+    return before, instance_from_document(Task, {**doc, **changes})
+
+
+def complete_task_atomically(user, public_id, now):
+    """
+    Mark one of the user's tasks done, one round trip whether or not it
+    already was. Returns completed_task(), or (None, None) if there is no
+    such task.
+    """
+    pipeline, changes = complete_task_update(now)
+    doc = Task.objects.mongo_find_one_and_update(
+        {"created_by_id": user.pk, "public_id": public_id},
+        pipeline,
+        projection=TASK_WRITE_PROJECTION,
+        return_document=ReturnDocument.BEFORE,
+    )
+    if doc is None:
+        return None, None
+    return completed_task(doc, changes)
+
+
 # This function will explicitly go to Mongo db and fetch the task's id
 def get_task_identifier(task: Task) -> str:
     """
@@ -96,13 +278,22 @@ def serialize_user(user):
     }
 
 
-def serialize_task(task: Task):
+def serialize_project(project):
     """
-    Convert a Task instance into a JSON-safe dict.
-    This is what your frontend will receive.
+    Simplified representation of a project for JSON responses.
     """
-    task_id = get_task_identifier(task)
+    if not project:
+        return None
+    return {
+        "id": project.id,  # type: ignore
+        "name": project.name,  # type: ignore
+    }
 
+
+def task_payload(task: Task, created_by, assignee, project):
+    """
+    The JSON shape of a task, with its related objects already resolved.
+    """
     return {
         "id": task.public_id,
         "title": task.title,
@@ -114,50 +305,176 @@ def serialize_task(task: Task):
         "completed_at": task.completed_at.isoformat() if task.completed_at else None,
         "created_at": task.created_at.isoformat() if task.created_at else None,
         "updated_at": task.updated_at.isoformat() if task.updated_at else None,
-        "project": {
-            "id": task.project.id,  # type: ignore
-            "name": task.project.name,  # type: ignore
-        } if task.project else None,  # type: ignore
-        "created_by": serialize_user(task.created_by),
-        "assignee": serialize_user(task.assignee),
+        "project": serialize_project(project),
+        "created_by": serialize_user(created_by),
+        "assignee": serialize_user(assignee),
     }
 
-# Helper to calculate the statics 
-def compute_task_stats(tasks):
+
+def serialize_task(task: Task):
+    """
+    Convert a Task instance into a JSON-safe dict.
+    This is what your frontend will receive.
+    Fine for ONE task, use serialize_tasks() for lists.
+    """
+    return task_payload(task, task.created_by, task.assignee, task.project)
+
+
+def serialize_tasks(tasks, known_users=()):
     """
-    Given a list of Task objects, compute the dashboard stats.
+    Batch version of serialize_task() for lists, same JSON.
+
+    Reading task.created_by / assignee / project lazily costs one query per
+    task per relation. Here related users and projects are loaded in bulk:
+    at most one query for users and one for projects, whatever the number
+    of tasks. Users passed in known_users (usually request.user) are not
+    queried at all, so a list of personal tasks costs no extra query.
     """
-    today = timezone.localdate()
-    start_of_week = today - datetime.timedelta(days=today.weekday())
+    tasks = list(tasks)
+
+    users = {user.pk: user for user in known_users}
+    missing_user_ids = {
+        user_id
+        for task in tasks
+        for user_id in (task.created_by_id, task.assignee_id)
+        if user_id and user_id not in users
+    }
+    if missing_user_ids:
+        users.update(User.objects.only("id", "username").in_bulk(missing_user_ids))
+
+    project_ids = {task.project_id for task in tasks if task.project_id}
+    projects = (
+        Project.objects.only("id", "name").in_bulk(project_ids) if project_ids else {}
+    )
 
-    tasks_in_progress_this_week = 0
-    tasks_completed_this_week = 0
-    tasks_urgent_today = 0
+    return [
+        task_payload(
+            task,
+            users.get(task.created_by_id),
+            users.get(task.assignee_id),
+            projects.get(task.project_id),
+        )
+        for task in tasks
+    ]
 
-    for task in tasks:
-        created_date = task.created_at.date() if task.created_at else None
-        due_date = task.due_date
+def search_queries(user_id, terms, status=None, cursor=None):
+    """
+    [(tier, raw filter)] of the search ranking tiers left to read, best
+    first (see search.py). With a cursor the first one starts after it.
+    Raises InvalidCursor.
+    """
+    tier, after = decode_search_cursor(cursor) if cursor else (SEARCH_TIERS[0], None)
 
-        if created_date and start_of_week <= created_date <= today:
-            if task.status == Task.STATUS_IN_PROGRESS:
-                tasks_in_progress_this_week += 1
-            elif task.status == Task.STATUS_DONE:
-                tasks_completed_this_week += 1
+    queries = []
+    for name in SEARCH_TIERS[SEARCH_TIERS.index(tier):]:
+        query = search_filter(user_id, terms, name, status=status)
+        if after:
+            query = {"$and": [query, mongo_filter_after_cursor(after)]}
+            after = None
+        queries.append((name, query))
+    return queries
 
-        if (
-            due_date == today
-            and task.status in [Task.STATUS_TODO, Task.STATUS_IN_PROGRESS]
-        ):
-            tasks_urgent_today += 1
 
-    return {
-        "tasks_in_progress_this_week": tasks_in_progress_this_week,
-        "tasks_completed_this_week": tasks_completed_this_week,
-        "tasks_urgent_today": tasks_urgent_today,
-    }
+def search_page(ranked, limit):
+    """
+    (tasks, next cursor) from [(tier, task)] read with limit + 1.
+    """
+    tasks = [task for _, task in ranked[:limit]]
+    if len(ranked) > limit and tasks:
+        return tasks, encode_search_cursor(*ranked[limit - 1])
+    return tasks, None
+
+
+def search_tasks(user, terms, status=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of the ranked search as (tasks, next cursor). Each tier is an
+    indexed find in list order, read only until the page is full.
+    """
+    ranked = []
+    for tier, query in search_queries(user.pk, terms, status=status, cursor=cursor):
+        docs = Task.objects.mongo_find(
+            query,
+            projection=TASK_WRITE_PROJECTION,
+            sort=TASK_LIST_SORT,
+            limit=limit + 1 - len(ranked),
+        )
+        ranked += [(tier, instance_from_document(Task, doc)) for doc in docs]
+        if len(ranked) > limit:
+            break
+    return search_page(ranked, limit)
+
+def task_list_page(user, status, cursor, limit):
+    """
+    One page of the user's tasks as (tasks JSON, next cursor).
+    Raises InvalidCursor for a cursor we did not produce.
+    """
+    # Start from tasks created by this user only
+    qs = Task.objects.filter(created_by=user)
+
+    # Filter by status if it's a valid choice
+    if status:
+        qs = qs.filter(status=status)
+
+    # Order by due date (none last) then newest created_at, one page at a time
+    tasks, next_cursor = paginate_tasks(
+        qs.only(*TASK_PAYLOAD_FIELDS), cursor=cursor, limit=limit
+    )
+
+    # Related users / projects are loaded in bulk
+    return serialize_tasks(tasks, known_users=[user]), next_cursor
+
+# ------------ Conditional GET (ETags) ------------
+# Every write bumps a per-user version counter (stored on the stats doc),
+# so do renames of the related projects / users and ORM writes (versions.py).
+# The ETag is derived from that counter + what was asked for, so a client
+# that already has the current payload gets a 304 without us querying or
+# serializing any task.
+
+def cached_stats_doc(user_id):
+    """
+    get_stats_doc() through the cache (dropped on every task write).
+    """
+    return get_or_compute(
+        stats_key(user_id),
+        lambda: get_stats_doc(user_id),
+        is_valid=stats_doc_is_current,
+    )
+
 
+def get_request_stats_doc(request):
+    """
+    The user's stats doc, read at most once per request
+    (the ETag function and the view both need it).
+    """
+    if not hasattr(request, "_task_stats_doc"):
+        request._task_stats_doc = cached_stats_doc(request.user.pk)
+    return request._task_stats_doc
+
+
+def task_etag(user, version, *parts):
+    basis = [user.pk, user.get_username(), version, *parts]
+    return hashlib.sha1(repr(basis).encode("utf-8")).hexdigest()
+
+
+def _etag(request, *parts):
+    if not request.user.is_authenticated:
+        return None
+
+    version = task_set_version(get_request_stats_doc(request))
+    return task_etag(request.user, version, *parts)
+
+
+def task_list_etag(request, *args, **kwargs):
+    return _etag(request, sorted(request.GET.lists()))
 
 
+def task_detail_etag(request, pk, *args, **kwargs):
+    return _etag(request, "detail", pk)
+
+
+# Let the browser keep the payload but always revalidate it with the ETag
+revalidate = cache_control(private=True, no_cache=True)
+
 # --------------------- Views (controller) ----------------------------
 class DashboardView(LoginRequiredMixin, TemplateView):
     template_name = "tasks/dashboard.html"
@@ -167,28 +484,24 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 
         user = self.request.user
 
-        tasks_qs = Task.objects.filter(created_by=user)
-        tasks = list(tasks_qs)
-
-        # 🔹 Use shared helper
-        stats = compute_task_stats(tasks)
-
-        # Python-side sorting: by due_date then created_at desc
-        sorted_tasks = sorted(
-            tasks,
-            key=lambda t: (
-                t.due_date or datetime.date.max,
-                -t.created_at.timestamp() if t.created_at else 0,
-            ),
+        # 🔹 First page straight from the list index, sorted and limited by
+        # MongoDB (due date, tasks without one last, then newest first)
+        tasks, _ = paginate_tasks(
+            Task.objects.filter(created_by=user).only(*TASK_PAYLOAD_FIELDS),
+            limit=DEFAULT_PAGE_SIZE,
         )
 
+        # 🔹 Materialized stats doc (one indexed read, usually cached)
+        stats = serialize_stats(get_request_stats_doc(self.request))
+
         context["username"] = user.username
         context["active_page"] = "tasks"
-        context["tasks"] = sorted_tasks[:50]
+        context["tasks"] = tasks
 
         context["tasks_in_progress_this_week"] = stats["tasks_in_progress_this_week"]
         context["tasks_completed_this_week"] = stats["tasks_completed_this_week"]
         context["tasks_urgent_today"] = stats["tasks_urgent_today"]
+        context["tasks_overdue"] = stats["tasks_overdue"]
 
         return context
 
@@ -196,7 +509,8 @@ class DashboardView(LoginRequiredMixin, TemplateView):
 # ------------------- Create a new task 
 class TaskCreateApiView(LoginRequiredMixin, View):
     """
-    Handle POST /tasks/api/tasks/create/ to create a new personal task.
+    Handle POST /tasks/api/tasks/create/ to create a new task, personal or
+    in one of the user's projects ("project": <id>).
     Returns JSON.
     """
 
@@ -204,123 +518,206 @@ class TaskCreateApiView(LoginRequiredMixin, View):
         user = request.user
         data = parse_request_data(request)
 
-        title = (data.get("title") or "").strip()
-
-        if not title:
-            return JsonResponse(
-                {
-                    "success": False,
-                    "errors": {"title": "This field is required."},
-                },
-                status=400,
-            )
+        fields, errors = clean_task_create(data, project_ids_for(user, data))
+        if errors:
+            return JsonResponse({"success": False, "errors": errors}, status=400)
 
-        # Optional fields with defaults
-        task_type = data.get("task_type") or Task.TYPE_PERSONAL
-        if task_type not in dict(Task.TASK_TYPE_CHOICES):
-            task_type = Task.TYPE_PERSONAL
+        # Create a task owned by the logged in user
+        with recorded_write():
+            task = Task.objects.create(**fields, created_by=user, assignee=user)
 
-        status = data.get("status") or Task.STATUS_TODO
-        if status not in dict(Task.STATUS_CHOICES):
-            status = Task.STATUS_TODO
-
-        priority = data.get("priority") or Task.PRIORITY_MID
-        if priority not in dict(Task.PRIORITY_CHOICES):
-            priority = Task.PRIORITY_MID
-
-        raw_due = data.get("due_date")
-
-        if raw_due:
-            try:
-                due_date = datetime.date.fromisoformat(raw_due)
-            except ValueError:
-                return JsonResponse(
-                    {
-                        "success": False,
-                        "errors": {"due_date": "Invalid date format. Use YYYY-MM-DD."},
-                    },
-                    status=400,
-                )
-        else:
-            due_date = None
+        after = task_snapshot(task)
+        stats_doc = record_task_change(user.pk, None, after)
+        invalidate_tasks(user.pk)
 
-        # Create a task owned by the logged in user
-        task = Task.objects.create(
-            task_type=task_type,
-            title=title,
-            description=(data.get("description") or "").strip(),
-            created_by=user,
-            assignee=user,
-            status=status,
-            priority=priority,
-            due_date=due_date,
-        )
+        task_data = serialize_tasks([task], known_users=[user])[0]
+        publish_task_events(user.pk, [task_event(None, after, task_data)], stats_doc)
 
         return JsonResponse(
-            {"success": True, "task": serialize_task(task)},
+            {"success": True, "task": task_data},
             status=201,
         )
 
 # ------------List the tasks in the dashboard 
 class TaskListApiView(LoginRequiredMixin, View):
     """
-    GET /tasks/api/tasks/
-    Return all tasks created by the current user, optionally filtered
-    by status and search query, ordered by due_date then created_at.
+    GET /tasks/api/tasks/?status=&q=&limit=&cursor=
+    Return one page of tasks created by the current user, optionally filtered
+    by status, ordered by due_date (tasks without one last) then created_at.
+
+    Pages are keyset-paginated: pass the "next" value from the previous
+    response as ?cursor= to get the following page ("next" is null at the end).
+    With ?q= the search matches are returned instead, best first, paginated
+    the same way.
+
+    Sends an ETag and answers If-None-Match with 304 when nothing changed.
     """
 
+    @method_decorator(revalidate)
+    @method_decorator(condition(etag_func=task_list_etag))
     def get(self, request):
         user = request.user
+        cursor = request.GET.get("cursor") or None
+        limit = parse_limit(request.GET.get("limit"))
 
-        # Base queryset for this user
-        base_qs = Task.objects.filter(created_by=user)
+        # Optional filters
+        status = request.GET.get("status")
+        if status not in dict(Task.STATUS_CHOICES):
+            status = None
 
-        # 🔹 Compute stats on ALL tasks (regardless of table filters)
-        all_tasks = list(base_qs)
-        stats = compute_task_stats(all_tasks)
-        
-        # Start from tasks created by this user only
-        qs = Task.objects.filter(created_by=user)
+        terms = query_terms(request.GET.get("q"))
+
+        try:
+            if terms:
+                # Ranked search over title + description, best matches first
+                tasks, next_cursor = search_tasks(user, terms, status, cursor, limit)
+                tasks_data = serialize_tasks(tasks, known_users=[user])
+            elif not cursor and limit == DEFAULT_PAGE_SIZE:
+                # The first page the dashboard loads, cached per filter
+                tasks_data, next_cursor = get_or_compute(
+                    list_key(user.pk, status),
+                    lambda: task_list_page(user, status, None, limit),
+                )
+            else:
+                tasks_data, next_cursor = task_list_page(user, status, cursor, limit)
+        except InvalidCursor:
+            return JsonResponse(
+                {"ok": False, "error": "Invalid cursor."},
+                status=400,
+            )
+
+        payload = {
+            "tasks": tasks_data,
+            "count": len(tasks_data),
+            "next": next_cursor,
+        }
+
+        # 🔹 Stats cover ALL tasks (regardless of table filters),
+        # only the first page needs them
+        if not cursor:
+            payload["stats"] = serialize_stats(get_request_stats_doc(request))
+
+        return JsonResponse(payload)
+
+
+# ----------------- Export all the tasks (streamed)
+def stream_task_export(user, cursor, export_format):
+    """
+    Chunks of the export, one batch of tasks at a time. The cursor is
+    closed when the export ends or the client goes away.
+    """
+    try:
+        if export_format == "csv":
+            yield csv_header()
+        for tasks in task_batches(cursor):
+            yield export_chunk(export_format, serialize_tasks(tasks, known_users=[user]))
+    finally:
+        cursor.close()
+
+
+class TaskExportApiView(LoginRequiredMixin, View):
+    """
+    GET /tasks/api/tasks/export/?format=ndjson|csv&status=&q=
+    Stream every task created by the current user (same filters as the
+    list API, list order), see export.py.
+    """
+
+    http_method_names = ["get"]
+
+    def get(self, request):
+        user = request.user
+        export_format = request.GET.get("format") or "ndjson"
+        if export_format not in EXPORT_FORMATS:
+            return JsonResponse(
+                {"ok": False, "error": "Unknown export format."},
+                status=400,
+            )
 
-        # Optional filters
         status = request.GET.get("status")
-        query = request.GET.get("q")
+        if status not in dict(Task.STATUS_CHOICES):
+            status = None
+
+        cursor = Task.objects.mongo_find(
+            export_filter(user.pk, status, query_terms(request.GET.get("q"))),
+            projection=export_projection(TASK_PAYLOAD_FIELDS),
+            sort=TASK_LIST_SORT,
+            batch_size=EXPORT_BATCH_SIZE,
+        )
+
+        response = StreamingHttpResponse(
+            stream_task_export(user, cursor, export_format),
+            content_type=CONTENT_TYPES[export_format],
+        )
+        filename = f"tasks-{timezone.localdate().isoformat()}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+# ----------------- Tasks per due day (calendar)
+class TaskCalendarApiView(LoginRequiredMixin, View):
+    """
+    GET /tasks/api/calendar/?start=YYYY-MM-DD&end=YYYY-MM-DD&status=&per_day=
+    The user's tasks due between start and end (included, at most 42 days),
+    per day: the number of tasks, the first per_day of them in list order
+    and how many more there are. Days without tasks are left out.
+    See calendar_range.py.
+    """
+
+    http_method_names = ["get"]
 
-        # Filter by status if it's a valid choice
-        if status in dict(Task.STATUS_CHOICES):
-            qs = qs.filter(status=status)
+    def get(self, request):
+        user = request.user
+        try:
+            start, end = parse_range(request.GET.get("start"), request.GET.get("end"))
+        except InvalidRange as exc:
+            return JsonResponse({"ok": False, "error": str(exc)}, status=400)
 
-        # Simple title search
-        if query:
-            qs = qs.filter(Q(title__icontains=query))
+        status = request.GET.get("status")
+        if status not in dict(Task.STATUS_CHOICES):
+            status = None
 
-        # Order by due_date then newest created_at
-        qs = qs.order_by("due_date", "-created_at")
+        pipeline = calendar_pipeline(
+            user.pk, start, end, status=status, per_day=parse_per_day(request.GET.get("per_day"))
+        )
+        days = calendar_days(Task.objects.mongo_aggregate(pipeline))
 
-        # Serialize tasks (this now uses task.public_id as "id")
-        tasks_data = [serialize_task(task) for task in qs]
+        # The capped tasks of every day, loaded and serialized in one go
+        ids = [pk for day in days for pk in day["ids"]]
+        tasks = Task.objects.only(*TASK_PAYLOAD_FIELDS).in_bulk(ids) if ids else {}
+        payloads = dict(zip(tasks, serialize_tasks(tasks.values(), known_users=[user])))
+        for day in days:
+            day["tasks"] = [payloads[pk] for pk in day.pop("ids") if pk in payloads]
 
         return JsonResponse(
             {
-                "tasks": tasks_data,
-                "count": len(tasks_data),
-                "stats": stats,
+                "ok": True,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "total": sum(day["count"] for day in days),
+                "days": days,
             }
         )
-    
+
 # ----------------- Show the task's details
 class TaskDetailApiView(LoginRequiredMixin, View):
     """
     GET /tasks/api/tasks/<pk>/
     Returns a single task as JSON, limited to tasks created by this user.
+    Supports If-None-Match like the list endpoint.
     """
 
     http_method_names = ["get"]
 
+    @method_decorator(revalidate)
+    @method_decorator(condition(etag_func=task_detail_etag))
     def get(self, request, pk, *args, **kwargs):
-        # 🔹 Only fetch tasks created by this user
-        task = get_task_for_user_or_404(request.user, pk)
-        task_data = serialize_task(task)
+        user = request.user
+
+        # 🔹 Only tasks created by this user, cached until the task changes
+        task_data = get_or_compute(
+            detail_key(user.pk, pk),
+            lambda: serialize_tasks([get_task_for_user_or_404(user, pk)], known_users=[user])[0],
+        )
 
         return JsonResponse(
             {
@@ -339,40 +736,30 @@ class TaskMarkCompleteApiView(LoginRequiredMixin, View):
 
     def post(self, request, public_id, *args, **kwargs):
         user = request.user
+        now = timezone.now()
 
-        qs = Task.objects.filter(created_by=user, public_id=public_id)
-        row = qs.values("status").first()
+        # One atomic round trip, also when the task is already done
+        before, task = complete_task_atomically(user, public_id, now)
 
-        if not row:
+        if task is None:
             return JsonResponse(
                 {"ok": False, "error": "Task not found."},
                 status=404,
             )
-
-        current_status = row["status"]
-
-        # If already done, just return the current task
-        if current_status == Task.STATUS_DONE:
-            task = qs.first()
+        if task is before:
+            # Already done, nothing was written
             return JsonResponse(
-                {
-                    "ok": True,
-                    "task": serialize_task(task), # type: ignore
-                }
+                {"ok": True, "task": serialize_tasks([task], known_users=[user])[0]}
             )
 
-        # Otherwise: mark as done + set completed_at
-        now = timezone.now()
-        qs.update(status=Task.STATUS_DONE, completed_at=now)
+        before, after = task_snapshot(before), task_snapshot(task)
+        stats_doc = record_task_change(user.pk, before, after)
+        invalidate_tasks(user.pk, [public_id])
 
-        updated_task = qs.first()
+        task_data = serialize_tasks([task], known_users=[user])[0]
+        publish_task_events(user.pk, [task_event(before, after, task_data)], stats_doc)
 
-        return JsonResponse(
-            {
-                "ok": True,
-                "task": serialize_task(updated_task), # type: ignore
-            }
-        )
+        return JsonResponse({"ok": True, "task": task_data})
     
 #--------------------- Update a Task
 class TaskUpdateApiView(LoginRequiredMixin, View):
@@ -387,68 +774,346 @@ class TaskUpdateApiView(LoginRequiredMixin, View):
         user = request.user
         data = parse_request_data(request)
 
-        qs = Task.objects.filter(created_by=user, public_id=public_id)
-        task = qs.first()
+        fields, errors = clean_task_update(data, project_ids_for(user, data))
+        if errors:
+            return JsonResponse({"success": False, "errors": errors}, status=400)
+
+        # ----- Apply update -----
+        # Raw writes skip Task.save(), so rebuild the search terms here
+        search_terms, title_terms = build_search_terms(
+            fields["title"], fields["description"]
+        )
+        before, task = update_task_atomically(
+            user,
+            public_id,
+            {
+                **fields,
+                "search_terms": search_terms,
+                "title_terms": title_terms,
+                "updated_at": timezone.now(),
+            },
+        )
 
-        if not task:
+        if task is None:
             return JsonResponse(
                 {"success": False, "errors": {"__all__": "Task not found."}},
                 status=404,
             )
 
-        # ----- Title (required) -----
-        title = (data.get("title") or "").strip()
-        if not title:
+        before, after = task_snapshot(before), task_snapshot(task)
+        stats_doc = record_task_change(user.pk, before, after)
+        invalidate_tasks(user.pk, [public_id])
+
+        task_data = serialize_tasks([task], known_users=[user])[0]
+        publish_task_events(user.pk, [task_event(before, after, task_data)], stats_doc)
+
+        return JsonResponse({"success": True, "task": task_data})
+
+#--------------------- Delete a Task
+class TaskDeleteApiView(LoginRequiredMixin, View):
+    """
+    DELETE (or POST) /tasks/api/tasks/<public_id>/delete/
+    Delete a task created by the current user.
+    """
+
+    http_method_names = ["delete", "post"]
+
+    def delete(self, request, public_id, *args, **kwargs):
+        user = request.user
+
+        qs = Task.objects.filter(created_by=user, public_id=public_id)
+        row = qs.values("status", "due_date", "created_at", "project_id").first()
+
+        if not row:
+            return JsonResponse(
+                {"ok": False, "error": "Task not found."},
+                status=404,
+            )
+
+        with recorded_write():
+            qs.delete()
+        before = task_snapshot(row)
+        stats_doc = record_task_change(user.pk, before, None)
+        invalidate_tasks(user.pk, [public_id])
+        publish_task_events(
+            user.pk, [task_event(before, None, public_id=public_id)], stats_doc
+        )
+
+        return JsonResponse({"ok": True, "id": public_id})
+
+    def post(self, request, public_id, *args, **kwargs):
+        return self.delete(request, public_id, *args, **kwargs)
+
+
+#--------------------- Bulk operations
+MAX_BULK_OPERATIONS = 500
+
+
+class TaskBulkApiView(LoginRequiredMixin, View):
+    """
+    POST /tasks/api/tasks/bulk/
+    {"operations": [
+        {"op": "create", "data": {...same fields as create...}},
+        {"op": "update", "id": "<public_id>", "data": {...}},
+        {"op": "complete", "id": "<public_id>"},
+        {"op": "delete", "id": "<public_id>"}
+    ]}
+
+    Every operation is validated like the single-item views. The valid ones
+    are sent as ONE ordered bulk_write in the request order (so several
+    operations on the same task apply in order), the invalid ones are
+    skipped. The response has one
+    result per operation, in the request order, with the task as it was
+    right after that operation.
+
+    Cost: one query to load the referenced tasks, one to reserve ids for
+    the creates, the bulk_write, and one stats update.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request, *args, **kwargs):
+        user = request.user
+        operations = parse_request_data(request).get("operations")
+
+        if not isinstance(operations, list) or not operations:
+            return JsonResponse(
+                {"ok": False, "error": "Send a non-empty list of operations."},
+                status=400,
+            )
+        if len(operations) > MAX_BULK_OPERATIONS:
             return JsonResponse(
                 {
-                    "success": False,
-                    "errors": {"title": "This field is required."},
+                    "ok": False,
+                    "error": f"At most {MAX_BULK_OPERATIONS} operations per request.",
                 },
                 status=400,
             )
 
-        # ----- Optional fields -----
-        description = (data.get("description") or "").strip()
+        # One query for every existing task the batch refers to
+        public_ids = {
+            str(op["id"]) for op in operations if isinstance(op, dict) and op.get("id")
+        }
+        self.tasks = (
+            {
+                task.public_id: task
+                for task in Task.objects.filter(
+                    created_by=user, public_id__in=public_ids
+                ).only(*TASK_PAYLOAD_FIELDS)
+            }
+            if public_ids
+            else {}
+        )
+
+        self.user = user
+        self.now = timezone.now()
+        self.project_ids = None
+        # One round trip for the ids of every create (failed ones leave gaps)
+        self.new_ids = reserve_ids(
+            Task,
+            sum(1 for op in operations if isinstance(op, dict) and op.get("op") == "create"),
+        )
+        self.writes = []  # (result index, pymongo operation), in request order
+        self.changes = []  # (result index, before, after) snapshots
 
-        priority = data.get("priority") or task.priority
-        if priority not in dict(Task.PRIORITY_CHOICES):
-            priority = task.priority
+        results = [self.plan(index, op) for index, op in enumerate(operations)]
+        stats_doc = self.execute(results)
+        if stats_doc is not None:
+            invalidate_tasks(user.pk, [result.get("id") for result in results])
 
-        status = data.get("status") or task.status
-        if status not in dict(Task.STATUS_CHOICES):
-            status = task.status
-
-        raw_due = data.get("due_date")
-        if raw_due:
-            try:
-                due_date = datetime.date.fromisoformat(raw_due)
-            except ValueError:
-                return JsonResponse(
-                    {
-                        "success": False,
-                        "errors": {"due_date": "Invalid date format. Use YYYY-MM-DD."},
-                    },
-                    status=400,
-                )
+        # The task of every result (as of its operation), serialized in one go
+        tasks = {id(r["_task"]): r["_task"] for r in results if r.get("_task")}
+        payloads = dict(zip(tasks, serialize_tasks(tasks.values(), known_users=[user])))
+        for result in results:
+            task = result.pop("_task", None)
+            if task is not None and result["ok"]:
+                result["task"] = payloads[id(task)]
+
+        if stats_doc is not None:
+            self.publish(results, stats_doc)
+
+        return JsonResponse(
+            {"ok": all(r["ok"] for r in results), "results": results}
+        )
+
+    def project_ids_for(self, data):
+        # Loaded once per batch, if any operation names a project
+        if not data.get("project"):
+            return frozenset()
+        if self.project_ids is None:
+            self.project_ids = visible_project_ids(self.user.pk)
+        return self.project_ids
+
+    @staticmethod
+    def failed(result, status, errors):
+        result.update(ok=False, status=status, errors=errors)
+        result.pop("_task", None)
+        return result
+
+    def plan(self, index, op):
+        """
+        Validate one operation and queue its write. Returns its result.
+        """
+        if not isinstance(op, dict):
+            op = {}
+
+        kind = op.get("op")
+        data = op.get("data") if isinstance(op.get("data"), dict) else {}
+        result = {"index": index, "op": kind, "ok": True, "status": 200}
+
+        if kind == "create":
+            fields, errors = clean_task_create(data, self.project_ids_for(data))
+            if errors:
+                return self.failed(result, 400, errors)
+
+            task = Task(**fields, created_by=self.user, assignee=self.user)
+            task.public_id = str(task.public_id)
+            task.pk = self.new_ids.pop(0)
+            task.refresh_search_terms()
+            self.writes.append((index, InsertOne(insert_document(task))))
+            self.changes.append((index, None, task_snapshot(task)))
+            result.update(status=201, id=task.public_id, _task=task)
+            return result
+
+        if kind not in ("update", "complete", "delete"):
+            return self.failed(result, 400, {"__all__": "Unknown operation."})
+
+        public_id = str(op.get("id") or "")
+        task = self.tasks.get(public_id)
+        result["id"] = public_id
+        if task is None:
+            return self.failed(result, 404, {"__all__": "Task not found."})
+
+        before = task_snapshot(task)
+
+        if kind == "delete":
+            # Later operations on the same task will get a 404
+            del self.tasks[public_id]
+            self.writes.append((index, DeleteOne({"id": task.pk})))
+            self.changes.append((index, before, None))
+            return result
+
+        predicate = {"id": task.pk}
+
+        if kind == "complete":
+            # Already done: nothing to write, same as the single view
+            if task.status == Task.STATUS_DONE:
+                result["_task"] = copy.copy(task)
+                return result
+            values = {"status": Task.STATUS_DONE, "completed_at": self.now}
+            predicate["status"] = {"$ne": Task.STATUS_DONE}
         else:
-            due_date = None
+            values, errors = clean_task_update(data, self.project_ids_for(data))
+            if errors:
+                return self.failed(result, 400, errors)
 
-        # ----- Apply update -----
-        qs.update(
-            title=title,
-            description=description,
-            priority=priority,
-            status=status,
-            due_date=due_date,
+        values["updated_at"] = self.now
+        for name, value in values.items():
+            setattr(task, name, value)
+
+        if kind == "update":
+            # Raw writes skip Task.save(), so rebuild the search terms here
+            task.refresh_search_terms()
+            values.update(search_terms=task.search_terms, title_terms=task.title_terms)
+
+        self.writes.append(
+            (index, UpdateOne(predicate, {"$set": update_document(Task, values)}))
         )
+        self.changes.append((index, before, task_snapshot(task)))
+        # Later operations on the same task change `task`, not this result
+        result["_task"] = copy.copy(task)
+        return result
+
+    def execute(self, results):
+        """
+        Send all the queued writes as one bulk_write and update the stats.
+        Returns the new stats doc, or None if there was nothing to write.
+        """
+        writes = self.writes
+        if not writes:
+            return None
+
+        try:
+            Task.objects.mongo_bulk_write([write for _, write in writes], ordered=True)
+        except BulkWriteError as exc:
+            # Ordered bulk: everything before the first error was applied,
+            # nothing after it. The counters can't be trusted, recount them.
+            failed_at = exc.details["writeErrors"][0]["index"]
+            for index, _ in writes[failed_at:]:
+                self.failed(results[index], 500, {"__all__": "The write failed."})
+            self.write_failed = True
+            rebuild_project_rollups(
+                {
+                    snapshot["project_id"]
+                    for _, before, after in self.changes
+                    for snapshot in (before, after)
+                    if snapshot and snapshot.get("project_id")
+                }
+            )
+            return rebuild_task_stats(self.user.pk)
 
-        updated_task = qs.first()
+        self.write_failed = False
+        return record_task_changes(
+            self.user.pk, [(before, after) for _, before, after in self.changes]
+        )
 
+    def publish(self, results, stats_doc):
+        """
+        One live event per applied change, all in one message.
+        """
+        if self.write_failed:
+            # We don't know exactly what was applied
+            events = [{"type": EVENT_RESYNC}]
+        else:
+            events = [
+                task_event(
+                    before,
+                    after,
+                    results[index].get("task"),
+                    public_id=results[index].get("id"),
+                )
+                for index, before, after in self.changes
+            ]
+        publish_task_events(self.user.pk, events, stats_doc)
+
+#--------------------- Import from a file
+# Rows per uploaded file, bigger imports go through `manage.py import_tasks`
+TASK_IMPORT_MAX_ROWS = getattr(settings, "TASK_IMPORT_MAX_ROWS", 100_000)
+
+
+class TaskImportApiView(LoginRequiredMixin, View):
+    """
+    POST /tasks/api/tasks/import/ (multipart: file, optional format=csv|json|ndjson)
+    Create a task per row of the uploaded file, validated like the create
+    API and inserted in batches (see importer.py). Returns the report:
+    rows, imported, failed, the first row errors, and why the import
+    stopped early if it did.
+    """
+
+    http_method_names = ["post"]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return JsonResponse(
+                {"ok": False, "error": "Upload a file as \"file\"."},
+                status=400,
+            )
+
+        file_format = import_format(upload.name, request.POST.get("format"))
+        if file_format is None:
+            return JsonResponse(
+                {"ok": False, "error": "Unknown file format, use csv, json or ndjson."},
+                status=400,
+            )
+
+        report = import_tasks(
+            request.user,
+            parse_rows(upload, file_format),
+            max_rows=TASK_IMPORT_MAX_ROWS,
+        )
         return JsonResponse(
-            {
-                "success": True,
-                "task": serialize_task(updated_task), # type: ignore
-            }
+            {"ok": not report["failed"] and not report["error"], **report}
         )
 
 # --------------------- Mark task as complete ------------------------
@@ -458,15 +1123,19 @@ class TaskCompleteApiView(LoginRequiredMixin, View):
 
       if task.status == Task.STATUS_DONE:
           # Already done – just return current state
-          stats = compute_task_stats(request.user)
+          stats = get_task_stats(request.user)
           return JsonResponse(
               {"ok": True, "task": serialize_task(task), "stats": stats}
           )
 
+      before = task_snapshot(task)
       task.status = Task.STATUS_DONE
-      task.save()
+      with recorded_write():
+          task.save()
+      record_task_change(request.user.pk, before, task_snapshot(task))
+      invalidate_tasks(request.user.pk, [public_id])
 
-      stats = compute_task_stats(request.user)
+      stats = get_task_stats(request.user)
 
       return JsonResponse(
           {
@@ -478,66 +1147,130 @@ class TaskCompleteApiView(LoginRequiredMixin, View):
   
 
 # --------------------------- Tip Views --------------------------
-import random
-from pathlib import Path
-
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.decorators.http import require_http_methods
 
 from .models import Tip
+from .tips import parse_tip_keys, tip_catalog
 
-# Helper to Load tips from tips_data.json in this app.
-def load_tips_from_file():
+# How many of the last shown tips we try not to show again (the page sends them)
+RECENT_TIPS_LIMIT = 5
+
+def random_tip_response(request):
     """
-    Load tips from tips_data.json inside the tasks app.
+    The get_tip JSON (sync and async view): the catalog is in memory and
+    the recent tips come from the client, so there is no I/O at all.
     """
-    app_dir = Path(__file__).resolve().parent
-    tips_file = app_dir / "tips-data.json"
+    category = (request.GET.get("category") or "").strip() or None
+
+    if category and category not in tip_catalog.categories():
+        return JsonResponse(
+            {"ok": False, "error": "Unknown tip category."},
+            status=404,
+        )
+
+    # The page sends the keys of the tips it just showed, nothing is
+    # stored server side (no session write per tip)
+    recent = parse_tip_keys(request.GET.get("exclude"), RECENT_TIPS_LIMIT)
+    tip = tip_catalog.sample(category=category, exclude=recent)
+
+    if not tip:
+        tip = {"key": None, "category": "general", "text": "No tips available."}
 
-    if not tips_file.exists():
-        return [
-            {"category": "general", "text": "No tips file found yet."}
-        ]
+    return JsonResponse(
+        {
+            "ok": True,
+            "tip": {
+                "id": tip["key"],
+                "text": tip["text"],
+                "category": tip["category"],
+            },
+        }
+    )
+
+
+def clean_tip(request):
+    """
+    (text, category) of a save_tip body (JSON or form). text is "" if
+    missing.
+    """
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+    except Exception:
+        data = request.POST
+
+    return (data.get("text") or "").strip(), (data.get("category") or "").strip()
+
+
+def tip_payload(tip):
+    return {
+        "id": tip.id,  # type: ignore
+        "text": tip.text,
+        "category": tip.category,
+        "created_at": tip.created_at.isoformat(),
+    }
 
-    with tips_file.open("r", encoding="utf-8") as f:
-        return json.load(f)
 
 # Render the tip in the page
 @login_required
 def tips_page(request):
-    saved_tips = Tip.objects.filter(user=request.user)
+    # Only the first page of saved tips is rendered, tips.js loads the
+    # rest while scrolling. Cached until the user saves or deletes a tip.
+    saved_tips, next_cursor = get_or_compute(
+        saved_tips_key(request.user.pk),
+        lambda: paginate_tips(Tip.objects.filter(user=request.user)),
+    )
 
     context = {
         "saved_tips": saved_tips,
+        "next_cursor": next_cursor,
         "active_page": "tips",
         "username": request.user.first_name or request.user.username,
     }
     return render(request, "tasks/tips_page.html", context)
 
 
-#  Returns a random tip from JSON as JSON.
 @login_required
 @require_http_methods(["GET"])
-def get_tip(request):
+def saved_tips(request):
     """
-    GET /tasks/api/tip/
-    Returns a random tip from JSON as JSON.
+    GET /tasks/api/tip/saved/?cursor=&limit=
+    One page of the user's saved tips, newest first. Pass the "next" value
+    of the previous page (or of the tips page) as ?cursor=.
     """
-    tips = load_tips_from_file()
-    tip = random.choice(tips) if tips else {"category": "general", "text": "No tips available."}
+    limit = parse_limit(request.GET.get("limit"), default=TIPS_PAGE_SIZE)
+
+    try:
+        tips, next_cursor = paginate_tips(
+            Tip.objects.filter(user=request.user),
+            cursor=request.GET.get("cursor") or None,
+            limit=limit,
+        )
+    except InvalidCursor:
+        return JsonResponse(
+            {"ok": False, "error": "Invalid cursor."},
+            status=400,
+        )
 
     return JsonResponse(
-        {
-            "ok": True,
-            "tip": {
-                "text": tip.get("text", "No tip text."),
-                "category": tip.get("category", "general"),
-            },
-        }
+        {"ok": True, "tips": [tip_payload(tip) for tip in tips], "next": next_cursor}
     )
 
+
+#  Returns a random tip from the catalog as JSON.
+@login_required
+@require_http_methods(["GET"])
+def get_tip(request):
+    """
+    GET /tasks/api/tip/?category=<name>&exclude=<key>,<key>
+    Returns a random tip from the in-memory catalog as JSON.
+    The tips in ?exclude= (the last few the page showed) are skipped when
+    possible.
+    """
+    return random_tip_response(request)
+
 # ------------------ Save tip to the db --------------------
 @login_required
 @require_http_methods(["POST"])
@@ -547,13 +1280,7 @@ def save_tip(request):
     Save the currently shown tip text to the DB for this user.
     Body: JSON or form with 'text' and optional 'category'.
     """
-    try:
-        data = json.loads(request.body.decode("utf-8"))
-    except Exception:
-        data = request.POST
-
-    text = (data.get("text") or "").strip()
-    category = (data.get("category") or "").strip()
+    text, category = clean_tip(request)
 
     if not text:
         return JsonResponse(
@@ -566,17 +1293,10 @@ def save_tip(request):
         text=text,
         category=category,
     )
+    invalidate_saved_tips(request.user.pk)
 
     return JsonResponse(
-        {
-            "ok": True,
-            "tip": {
-                "id": tip.id, # type: ignore
-                "text": tip.text,
-                "category": tip.category,
-                "created_at": tip.created_at.isoformat(),
-            },
-        },
+        {"ok": True, "tip": tip_payload(tip)},
         status=201,
     )
 
@@ -592,6 +1312,7 @@ def delete_tip(request, tip_id):
         id=tip_id,
         user=request.user,
     ).delete()  
+    invalidate_saved_tips(request.user.pk)
 
     if deleted_count == 0:
         return JsonResponse(
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up, it loads models. Serves the live task
+# events stream (SSE), everything else goes to Django.
+from apps.tasks.live import mount_task_events  # noqa: E402
+
+application = mount_task_events(django_application)
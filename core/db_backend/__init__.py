@@ -0,0 +1,6 @@
+"""
+Djongo database backend that picks the MongoDB endpoint lazily at runtime
+(Atlas first, local fallback) instead of probing Atlas when settings load.
+
+Use it with ENGINE = "core.db_backend".
+"""
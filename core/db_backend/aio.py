@@ -0,0 +1,122 @@
+# NOTES:
+# Awaitable access to the same MongoDB for the async views.
+#
+# pymongo calls block. Inside an async view that would freeze the event loop,
+# so every call is handed to a small dedicated I/O thread pool and awaited.
+# This is the same design motor uses internally; motor itself is not an
+# option here (motor 2.x is the only line that works with djongo's
+# pymongo 3.12, and it no longer imports on Python 3.11).
+# - the host comes from the same EndpointSelector as the sync backend, so
+#   both follow a failover / switch back together
+# - it reuses the shared MongoClient from get_client(): one connection pool
+#   for sync and async code, with the same pool metrics
+# - the I/O pool has as many threads as the connection pool has
+#   connections, more threads would only wait on a checkout
+
+import asyncio
+import contextlib
+import contextvars
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from pymongo.errors import ConnectionFailure
+
+from .base import get_client
+from .endpoints import get_endpoint_selector
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_io_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            client_options = settings.DATABASES["default"].get("CLIENT", {})
+            _executor = ThreadPoolExecutor(
+                max_workers=client_options.get("maxPoolSize") or 100,
+                thread_name_prefix="mongo-io",
+            )
+        return _executor
+
+
+async def run_io(func, *args, **kwargs):
+    """
+    Run one blocking pymongo call on the I/O pool and await its result.
+    """
+    loop = asyncio.get_running_loop()
+    # Run in a copy of our context, so command_metrics can tell which
+    # request the command belongs to
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        get_io_executor(), functools.partial(context.run, func, *args, **kwargs)
+    )
+
+
+class AsyncCollection:
+    """
+    Awaitable version of a pymongo Collection: `await coll.find_one(...)`.
+    find() and aggregate() return lists, the whole cursor is read in the
+    I/O thread (always use a limit).
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        method = getattr(self.collection, name)
+
+        async def call(*args, **kwargs):
+            return await run_io(method, *args, **kwargs)
+
+        return call
+
+    def with_options(self, **kwargs):
+        return AsyncCollection(self.collection.with_options(**kwargs))
+
+    async def find(self, *args, **kwargs):
+        return await run_io(lambda: list(self.collection.find(*args, **kwargs)))
+
+    async def aggregate(self, pipeline, **kwargs):
+        return await run_io(lambda: list(self.collection.aggregate(pipeline, **kwargs)))
+
+
+class AsyncDatabase:
+    def __init__(self, database):
+        self.database = database
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.database[name])
+
+
+@contextlib.asynccontextmanager
+async def async_database(alias="default"):
+    """
+    async with async_database() as db:
+        doc = await db["tasks_task"].find_one(...)
+
+    Connection failures inside the block make the selector fail over,
+    like FailoverCursor does for the sync backend.
+    """
+    # The connection's settings, so test runs use the test database name
+    settings_dict = connections[alias].settings_dict
+    selector = get_endpoint_selector(alias, settings_dict)
+
+    # The very first probe blocks, keep it off the event loop
+    if not selector.resolved:
+        await run_io(selector.active_uri)
+    host = selector.active_uri()
+
+    # Same options as DatabaseWrapper.get_new_connection(), same shared client
+    client = get_client(
+        host, document_class=OrderedDict, **settings_dict.get("CLIENT", {})
+    )
+    try:
+        yield AsyncDatabase(client[settings_dict["NAME"]])
+    except ConnectionFailure:
+        selector.mark_failed(host)
+        raise
@@ -0,0 +1,191 @@
+# NOTES:
+# Thin layer over djongo's DatabaseWrapper:
+# - the "host" comes from the EndpointSelector instead of settings.py
+# - MongoClients are cached per host (djongo caches them per db NAME, so it
+#   would keep using the old server after a failover)
+# - connection failures raised while running queries tell the selector,
+#   and the next query reconnects to whatever endpoint is active then. That
+#   covers the ORM (SQL cursor) and the DjongoManager `mongo_<method>` calls,
+#   which go to pymongo through cursor().db_conn (see FailoverProxy).
+
+import threading
+from collections import OrderedDict
+
+from djongo import base as djongo_base
+from djongo.cursor import Cursor
+from djongo.database import DatabaseError
+from pymongo import MongoClient
+from pymongo.collection import Collection
+from pymongo.command_cursor import CommandCursor
+from pymongo.cursor import Cursor as PymongoCursor
+from pymongo.database import Database
+from pymongo.errors import ConnectionFailure
+
+from .command_metrics import command_tracker
+from .endpoints import get_endpoint_selector
+from .pool_metrics import pool_metrics
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(host, **options):
+    """
+    One MongoClient (and connection pool) per host for the whole process.
+    Pool size, timeouts, compression and concerns come from DATABASES CLIENT.
+    """
+    with _clients_lock:
+        client = _clients.get(host)
+        if client is None:
+            client = MongoClient(
+                host=host,
+                connect=False,
+                event_listeners=[pool_metrics, command_tracker],
+                **options,
+            )
+            _clients[host] = client
+        return client
+
+
+def is_connection_failure(error):
+    """
+    Djongo wraps every pymongo error into DatabaseError, walk the chain.
+    """
+    while error is not None:
+        if isinstance(error, ConnectionFailure):
+            return True
+        error = error.__cause__
+    return False
+
+
+class FailoverProxy:
+    """
+    Wraps a pymongo Database / Collection / cursor: a ConnectionFailure
+    raised by any call (or while iterating a cursor, where find() really
+    runs) tells the selector. Databases, collections and cursors it hands
+    out are wrapped too.
+    """
+
+    WRAPPED = (Database, Collection, PymongoCursor, CommandCursor)
+
+    def __init__(self, target, on_connection_failure):
+        self._target = target
+        self._on_connection_failure = on_connection_failure
+
+    def _guard(self, method, *args, **kwargs):
+        try:
+            return method(*args, **kwargs)
+        except ConnectionFailure:
+            self._on_connection_failure()
+            raise
+
+    def _wrap(self, value):
+        if value is self._target:
+            return self  # cursor.sort() etc. return the cursor itself
+        if isinstance(value, self.WRAPPED):
+            return FailoverProxy(value, self._on_connection_failure)
+        return value
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if isinstance(attr, self.WRAPPED) or not callable(attr):
+            return self._wrap(attr)
+
+        def call(*args, **kwargs):
+            return self._wrap(self._guard(attr, *args, **kwargs))
+
+        return call
+
+    def __getitem__(self, name):
+        return self._wrap(self._target[name])
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return self._guard(next, self._target)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._target.__exit__(*exc_info)
+
+
+class FailoverCursor(Cursor):
+    def __init__(self, client_conn, db_conn, *args, on_connection_failure, **kwargs):
+        self.on_connection_failure = on_connection_failure
+        super().__init__(
+            client_conn, FailoverProxy(db_conn, on_connection_failure), *args, **kwargs
+        )
+
+    def _run(self, method, *args):
+        try:
+            return method(*args)
+        except DatabaseError as e:
+            if is_connection_failure(e):
+                self.on_connection_failure()
+            raise
+
+    def execute(self, sql, params=None):
+        return self._run(super().execute, sql, params)
+
+    def fetchmany(self, size=1):
+        return self._run(super().fetchmany, size)
+
+    def fetchone(self):
+        return self._run(super().fetchone)
+
+
+class DatabaseWrapper(djongo_base.DatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        self.active_host = None
+        super().__init__(*args, **kwargs)
+
+    @property
+    def endpoint_selector(self):
+        return get_endpoint_selector(self.alias, self.settings_dict)
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params["host"] = self.endpoint_selector.active_uri()
+        return params
+
+    def get_new_connection(self, connection_params):
+        name = connection_params.pop("name")
+        enforce_schema = connection_params.pop("enforce_schema")
+        connection_params["document_class"] = OrderedDict
+
+        self.active_host = connection_params.pop("host")
+        self.client_connection = get_client(self.active_host, **connection_params)
+
+        database = self.client_connection[name]
+        self.djongo_connection = djongo_base.DjongoClient(database, enforce_schema)
+        return database
+
+    def ensure_connection(self):
+        # After a failover (or a switch back) drop the old connection
+        if (
+            self.connection is not None
+            and self.active_host != self.endpoint_selector.active_uri()
+        ):
+            self.close()
+        super().ensure_connection()
+
+    def create_cursor(self, name=None):
+        return FailoverCursor(
+            self.client_connection,
+            self.connection,
+            self.djongo_connection,
+            on_connection_failure=self._on_connection_failure,
+        )
+
+    def _on_connection_failure(self):
+        if self.active_host:
+            self.endpoint_selector.mark_failed(self.active_host)
+
+    def _close(self):
+        # The MongoClient is shared by every thread, closing it here would
+        # tear down the pool under the other requests. Just drop our handle.
+        self.active_host = None
@@ -0,0 +1,99 @@
+# NOTES:
+# pymongo also publishes one event per command (find, insert, aggregate...).
+# CommandTracker records the commands run while a block of code runs, e.g.
+# "how many DB round trips did this request cost":
+#
+#     with command_tracker.track() as recorder:
+#         client.get("/tasks/api/tasks/")
+#     recorder.commands, recorder.duration, recorder.slowest, recorder.by_name
+#
+# The current recorder lives in a ContextVar: command events are published
+# on the thread that runs the command, and that thread sees the context of
+# whoever started the block (sync views run in it, the aio I/O threads run
+# in a copy of the async view's context). Commands run outside track() cost
+# one lookup and are not recorded.
+#
+# Reply sizes cost a BSON re-encode of every reply (pymongo hands them over
+# decoded), so they are only measured with track(measure_bytes=True).
+
+import contextlib
+import contextvars
+from collections import Counter
+
+from bson import BSON
+from pymongo import monitoring
+
+_current_recorder = contextvars.ContextVar("mongo_command_recorder", default=None)
+
+
+class CommandRecorder:
+    """
+    Commands seen inside one track() block. Times are in seconds,
+    slowest is (command name, seconds) or None.
+    """
+
+    __slots__ = (
+        "commands",
+        "failures",
+        "duration",
+        "bytes_returned",
+        "slowest",
+        "by_name",
+        "measure_bytes",
+    )
+
+    def __init__(self, measure_bytes=False):
+        self.measure_bytes = measure_bytes
+        self.commands = 0
+        self.failures = 0
+        self.duration = 0.0
+        self.bytes_returned = 0
+        self.slowest = None
+        self.by_name = Counter()
+
+    def _finished(self, event):
+        seconds = event.duration_micros / 1e6
+        self.duration += seconds
+        if self.slowest is None or seconds > self.slowest[1]:
+            self.slowest = (event.command_name, seconds)
+
+
+class CommandTracker(monitoring.CommandListener):
+    @contextlib.contextmanager
+    def track(self, recorder=None, measure_bytes=False):
+        """
+        Record the commands of the block, in a new recorder or in `recorder`
+        (to go on counting for the same request, see core/middleware.py).
+        """
+        if recorder is None:
+            recorder = CommandRecorder(measure_bytes)
+        token = _current_recorder.set(recorder)
+        try:
+            yield recorder
+        finally:
+            _current_recorder.reset(token)
+
+    def started(self, event):
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            recorder.commands += 1
+            recorder.by_name[event.command_name] += 1
+
+    def succeeded(self, event):
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            recorder._finished(event)
+            if recorder.measure_bytes:
+                # The reply is already decoded, re-encoding it is the only
+                # way to know its size
+                recorder.bytes_returned += len(BSON.encode(event.reply))
+
+    def failed(self, event):
+        recorder = _current_recorder.get()
+        if recorder is not None:
+            recorder.failures += 1
+            recorder._finished(event)
+
+
+# Shared by every MongoClient created by the backend
+command_tracker = CommandTracker()
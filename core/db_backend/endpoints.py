@@ -0,0 +1,179 @@
+# NOTES:
+# Chooses which MongoDB URI the app talks to.
+#
+# - Nothing happens at import time. The first time a connection is needed we
+#   probe the endpoints in order (preferred first) and cache the answer.
+# - When the backend sees a connection failure it calls mark_failed(), and we
+#   move to the next endpoint.
+# - While we are NOT on the preferred endpoint, a background thread re-probes
+#   the preferred one every `recheck_interval` seconds and switches back once
+#   it answers again. Requests never wait for those probes.
+
+import logging
+import threading
+import time
+
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+logger = logging.getLogger(__name__)
+
+
+def ping(uri, timeout_ms):
+    """
+    Return True if the server behind this URI answers a ping in time.
+    """
+    client = None
+    try:
+        client = MongoClient(uri, serverSelectionTimeoutMS=timeout_ms, connect=False)
+        client.admin.command("ping")
+        return True
+    except PyMongoError:
+        return False
+    finally:
+        if client is not None:
+            client.close()
+
+
+class EndpointSelector:
+    """
+    Thread-safe, cached choice between several MongoDB URIs.
+
+    endpoints: list of (name, uri) in order of preference, empty URIs are skipped.
+    probe / clock can be swapped in tests.
+    """
+
+    def __init__(
+        self,
+        endpoints,
+        probe_timeout_ms=2000,
+        recheck_interval=60,
+        probe=ping,
+        clock=time.monotonic,
+        background=True,
+    ):
+        self.endpoints = [(name, uri) for name, uri in endpoints if uri]
+        if not self.endpoints:
+            raise ValueError("At least one MongoDB endpoint URI is required.")
+
+        self.probe_timeout_ms = probe_timeout_ms
+        self.recheck_interval = recheck_interval
+        self._probe = probe
+        self._clock = clock
+        self._background = background
+
+        self._lock = threading.Lock()
+        self._active_index = None
+        self._last_recheck = 0.0
+        self._recheck_running = False
+
+    # ------------ Public API ------------
+
+    @property
+    def preferred_uri(self):
+        return self.endpoints[0][1]
+
+    @property
+    def resolved(self):
+        """
+        False until the first probe ran, active_uri() may block until then.
+        """
+        return self._active_index is not None
+
+    def active_uri(self):
+        """
+        URI to connect to right now. Only the very first call may block
+        (it probes the endpoints once), later calls just read the cache.
+        """
+        with self._lock:
+            if self._active_index is None:
+                self._active_index = self._first_healthy_index()
+            index = self._active_index
+
+        if index != 0:
+            self._maybe_recheck_preferred()
+
+        return self.endpoints[index][1]
+
+    def active_name(self):
+        return self.endpoints[self._active_index or 0][0]
+
+    def mark_failed(self, uri):
+        """
+        Called by the backend when talking to `uri` failed.
+        Moves to the next endpoint if `uri` is still the active one.
+        """
+        with self._lock:
+            if self._active_index is None:
+                return
+            if self.endpoints[self._active_index][1] != uri:
+                return  # someone already failed over
+
+            failed_name = self.endpoints[self._active_index][0]
+            self._active_index = (self._active_index + 1) % len(self.endpoints)
+            self._last_recheck = self._clock()
+            new_name = self.endpoints[self._active_index][0]
+
+        logger.warning("MongoDB endpoint '%s' failed, switching to '%s'.", failed_name, new_name)
+
+    # ------------ Internals ------------
+
+    def _first_healthy_index(self):
+        if len(self.endpoints) == 1:
+            return 0
+
+        for index, (name, uri) in enumerate(self.endpoints):
+            if self._probe(uri, self.probe_timeout_ms):
+                if index != 0:
+                    logger.warning("Falling back to MongoDB endpoint '%s'.", name)
+                return index
+
+        # Nothing answered: keep the last one (usually local) and let the
+        # real queries raise their own errors.
+        self._last_recheck = self._clock()
+        logger.warning("No MongoDB endpoint answered, using '%s'.", self.endpoints[-1][0])
+        return len(self.endpoints) - 1
+
+    def _maybe_recheck_preferred(self):
+        with self._lock:
+            due = self._clock() - self._last_recheck >= self.recheck_interval
+            if not due or self._recheck_running:
+                return
+            self._recheck_running = True
+            self._last_recheck = self._clock()
+
+        if self._background:
+            threading.Thread(target=self._recheck_preferred, daemon=True).start()
+        else:
+            self._recheck_preferred()
+
+    def _recheck_preferred(self):
+        try:
+            healthy = self._probe(self.preferred_uri, self.probe_timeout_ms)
+        finally:
+            with self._lock:
+                self._recheck_running = False
+
+        if healthy:
+            with self._lock:
+                self._active_index = 0
+            logger.info("MongoDB endpoint '%s' is back, switching to it.", self.endpoints[0][0])
+
+
+# One selector per database alias, created on first use
+_selectors = {}
+_selectors_lock = threading.Lock()
+
+
+def get_endpoint_selector(alias, settings_dict):
+    with _selectors_lock:
+        selector = _selectors.get(alias)
+        if selector is None:
+            failover = settings_dict.get("FAILOVER", {})
+            selector = EndpointSelector(
+                settings_dict["ENDPOINTS"],
+                probe_timeout_ms=failover.get("PROBE_TIMEOUT_MS", 2000),
+                recheck_interval=failover.get("RECHECK_INTERVAL", 60),
+            )
+            _selectors[alias] = selector
+        return selector
@@ -0,0 +1,130 @@
+# NOTES:
+# pymongo publishes connection pool events (CMAP) to registered listeners.
+# PoolMetrics keeps cheap in-process counters per server address so we can see
+# how the shared pool behaves under load:
+# - connections created / closed and how many are checked out right now
+# - how long requests waited to check out a connection (and failures)
+#
+# Checkout events are published on the thread that is checking out, so a
+# thread-local is enough to pair "started" with "checked out"/"failed".
+
+import threading
+import time
+
+from pymongo import monitoring
+
+
+class _AddressStats:
+    __slots__ = (
+        "connections_created",
+        "connections_closed",
+        "checked_out",
+        "max_checked_out",
+        "checkouts",
+        "checkout_failures",
+        "wait_time_total",
+        "wait_time_max",
+        "pool_cleared",
+    )
+
+    def __init__(self):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+    def as_dict(self):
+        data = {name: getattr(self, name) for name in self.__slots__}
+        data["wait_time_avg"] = (
+            self.wait_time_total / self.checkouts if self.checkouts else 0.0
+        )
+        return data
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Thread-safe pool counters, keyed by "host:port".
+    Wait times are in seconds.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._stats = {}
+
+    def _for(self, address):
+        key = "%s:%s" % address
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _AddressStats()
+        return stats
+
+    # ------------ Snapshot ------------
+
+    def snapshot(self):
+        with self._lock:
+            return {key: stats.as_dict() for key, stats in self._stats.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+
+    # ------------ Checkout wait times ------------
+
+    def connection_check_out_started(self, event):
+        self._local.started_at = self._clock()
+
+    def _waited(self):
+        started_at = getattr(self._local, "started_at", None)
+        self._local.started_at = None
+        return self._clock() - started_at if started_at is not None else 0.0
+
+    def connection_checked_out(self, event):
+        waited = self._waited()
+        with self._lock:
+            stats = self._for(event.address)
+            stats.checkouts += 1
+            stats.checked_out += 1
+            stats.max_checked_out = max(stats.max_checked_out, stats.checked_out)
+            stats.wait_time_total += waited
+            stats.wait_time_max = max(stats.wait_time_max, waited)
+
+    def connection_check_out_failed(self, event):
+        waited = self._waited()
+        with self._lock:
+            stats = self._for(event.address)
+            stats.checkout_failures += 1
+            stats.wait_time_total += waited
+            stats.wait_time_max = max(stats.wait_time_max, waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            stats = self._for(event.address)
+            stats.checked_out = max(0, stats.checked_out - 1)
+
+    # ------------ Connection lifecycle ------------
+
+    def connection_created(self, event):
+        with self._lock:
+            self._for(event.address).connections_created += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._for(event.address).connections_closed += 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._for(event.address).pool_cleared += 1
+
+    # The rest of the CMAP events are not interesting for sizing
+    def pool_created(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+
+# Shared by every MongoClient created by the backend
+pool_metrics = PoolMetrics()
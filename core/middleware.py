@@ -0,0 +1,132 @@
+# NOTES:
+# db_metrics_middleware: attributes every MongoDB command to the request (and
+# view) that sent it.
+# - commands are recorded with command_tracker.track() around the whole
+#   request, so session / auth lookups count too (keep this middleware first)
+# - the totals go to core.request_metrics (GET /metrics) and to a
+#   Server-Timing header, so the browser dev tools show the DB cost of
+#   every request next to its timing
+# - requests sending more than DB_COMMANDS_WARN_THRESHOLD commands are
+#   logged with their commands by name, the usual sign of an N+1
+# - streaming responses (the task export) run their queries while the body
+#   is sent, after the view returned: the body is wrapped so those commands
+#   still count, and the request is recorded once the body is done. Their
+#   Server-Timing header only covers what ran before the first byte.
+# - reply sizes (db_bytes_returned_total) are only measured with
+#   DB_METRICS_REPLY_BYTES=true, see core/db_backend/command_metrics.py
+#
+# Works for sync and async views: Django 3.2 would otherwise run the async
+# views through a thread just for this middleware.
+
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from core.db_backend.command_metrics import command_tracker
+from core.request_metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+_END = object()
+
+
+def endpoint_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unmatched"
+    return match.view_name or match._func_path
+
+
+def server_timing(recorder, duration):
+    parts = [
+        f'db;desc="{recorder.commands} MongoDB commands";dur={recorder.duration * 1000:.2f}',
+    ]
+    if recorder.slowest:
+        name, seconds = recorder.slowest
+        parts.append(f'db-slowest;desc="{name}";dur={seconds * 1000:.2f}')
+    parts.append(f"total;dur={duration * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def finish_request(request, response, recorder, duration):
+    """
+    Record a finished request in the metrics, log it if it sent too many
+    commands.
+    """
+    endpoint = endpoint_name(request)
+    request_metrics.record(endpoint, request.method, response.status_code, duration, recorder)
+
+    threshold = getattr(settings, "DB_COMMANDS_WARN_THRESHOLD", None)
+    if threshold and recorder.commands > threshold:
+        logger.warning(
+            "%s %s (%s) sent %s MongoDB commands: %s",
+            request.method,
+            request.path,
+            endpoint,
+            recorder.commands,
+            dict(recorder.by_name.most_common()),
+        )
+
+
+def tracked_stream(content, recorder, on_done):
+    """
+    The body of a streaming response, each chunk produced inside the
+    request's recorder. on_done() runs when the body is sent or the client
+    goes away.
+    """
+    try:
+        for chunk in _tracked_chunks(iter(content), recorder):
+            yield chunk
+    finally:
+        on_done()
+
+
+def _tracked_chunks(iterator, recorder):
+    # The recorder is only set while a chunk is produced, never across a
+    # yield (the server runs other code between chunks)
+    while True:
+        with command_tracker.track(recorder):
+            chunk = next(iterator, _END)
+        if chunk is _END:
+            return
+        yield chunk
+
+
+def record_request(request, response, recorder, start):
+    response["Server-Timing"] = server_timing(recorder, time.perf_counter() - start)
+
+    if response.streaming:
+        response.streaming_content = tracked_stream(
+            response.streaming_content,
+            recorder,
+            lambda: finish_request(request, response, recorder, time.perf_counter() - start),
+        )
+    else:
+        finish_request(request, response, recorder, time.perf_counter() - start)
+    return response
+
+
+@sync_and_async_middleware
+def db_metrics_middleware(get_response):
+    measure_bytes = getattr(settings, "DB_METRICS_REPLY_BYTES", False)
+
+    if asyncio.iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            start = time.perf_counter()
+            with command_tracker.track(measure_bytes=measure_bytes) as recorder:
+                response = await get_response(request)
+            return record_request(request, response, recorder, start)
+
+    else:
+
+        def middleware(request):
+            start = time.perf_counter()
+            with command_tracker.track(measure_bytes=measure_bytes) as recorder:
+                response = get_response(request)
+            return record_request(request, response, recorder, start)
+
+    return middleware
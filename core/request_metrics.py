@@ -0,0 +1,228 @@
+# NOTES:
+# Per-endpoint request and MongoDB metrics of THIS process, in the
+# Prometheus text format (GET /metrics).
+#
+# DbMetricsMiddleware records every request here:
+# - request duration, DB time and DB commands per request as histograms,
+#   per endpoint (URL name, e.g. "tasks:api_list") and method
+# - requests by status, commands by name, bytes returned by MongoDB
+# - the slowest single command seen per endpoint
+# An endpoint whose "commands per request" grows with the data (instead of
+# staying flat) is an N+1 waiting to happen.
+#
+# Everything is kept in plain dicts under one lock: a few additions per
+# request, no dependency on prometheus_client. With several worker
+# processes every process reports its own numbers (Prometheus sums them).
+
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+from core.db_backend.pool_metrics import pool_metrics
+
+METRIC_PREFIX = "cohub"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COMMAND_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        [(upper bound, observations <= bound)] including +Inf.
+        """
+        rows, running = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            rows.append((bound, running))
+        rows.append(("+Inf", self.count))
+        return rows
+
+
+class EndpointStats:
+    __slots__ = (
+        "duration",
+        "db_time",
+        "db_commands",
+        "db_bytes",
+        "db_failures",
+        "slowest",
+        "statuses",
+        "commands",
+    )
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.db_time = Histogram(DURATION_BUCKETS)
+        self.db_commands = Histogram(COMMAND_BUCKETS)
+        self.db_bytes = 0
+        self.db_failures = 0
+        self.slowest = None
+        self.statuses = Counter()
+        self.commands = Counter()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+
+    def record(self, endpoint, method, status, duration, recorder):
+        """
+        Add one finished request. recorder is its CommandRecorder.
+        """
+        with self._lock:
+            stats = self._endpoints.get((endpoint, method))
+            if stats is None:
+                stats = self._endpoints[(endpoint, method)] = EndpointStats()
+
+            stats.duration.observe(duration)
+            stats.db_time.observe(recorder.duration)
+            stats.db_commands.observe(recorder.commands)
+            stats.db_bytes += recorder.bytes_returned
+            stats.db_failures += recorder.failures
+            stats.statuses[status] += 1
+            stats.commands.update(recorder.by_name)
+            if recorder.slowest and (stats.slowest is None or recorder.slowest[1] > stats.slowest[1]):
+                stats.slowest = recorder.slowest
+
+    def reset(self):
+        with self._lock:
+            self._endpoints = {}
+
+    def render(self):
+        """
+        All metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+            lines = []
+
+            def histogram(name, help_text, attr):
+                lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+                lines.append(f"# TYPE {METRIC_PREFIX}_{name} histogram")
+                for (endpoint, method), stats in endpoints:
+                    hist = getattr(stats, attr)
+                    for bound, count in hist.cumulative():
+                        labels = _labels(endpoint=endpoint, method=method, le=bound)
+                        lines.append(f"{METRIC_PREFIX}_{name}_bucket{labels} {count}")
+                    labels = _labels(endpoint=endpoint, method=method)
+                    lines.append(f"{METRIC_PREFIX}_{name}_sum{labels} {hist.sum}")
+                    lines.append(f"{METRIC_PREFIX}_{name}_count{labels} {hist.count}")
+
+            def simple(name, kind, help_text, rows):
+                lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+                lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+                for labels, value in rows:
+                    lines.append(f"{METRIC_PREFIX}_{name}{_labels(**labels)} {value}")
+
+            histogram(
+                "http_request_duration_seconds", "Time to answer a request.", "duration"
+            )
+            histogram(
+                "db_time_per_request_seconds", "MongoDB time spent by one request.", "db_time"
+            )
+            histogram(
+                "db_commands_per_request", "MongoDB commands sent by one request.", "db_commands"
+            )
+
+            simple(
+                "http_requests_total",
+                "counter",
+                "Requests by endpoint and status.",
+                [
+                    ({"endpoint": endpoint, "method": method, "status": status}, count)
+                    for (endpoint, method), stats in endpoints
+                    for status, count in sorted(stats.statuses.items())
+                ],
+            )
+            simple(
+                "db_commands_total",
+                "counter",
+                "MongoDB commands by endpoint and command name.",
+                [
+                    ({"endpoint": endpoint, "method": method, "command": command}, count)
+                    for (endpoint, method), stats in endpoints
+                    for command, count in sorted(stats.commands.items())
+                ],
+            )
+            simple(
+                "db_command_failures_total",
+                "counter",
+                "Failed MongoDB commands by endpoint.",
+                [
+                    ({"endpoint": endpoint, "method": method}, stats.db_failures)
+                    for (endpoint, method), stats in endpoints
+                ],
+            )
+            simple(
+                "db_bytes_returned_total",
+                "counter",
+                "Bytes of MongoDB replies by endpoint.",
+                [
+                    ({"endpoint": endpoint, "method": method}, stats.db_bytes)
+                    for (endpoint, method), stats in endpoints
+                ],
+            )
+            simple(
+                "db_slowest_command_seconds",
+                "gauge",
+                "Slowest single MongoDB command seen per endpoint.",
+                [
+                    (
+                        {"endpoint": endpoint, "method": method, "command": stats.slowest[0]},
+                        stats.slowest[1],
+                    )
+                    for (endpoint, method), stats in endpoints
+                    if stats.slowest
+                ],
+            )
+
+        pools = pool_metrics.snapshot()
+        simple(
+            "mongo_pool_checked_out",
+            "gauge",
+            "Connections checked out of the pool right now.",
+            [({"address": address}, stats["checked_out"]) for address, stats in sorted(pools.items())],
+        )
+        simple(
+            "mongo_pool_checkout_wait_seconds_total",
+            "counter",
+            "Total time spent waiting for a pool connection.",
+            [({"address": address}, stats["wait_time_total"]) for address, stats in sorted(pools.items())],
+        )
+        simple(
+            "mongo_pool_checkout_failures_total",
+            "counter",
+            "Pool checkouts that failed (e.g. wait queue timeout).",
+            [({"address": address}, stats["checkout_failures"]) for address, stats in sorted(pools.items())],
+        )
+
+        return "\n".join(lines) + "\n"
+
+
+# One registry per process
+request_metrics = RequestMetrics()
@@ -12,9 +12,8 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -47,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so the DB commands of every other middleware are counted too
+    'core.middleware.db_metrics_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -78,8 +79,10 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 
 # Database
-# The foloowing code will check if the remote mongodb is available
-# if so, it'll connect to it, otherwise it'll use the localhost as a db
+# The remote (Atlas) mongodb is preferred, localhost is the fallback.
+# Nothing is probed here: core.db_backend picks the endpoint lazily the first
+# time a connection is needed, fails over at runtime and switches back to
+# Atlas once it answers again (see core/db_backend/endpoints.py).
 
 load_dotenv() # go to .env and locad the var inside it in the system env variables
 
@@ -87,38 +90,116 @@ load_dotenv() # go to .env and locad the var inside it in the system env variabl
 ATLAS_URI = os.getenv("MONGODB_ATLAS_URI", "")
 LOCAL_URI = os.getenv("MONGODB_LOCAL_URI", "mongodb://localhost:27017/")
 
-# Create a function to check if remote db is avaibale
-def check_atlas_db(uri:str) -> bool:
-    if not uri:
-        return False
-    
-    try:
-        # MongoClient will take the uri and try to connect to the db
-        client = MongoClient(uri, serverSelectionTimeoutMS=2000)
-        client.server_info()   # ping the server
-        return True
-    except ConnectionFailure: 
-        return False
-
-# Check
-if check_atlas_db(ATLAS_URI):
-     ACTIVE_DB_URI = ATLAS_URI
-else:
-    ACTIVE_DB_URI = LOCAL_URI
-    print("⚠️ Falling back to LOCAL MongoDB (Atlas unreachable)")   
-
+# "majority" or a number of nodes
+MONGODB_WRITE_CONCERN = os.getenv("MONGODB_WRITE_CONCERN", "majority")
 
 # Connect to actual db
 DATABASES = {
     'default': {
-        'ENGINE': 'djongo',
+        'ENGINE': 'core.db_backend',
         'NAME': 'cohub_db',
+        # In order of preference, empty URIs are skipped
+        'ENDPOINTS': [
+            ('atlas', ATLAS_URI),
+            ('local', LOCAL_URI),
+        ],
+        'FAILOVER': {
+            # How long a health probe may wait for the server
+            'PROBE_TIMEOUT_MS': int(os.getenv("MONGODB_PROBE_TIMEOUT_MS", "2000")),
+            # While on the fallback, re-probe Atlas every N seconds
+            'RECHECK_INTERVAL': int(os.getenv("MONGODB_RECHECK_INTERVAL", "60")),
+        },
+        # Shared connection pool, one per endpoint per process.
+        # Size it so (workers x threads) never waits long on a checkout,
+        # see the pool stats at /health/db-pool/.
         'CLIENT': {
-            'host': ACTIVE_DB_URI,
-        }
+            'maxPoolSize': int(os.getenv("MONGODB_MAX_POOL_SIZE", "50")),
+            'minPoolSize': int(os.getenv("MONGODB_MIN_POOL_SIZE", "0")),
+            'maxIdleTimeMS': int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000")),
+            'waitQueueTimeoutMS': int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "2000")),
+            'connectTimeoutMS': int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "5000")),
+            'serverSelectionTimeoutMS': int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+            # zlib ships with python, snappy / zstd need extra packages
+            'compressors': os.getenv("MONGODB_COMPRESSORS", "zlib"),
+            'w': int(MONGODB_WRITE_CONCERN) if MONGODB_WRITE_CONCERN.isdigit() else MONGODB_WRITE_CONCERN,
+            'readConcernLevel': os.getenv("MONGODB_READ_CONCERN", "local"),
+            'retryWrites': os.getenv("MONGODB_RETRY_WRITES", "true") == "true",
+            'appname': 'cohub',
+        },
     }
 }
 
+# Request / MongoDB metrics (core/middleware.py, GET /metrics)
+# Prometheus scrapes with "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+# Log requests that send more MongoDB commands than this (N+1 hunting)
+DB_COMMANDS_WARN_THRESHOLD = int(os.getenv("DB_COMMANDS_WARN_THRESHOLD", "25"))
+# Measure MongoDB reply sizes (re-encodes every reply, off by default)
+DB_METRICS_REPLY_BYTES = os.getenv("DB_METRICS_REPLY_BYTES", "false") == "true"
+
+# Cache (apps/tasks/cache.py)
+# Local memory is per process: with several workers use CACHE_BACKEND=memcached
+# so an invalidation reaches every worker.
+# The caches that rely on invalidations (sessions, logged-in users, task
+# pages) are turned on with a shared cache, or with local memory when one
+# process serves every request (WEB_CONCURRENCY=1, the default: runserver,
+# a single gunicorn / uvicorn worker). With several workers and locmem they
+# stay off, the other workers would serve stale entries until they expire.
+SHARED_CACHE = os.getenv("CACHE_BACKEND", "locmem") == "memcached"
+# Worker processes serving requests (gunicorn reads the same variable)
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+if SHARED_CACHE:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': os.getenv("MEMCACHED_LOCATION", "127.0.0.1:11211"),
+            'KEY_PREFIX': 'cohub',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'cohub',
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+# Every worker sees the same cache, so invalidations reach them all
+CACHE_COHERENT = SHARED_CACHE or WEB_CONCURRENCY == 1
+# Task details, list first pages, stats (ETag versions) and saved tips
+TASK_CACHE_ENABLED = CACHE_COHERENT
+# Safety net only, every write invalidates what it changes
+TASK_CACHE_TIMEOUT = int(os.getenv("TASK_CACHE_TIMEOUT", "300"))
+
+# When the cache is coherent (the default single process, or memcached),
+# sessions and the logged-in user come from the cache, so authenticating a
+# request normally costs no MongoDB command (apps/accounts/user_cache.py).
+# With several workers on local memory they are read from the database: a
+# logout or password change must reach every worker.
+# SESSION_BACKEND=db opts out of the session cache.
+# SESSION_BACKEND=signed_cookies keeps the session in the cookie itself:
+# no session writes either, but a copied cookie stays valid until it expires.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cached_db" if CACHE_COHERENT else "db")
+if SESSION_BACKEND == "cached_db" and not CACHE_COHERENT:
+    raise ImproperlyConfigured(
+        "SESSION_BACKEND=cached_db needs a cache shared by the workers "
+        "(CACHE_BACKEND=memcached, or WEB_CONCURRENCY=1)."
+    )
+SESSION_ENGINE = {
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+    'db': 'django.contrib.sessions.backends.db',
+}[SESSION_BACKEND]
+AUTHENTICATION_BACKENDS = [
+    'apps.accounts.user_cache.CachedModelBackend' if CACHE_COHERENT
+    else 'django.contrib.auth.backends.ModelBackend'
+]
+USER_CACHE_TIMEOUT = int(os.getenv("USER_CACHE_TIMEOUT", "60"))
+
+# Rows per uploaded import file (manage.py import_tasks has no limit).
+# Uploads above 2.5 MB are spooled to a temporary file, not kept in memory.
+TASK_IMPORT_MAX_ROWS = int(os.getenv("TASK_IMPORT_MAX_ROWS", "100000"))
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -17,10 +17,14 @@ from django.contrib import admin
 from django.shortcuts import redirect
 from django.urls import include, path
 from apps.accounts.views import landing_page 
+from core.views import db_pool_stats, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path("", landing_page, name="landing"), 
     path("accounts/", include("apps.accounts.urls")),
     path("tasks/", include("apps.tasks.urls")),
+    path("projects/", include("apps.projects.urls")),
+    path("health/db-pool/", db_pool_stats, name="db_pool_stats"),
+    path("metrics", metrics, name="metrics"),
 ]
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_http_methods
+
+from core.db_backend.pool_metrics import pool_metrics
+from core.request_metrics import request_metrics
+
+
+@staff_member_required
+@require_http_methods(["GET"])
+def db_pool_stats(request):
+    """
+    GET /health/db-pool/
+    Live MongoDB connection pool counters of THIS process (staff only).
+    """
+    connection = connections["default"]
+    selector = getattr(connection, "endpoint_selector", None)
+
+    return JsonResponse(
+        {
+            "ok": True,
+            "endpoint": selector.active_name() if selector else None,
+            "pool_options": {
+                key: value
+                for key, value in connection.settings_dict.get("CLIENT", {}).items()
+                if key.endswith(("PoolSize", "TimeoutMS", "TimeMS"))
+            },
+            "pools": pool_metrics.snapshot(),
+        }
+    )
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    GET /metrics
+    Request and MongoDB metrics of THIS process in the Prometheus format.
+    Scrapers send "Authorization: Bearer <METRICS_TOKEN>", without a token
+    configured only logged-in staff can read it.
+    """
+    token = settings.METRICS_TOKEN
+    auth = request.headers.get("Authorization", "")
+    if token:
+        allowed = constant_time_compare(auth, f"Bearer {token}")
+    else:
+        allowed = request.user.is_active and request.user.is_staff
+    if not allowed:
+        return HttpResponse("Forbidden", status=403, content_type="text/plain")
+
+    return HttpResponse(
+        request_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )